@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Sequence
+
+from .similarity import NEAR_DUPLICATE_BITS, hamming, normalize_text, simhash64
+from .tokens import CHARS_PER_TOKEN, estimate_json_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# Default context budgets (estimated tokens) per orchestrator operation.
+# Override with AI_BUDGET_<OPERATION>, e.g. AI_BUDGET_SELECT=4000.
+DEFAULT_BUDGETS = {
+    "suggest": 1500,
+    "schedule": 1000,
+    "plan": 600,
+    "select": 3000,
+}
+DEFAULT_OPERATION = "suggest"
+
+# Don't bother including a context truncated below this many tokens
+MIN_TRUNCATED_TOKENS = 48
+TRUNCATION_MARK = " …"
+
+_TERM = re.compile(r"\w{3,}", re.UNICODE)
+
+
+@dataclass
+class BudgetReport:
+    operation: str
+    budget_tokens: int
+    contexts_in: int
+    contexts_out: int
+    tokens_before: int
+    tokens_after: int
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    over_budget: int = 0
+    truncated: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["tokens_saved"] = self.tokens_saved
+        return data
+
+
+def budget_for(operation: str) -> int:
+    default = DEFAULT_BUDGETS.get(operation, DEFAULT_BUDGETS[DEFAULT_OPERATION])
+    return int(os.environ.get(f"AI_BUDGET_{operation.upper()}", default))
+
+
+def _terms(text: str) -> set[str]:
+    return set(_TERM.findall((text or "").casefold()))
+
+
+def _task_terms(task: Optional[dict[str, Any]]) -> set[str]:
+    if not task:
+        return set()
+    return _terms(" ".join(str(task.get(k) or "") for k in ("title", "description", "category_name")))
+
+
+def _relevance(terms: set[str], task_terms: set[str], position: int, count: int) -> float:
+    # Keyword overlap with the task, with a small preference for earlier (more recent) entries
+    overlap = len(terms & task_terms) / (len(task_terms) or 1)
+    recency = 1.0 - position / max(count, 1)
+    return overlap + 0.1 * recency
+
+
+def _truncate(context: dict[str, Any], tokens: int) -> Optional[dict[str, Any]]:
+    overhead = estimate_json_tokens({**context, "content": ""})
+    chars = (tokens - overhead) * CHARS_PER_TOKEN - len(TRUNCATION_MARK)
+    if tokens < MIN_TRUNCATED_TOKENS or chars <= 0:
+        return None
+    content = context.get("content") or ""
+    cut = content[:chars]
+    # Prefer to cut at a word boundary
+    space = cut.rfind(" ")
+    if space > chars * 0.8:
+        cut = cut[:space]
+    return {**context, "content": cut.rstrip() + TRUNCATION_MARK}
+
+
+def fit_contexts(
+    contexts: Sequence[dict[str, Any]],
+    *,
+    task: Optional[dict[str, Any]] = None,
+    operation: str = DEFAULT_OPERATION,
+    budget_tokens: Optional[int] = None,
+) -> tuple[list[dict[str, Any]], BudgetReport]:
+    """Fit context payloads into the operation's token budget.
+
+    Drops exact duplicates (after whitespace/case normalisation) and near-duplicates
+    (SimHash), then keeps the contexts most relevant to `task` until the budget is
+    spent, truncating the last one that only partly fits. Selected contexts keep
+    their input order. Returns the contexts and a report of what was saved.
+    """
+    budget = budget_for(operation) if budget_tokens is None else int(budget_tokens)
+    sizes = [estimate_json_tokens(c) for c in contexts]
+    report = BudgetReport(
+        operation=operation,
+        budget_tokens=budget,
+        contexts_in=len(contexts),
+        contexts_out=0,
+        tokens_before=sum(sizes),
+        tokens_after=0,
+    )
+
+    seen: set[str] = set()
+    fingerprints: list[int] = []
+    candidates: list[int] = []
+    for i, context in enumerate(contexts):
+        normalized = normalize_text(context.get("content") or "")
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+        if digest in seen:
+            report.exact_duplicates += 1
+            continue
+        seen.add(digest)
+        fingerprint = simhash64(normalized)
+        if normalized and any(hamming(fingerprint, f) <= NEAR_DUPLICATE_BITS for f in fingerprints):
+            report.near_duplicates += 1
+            continue
+        fingerprints.append(fingerprint)
+        candidates.append(i)
+
+    task_terms = _task_terms(task)
+    ranked = sorted(
+        candidates,
+        key=lambda i: -_relevance(_terms(contexts[i].get("content") or ""), task_terms, i, len(contexts)),
+    )
+
+    remaining = budget
+    chosen: dict[int, dict[str, Any]] = {}
+    for i in ranked:
+        if sizes[i] <= remaining:
+            chosen[i] = contexts[i]
+            remaining -= sizes[i]
+            continue
+        truncated = _truncate(contexts[i], remaining)
+        if truncated is None:
+            report.over_budget += 1
+            continue
+        chosen[i] = truncated
+        remaining -= estimate_json_tokens(truncated)
+        report.truncated += 1
+
+    selected = [chosen[i] for i in sorted(chosen)]
+    report.contexts_out = len(selected)
+    report.tokens_after = sum(estimate_json_tokens(c) for c in selected)
+    _record(report)
+    return selected, report
+
+
+_stats_lock = threading.Lock()
+_stats = {"calls": 0, "tokens_before": 0, "tokens_after": 0, "contexts_dropped": 0, "contexts_truncated": 0}
+
+
+def _record(report: BudgetReport) -> None:
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["tokens_before"] += report.tokens_before
+        _stats["tokens_after"] += report.tokens_after
+        _stats["contexts_dropped"] += report.contexts_in - report.contexts_out
+        _stats["contexts_truncated"] += report.truncated
+    if report.tokens_saved:
+        logger.info("ai.budget.applied", extra=report.as_dict())
+
+
+def budget_stats() -> dict[str, Any]:
+    """Process-wide totals since start, for the health endpoint."""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["tokens_saved"] = stats["tokens_before"] - stats["tokens_after"]
+    return stats
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Callable, Optional
+
+from .providers.base import GenerateParams
+
+logger = logging.getLogger(__name__)
+
+
+def bucketed_now(bucket_seconds: int | None = None) -> datetime:
+    """Current UTC time floored to the cache bucket so repeated prompts within it are identical."""
+    from django.utils import timezone
+
+    if bucket_seconds is None:
+        bucket_seconds = int(os.environ.get("AI_CACHE_NOW_BUCKET_SECONDS", "3600"))
+    now = timezone.now().astimezone(dt_timezone.utc)
+    if bucket_seconds <= 1:
+        return now
+    epoch = int(now.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % bucket_seconds, tz=dt_timezone.utc)
+
+
+def canonical_json(payload: Any) -> str:
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+class AiResponseCache:
+    """Two-tier memo of raw model responses: an in-process LRU in front of a shared redis tier.
+
+    Both tiers expire entries after `ttl_seconds`; the local tier also evicts the least
+    recently used entry beyond `max_entries`. Redis failures degrade to local-only.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 1024,
+        ttl_seconds: int = 3600,
+        namespace: str = "ai:resp:v1",
+        redis_getter: Optional[Callable[[], Any]] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = max(1, int(ttl_seconds))
+        self.namespace = namespace
+        self._redis_getter = redis_getter
+        self._lock = threading.Lock()
+        self._local: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._counters = {"local_hits": 0, "shared_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        material = canonical_json({"system": system_prompt, "user": user_prompt, "params": asdict(params)})
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            hit = self._local.get(key)
+            if hit is not None:
+                if hit[0] > now:
+                    self._local.move_to_end(key)
+                    self._counters["local_hits"] += 1
+                    return hit[1]
+                del self._local[key]
+
+        value = self._shared_get(key)
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["shared_hits"] += 1
+            self._store_local(key, value, now)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        with self._lock:
+            self._store_local(key, value, time.monotonic())
+            self._counters["stores"] += 1
+        self._shared_set(key, value)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            counters["local_size"] = len(self._local)
+        lookups = counters["local_hits"] + counters["shared_hits"] + counters["misses"]
+        counters["hit_ratio"] = round((counters["local_hits"] + counters["shared_hits"]) / lookups, 4) if lookups else 0.0
+        return counters
+
+    def clear(self) -> None:
+        with self._lock:
+            self._local.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def _store_local(self, key: str, value: str, now: float) -> None:
+        # caller holds the lock
+        self._local[key] = (now + self.ttl_seconds, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _redis(self) -> Any:
+        if self._redis_getter is None:
+            return None
+        return self._redis_getter()
+
+    def _shared_get(self, key: str) -> Optional[str]:
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            value = client.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            self._shared_failed(e)
+            return None
+        if value is None:
+            return None
+        return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+    def _shared_set(self, key: str, value: str) -> None:
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.set(f"{self.namespace}:{key}", value.encode("utf-8"), ex=self.ttl_seconds)
+        except Exception as e:
+            self._shared_failed(e)
+
+    @staticmethod
+    def _shared_failed(error: Exception) -> None:
+        logger.warning("ai.cache.shared_error", extra={"error": error.__class__.__name__})
+        from common.redis_client import mark_unavailable
+
+        mark_unavailable()
+
+
+_default_cache: Optional[AiResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[AiResponseCache]:
+    """Process-wide cache configured from the environment, or None when AI_CACHE_ENABLED=false."""
+    global _default_cache
+    if os.environ.get("AI_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    if _default_cache is None:
+        with _default_lock:
+            if _default_cache is None:
+                from common.redis_client import get_redis
+
+                shared = os.environ.get("AI_CACHE_SHARED", "true").lower() == "true"
+                _default_cache = AiResponseCache(
+                    max_entries=int(os.environ.get("AI_CACHE_MAX_ENTRIES", "1024")),
+                    ttl_seconds=int(os.environ.get("AI_CACHE_TTL_SECONDS", "3600")),
+                    redis_getter=get_redis if shared else None,
+                )
+    return _default_cache
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Union
+
+PathKey = Union[str, int]
+Path = tuple[PathKey, ...]
+
+
+class JsonParseError(ValueError):
+    pass
+
+
+_WS = re.compile(r"[ \t\r\n]*")
+_DQ_RUN = re.compile(r'[^"\\]*')
+_SQ_RUN = re.compile(r"[^'\\]*")
+_SCALAR = re.compile(r"[-+0-9.eE]+|[A-Za-z_]+")
+# Models sometimes answer with Python literals (single quotes, True/None)
+_LITERALS = {"true": True, "false": False, "null": None, "True": True, "False": False, "None": None}
+
+# Frame states
+_KEY, _COLON, _VALUE, _COMMA = range(4)
+
+
+class _Frame:
+    __slots__ = ("container", "path", "key", "state", "count")
+
+    def __init__(self, container: Any, path: Path):
+        self.container = container
+        self.path = path
+        self.key: Any = None
+        self.state = _KEY if isinstance(container, dict) else _VALUE
+        self.count = 0  # array elements seen, including ones not retained
+
+
+class IncrementalJsonParser:
+    """Single-pass JSON parser fed with model output chunk by chunk.
+
+    `feed()` returns `(path, value)` for every object or array that closed in the
+    chunk at depth <= `emit_depth` (root members have a path of length 1, e.g.
+    `("t0",)`; elements of an array member look like `("tasks", 3)`). `close()`
+    returns the root value.
+
+    Text before the root (prose, code fences) and after it is skipped. A syntax
+    error before the root closes restarts the search at the next brace, so braces
+    in leading prose do not poison the parse. Single-quoted strings, Python
+    literals and trailing commas are accepted. Consumed input is discarded, so
+    each character is scanned once.
+
+    With `retain_emitted=False` emitted values are not added to their parent, so
+    memory stays flat while streaming a large array (the root value lacks them).
+    With `emit_scalars=True` strings, numbers and literals at depth <=
+    `emit_depth` are emitted too.
+    """
+
+    def __init__(
+        self, *, emit_depth: int = 2, roots: str = "{[", retain_emitted: bool = True, emit_scalars: bool = False
+    ):
+        self.emit_depth = emit_depth
+        self.retain_emitted = retain_emitted
+        self.emit_scalars = emit_scalars
+        self._roots = roots
+        self._seek = re.compile("[" + re.escape(roots) + "]")
+        self._buf = ""
+        self._stack: list[_Frame] = []
+        self._quote = ""
+        self._parts: list[str] = []
+        self._string_is_key = False
+        self.done = False
+        self.value: Any = None
+
+    def feed(self, chunk: str) -> list[tuple[Path, Any]]:
+        if self.done or not chunk:
+            return []
+        self._buf += chunk
+        return self._parse(final=False)
+
+    def close(self) -> Any:
+        if not self.done:
+            self._parse(final=True)
+        if not self.done:
+            raise JsonParseError("incomplete JSON document")
+        return self.value
+
+    # --- internals ---
+
+    def _parse(self, *, final: bool) -> list[tuple[Path, Any]]:
+        events: list[tuple[Path, Any]] = []
+        buf = self._buf
+        n = len(buf)
+        i = 0
+        while i < n and not self.done:
+            if self._quote:
+                run = (_DQ_RUN if self._quote == '"' else _SQ_RUN).match(buf, i)
+                if run.end() > i:
+                    self._parts.append(buf[i:run.end()])
+                    i = run.end()
+                if i >= n:
+                    break
+                if buf[i] == "\\":
+                    width = 6 if buf[i + 1:i + 2] == "u" else 2
+                    if i + width > n:
+                        break  # escape split across chunks; wait for the rest
+                    self._parts.append(buf[i:i + width])
+                    i += width
+                    continue
+                i += 1  # closing quote
+                try:
+                    text = self._finish_string()
+                except ValueError:
+                    i = self._recover(i)
+                    continue
+                if self._string_is_key:
+                    frame = self._stack[-1]
+                    frame.key = text
+                    frame.state = _COLON
+                else:
+                    self._complete(text, events)
+                continue
+
+            i = _WS.match(buf, i).end()
+            if i >= n:
+                break
+            ch = buf[i]
+
+            if not self._stack:
+                # Seeking the root value: skip prose up to the next opening bracket
+                m = self._seek.search(buf, i)
+                if m is None:
+                    i = n
+                    break
+                i = m.start()
+                self._push({} if buf[i] == "{" else [], ())
+                i += 1
+                continue
+
+            frame = self._stack[-1]
+            state = frame.state
+            is_obj = isinstance(frame.container, dict)
+
+            if state == _VALUE or (state == _KEY and ch in "\"'"):
+                if ch in "\"'":
+                    self._quote = ch
+                    self._parts = []
+                    self._string_is_key = state == _KEY
+                    i += 1
+                elif ch in "{[":
+                    self._push({} if ch == "{" else [], self._child_path(frame))
+                    i += 1
+                elif ch == "]" and not is_obj:
+                    i += 1
+                    self._pop(events)
+                else:
+                    m = _SCALAR.match(buf, i)
+                    if m is None:
+                        i = self._recover(i)
+                        continue
+                    if m.end() >= n and not final:
+                        break  # token may continue in the next chunk
+                    try:
+                        value = self._scalar(m.group())
+                    except ValueError:
+                        i = self._recover(i)
+                        continue
+                    i = m.end()
+                    self._complete(value, events)
+            elif ch == "}" and is_obj and state in (_KEY, _COMMA):
+                i += 1
+                self._pop(events)
+            elif ch == "]" and not is_obj and state == _COMMA:
+                i += 1
+                self._pop(events)
+            elif ch == "," and state == _COMMA:
+                frame.state = _KEY if is_obj else _VALUE
+                i += 1
+            elif ch == ":" and state == _COLON:
+                frame.state = _VALUE
+                i += 1
+            else:
+                i = self._recover(i)
+
+        self._buf = "" if self.done else buf[i:]
+        return events
+
+    def _push(self, container: Any, path: Path) -> None:
+        self._stack.append(_Frame(container, path))
+
+    def _pop(self, events: list[tuple[Path, Any]]) -> None:
+        frame = self._stack.pop()
+        self._complete(frame.container, events)
+
+    @staticmethod
+    def _child_path(frame: _Frame) -> Path:
+        if isinstance(frame.container, dict):
+            return frame.path + (frame.key,)
+        return frame.path + (frame.count,)
+
+    def _complete(self, value: Any, events: list[tuple[Path, Any]]) -> None:
+        if not self._stack:
+            self.value = value
+            self.done = True
+            return
+        frame = self._stack[-1]
+        path = self._child_path(frame)
+        emit = (self.emit_scalars or isinstance(value, (dict, list))) and len(path) <= self.emit_depth
+        if emit and not self.retain_emitted:
+            pass
+        elif isinstance(frame.container, dict):
+            frame.container[frame.key] = value
+        else:
+            frame.container.append(value)
+        if not isinstance(frame.container, dict):
+            frame.count += 1
+        frame.state = _COMMA
+        if emit:
+            events.append((path, value))
+
+    def _finish_string(self) -> str:
+        raw = "".join(self._parts)
+        quote, self._quote, self._parts = self._quote, "", []
+        if "\\" not in raw:
+            return raw
+        if quote == "'":
+            raw = raw.replace("\\'", "'").replace('"', '\\"')
+        return json.loads('"' + raw + '"', strict=False)
+
+    @staticmethod
+    def _scalar(token: str) -> Any:
+        if token in _LITERALS:
+            return _LITERALS[token]
+        try:
+            return int(token)
+        except ValueError:
+            return float(token)
+
+    def _recover(self, i: int) -> int:
+        """Drop the partial root and look for the next one after position i."""
+        self._stack.clear()
+        self._quote = ""
+        self._parts = []
+        return i + 1
+
+
+_decoder = json.JSONDecoder()
+
+
+def parse_json_object(text: str) -> dict[str, Any]:
+    """Parse the first JSON object in a model answer, tolerating prose, fences and trailing text."""
+    if not text:
+        raise ValueError("empty response")
+    start = text.find("{")
+    if start != -1:
+        # Fast path for well-formed answers: C decoder from the first brace, trailing text ignored
+        try:
+            value, _ = _decoder.raw_decode(text, start)
+            if isinstance(value, dict):
+                return value
+        except ValueError:
+            pass
+    parser = IncrementalJsonParser(emit_depth=0, roots="{")
+    parser.feed(text)
+    value = parser.close()
+    if not isinstance(value, dict):
+        raise ValueError("response is not a JSON object")
+    return value
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Optional
-import ast
+from typing import Any, Iterator, Optional
 import logging
 import time
 from datetime import timedelta, timezone as dt_timezone
 from django.utils import timezone
 import dateparser
 
+from .cache import AiResponseCache, bucketed_now, get_response_cache
+from .json_stream import IncrementalJsonParser, parse_json_object
 from .providers.base import AiProvider, GenerateParams
+from .tokens import estimate_json_tokens
 
 
 @dataclass
@@ -20,6 +27,8 @@ class AiSuggestionBundle:
     enhanced_description: str
     categories: list[str]
     reasoning: str
+    # True when the model output could not be used and these are placeholder values
+    fallback: bool = False
 
 
 SYSTEM_PROMPT = (
@@ -31,21 +40,131 @@ SYSTEM_PROMPT = (
 )
 
 
+BATCH_SYSTEM_PROMPT = (
+    "You are an assistant that analyzes several tasks, each with its own daily context. For EVERY item produce:"
+    " priority_score (0..1), suggested_deadline (ISO8601 or null), enhanced_description (string),"
+    " categories (array of strings), reasoning (short string)."
+    " Return ONLY a JSON object mapping each item's key to an object with exactly those keys. No extra keys or text."
+    " No suggested_deadline may be in the past relative to 'now' provided to you."
+)
+
+
+# Batching limits: prompt tokens per call, answer tokens per call and per item
+BATCH_PROMPT_TOKENS = int(os.environ.get("AI_BATCH_PROMPT_TOKENS", "6000"))
+BATCH_MAX_OUTPUT_TOKENS = int(os.environ.get("AI_BATCH_MAX_OUTPUT_TOKENS", "4000"))
+BATCH_MAX_ITEMS = int(os.environ.get("AI_BATCH_MAX_ITEMS", "20"))
+BATCH_OUTPUT_TOKENS_PER_TASK = 350
+BATCH_OUTPUT_TOKENS_PER_SCHEDULE = 300
+BATCH_OUTPUT_TOKENS_PER_CONTEXT = 150
+
+
 class AiOrchestrator:
-    def __init__(self, provider: AiProvider):
+    def __init__(self, provider: AiProvider, cache: Optional[AiResponseCache] = None, *, use_cache: bool = True):
         self.provider = provider
+        self.cache = cache if cache is not None else (get_response_cache() if use_cache else None)
 
     def suggest_for_task(self, *, task: dict[str, Any], contexts: list[dict[str, Any]] | None = None) -> AiSuggestionBundle:
-        now_iso = timezone.now().isoformat()
+        t0 = time.time()
+        raw = self._generate(self._suggest_request(task, contexts))
+        return self._bundle_from_raw(raw, task=task, contexts=contexts, t0=t0)
+
+    async def asuggest_for_task(self, *, task: dict[str, Any], contexts: list[dict[str, Any]] | None = None) -> AiSuggestionBundle:
+        t0 = time.time()
+        raw = await self._agenerate(self._suggest_request(task, contexts))
+        return self._bundle_from_raw(raw, task=task, contexts=contexts, t0=t0)
+
+    async def asuggest_many(
+        self,
+        items: list[tuple[str, dict[str, Any], list[dict[str, Any]]]],
+        *,
+        concurrency: int = 5,
+    ) -> dict[str, AiSuggestionBundle | Exception]:
+        """Run `asuggest_for_task` for (key, task, contexts) items with at most `concurrency` in flight.
+
+        A failing item maps to its exception instead of failing the whole batch.
+        """
+        semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+        logger = logging.getLogger(__name__)
+
+        async def run_one(key: str, task: dict[str, Any], contexts: list[dict[str, Any]]):
+            async with semaphore:
+                try:
+                    return key, await self.asuggest_for_task(task=task, contexts=contexts)
+                except Exception as e:
+                    logger.warning("ai.suggest_many.item_failed", extra={"key": key, "error": e.__class__.__name__})
+                    return key, e
+
+        pairs = await asyncio.gather(*(run_one(key, task, contexts) for key, task, contexts in items))
+        return dict(pairs)
+
+    def _generate(self, request: dict[str, Any]) -> str:
+        key, cached = self._cache_lookup(request)
+        if cached is not None:
+            return cached
+        raw = self.provider.generate(**request)
+        self._cache_store(key, raw)
+        return raw
+
+    async def _agenerate(self, request: dict[str, Any]) -> str:
+        key, cached = self._cache_lookup(request)
+        if cached is not None:
+            return cached
+        raw = await self.provider.agenerate(**request)
+        self._cache_store(key, raw)
+        return raw
+
+    def _stream(self, request: dict[str, Any]) -> Iterator[str]:
+        key, cached = self._cache_lookup(request)
+        if cached is not None:
+            yield cached
+            return
+        parts: list[str] = []
+        for chunk in self.provider.stream(**request):
+            if not parts and chunk.strip().startswith("ERROR:"):
+                raise RuntimeError(chunk.strip())
+            parts.append(chunk)
+            yield chunk
+        self._cache_store(key, "".join(parts))
+
+    def _cache_lookup(self, request: dict[str, Any]) -> tuple[Optional[str], Optional[str]]:
+        if self.cache is None:
+            return None, None
+        key = self.cache.make_key(request["system_prompt"], request["user_prompt"], request["params"])
+        return key, self.cache.get(key)
+
+    def _cache_store(self, key: Optional[str], raw: str) -> None:
+        if key is None or self.cache is None or not raw or raw.strip().startswith("ERROR:"):
+            return
+        try:
+            # Only memoize answers we can use; a malformed one should be retried
+            self._parse_jsonlike(raw)
+        except Exception:
+            return
+        self.cache.set(key, raw)
+
+    @staticmethod
+    def _suggest_request(task: dict[str, Any], contexts: list[dict[str, Any]] | None) -> dict[str, Any]:
+        # 'now' is bucketed and the payload canonicalized so identical inputs share a cache key
+        now_iso = bucketed_now().isoformat()
         payload = {
             "task": task,
             "contexts": contexts or [],
             "now": now_iso,
         }
-        user_prompt = "Analyze and respond in JSON for this input (now is UTC '" + now_iso + "'):\n\n" + json.dumps(payload)
+        return {
+            "system_prompt": SYSTEM_PROMPT,
+            "user_prompt": "Analyze and respond in JSON for this input (now is UTC '" + now_iso + "'):\n\n" + json.dumps(payload, sort_keys=True),
+            "params": GenerateParams(max_tokens=500, temperature=0.2),
+        }
 
-        t0 = time.time()
-        raw = self.provider.generate(system_prompt=SYSTEM_PROMPT, user_prompt=user_prompt, params=GenerateParams(max_tokens=500, temperature=0.2))
+    def _bundle_from_raw(
+        self,
+        raw: str,
+        *,
+        task: dict[str, Any],
+        contexts: list[dict[str, Any]] | None,
+        t0: float,
+    ) -> AiSuggestionBundle:
         dt_ms = int((time.time() - t0) * 1000)
         logger = logging.getLogger(__name__)
         logger.info(
@@ -63,29 +182,7 @@ class AiOrchestrator:
         try:
             # Try to locate a JSON object within the text if the model added prose
             data = self._parse_jsonlike(raw)
-            # Normalize suggested_deadline to not be in the past
-            suggested = data.get("suggested_deadline")
-            normalized_deadline = None
-            if isinstance(suggested, str) and suggested.strip():
-                s = suggested.replace("Z", "+00:00")
-                try:
-                    dt = timezone.datetime.fromisoformat(s)
-                    if timezone.is_naive(dt):
-                        dt = timezone.make_aware(dt, timezone=timezone.utc)
-                    now = timezone.now()
-                    if dt < now:
-                        dt = now + timedelta(days=1)
-                    normalized_deadline = dt.astimezone(timezone.utc).isoformat()
-                except Exception:
-                    normalized_deadline = None
-
-            return AiSuggestionBundle(
-                priority_score=float(max(0.0, min(1.0, data.get("priority_score", 0.5)))),
-                suggested_deadline=normalized_deadline,
-                enhanced_description=data.get("enhanced_description", task.get("description", "")),
-                categories=data.get("categories", []),
-                reasoning=data.get("reasoning", ""),
-            )
+            return self._bundle_from_data(data, task=task)
         except Exception as e:
             logger.exception("ai.generate.parse_error", extra={"raw_prefix": (raw or "")[:200]})
             # Fallback minimal bundle
@@ -95,35 +192,240 @@ class AiOrchestrator:
                 enhanced_description=task.get("description", ""),
                 categories=[task.get("category_name")] if task.get("category_name") else [],
                 reasoning=f"Fallback due to parse error: {e.__class__.__name__}",
+                fallback=True,
             )
 
     @staticmethod
-    def _parse_jsonlike(text: str) -> dict[str, Any]:
-        if not text:
-            raise ValueError("empty response")
-        s = text.strip()
-        # Remove markdown code fences
-        if s.startswith("```"):
-            # Strip first fence
-            s = s.split("\n", 1)[1] if "\n" in s else s
-            # If it starts with a language hint like json
-            if s.lower().startswith("json\n"):
-                s = s[5:]
-            # Remove trailing fence
-            if "```" in s:
-                s = s.rsplit("```", 1)[0]
-        # Extract the widest {...}
-        start = s.find("{")
-        end = s.rfind("}")
-        candidate = s[start:end + 1] if start != -1 and end != -1 and end > start else s
+    def _bundle_from_data(data: dict[str, Any], *, task: dict[str, Any]) -> AiSuggestionBundle:
+        if not isinstance(data, dict):
+            raise ValueError("suggestion is not a JSON object")
+        # Normalize suggested_deadline to not be in the past
+        suggested = data.get("suggested_deadline")
+        normalized_deadline = None
+        if isinstance(suggested, str) and suggested.strip():
+            s = suggested.replace("Z", "+00:00")
+            try:
+                dt = timezone.datetime.fromisoformat(s)
+                if timezone.is_naive(dt):
+                    dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
+                now = timezone.now()
+                if dt < now:
+                    dt = now + timedelta(days=1)
+                normalized_deadline = dt.astimezone(dt_timezone.utc).isoformat()
+            except Exception:
+                normalized_deadline = None
+
+        return AiSuggestionBundle(
+            priority_score=float(max(0.0, min(1.0, data.get("priority_score", 0.5)))),
+            suggested_deadline=normalized_deadline,
+            enhanced_description=data.get("enhanced_description", task.get("description", "")),
+            categories=data.get("categories", []),
+            reasoning=str(data.get("reasoning") or ""),
+        )
+
+    # --- Batched prompting: N tasks per model call ---
+
+    def suggest_for_tasks(
+        self, items: list[tuple[str, dict[str, Any], list[dict[str, Any]]]]
+    ) -> dict[str, AiSuggestionBundle | Exception]:
+        """Suggest for many (key, task, contexts) items using as few model calls as the token budget allows.
+
+        Items the model leaves out or returns malformed are retried one by one with `suggest_for_task`.
+        As in `asuggest_for_tasks`, a failing batch maps its items to the exception and
+        the other batches are kept.
+        """
+        logger = logging.getLogger(__name__)
+        results: dict[str, AiSuggestionBundle | Exception] = {}
+        for batch in self._split_batches(items, output_tokens_per_item=BATCH_OUTPUT_TOKENS_PER_TASK):
+            try:
+                if len(batch) == 1:
+                    key, task, contexts = batch[0]
+                    results[key] = self.suggest_for_task(task=task, contexts=contexts)
+                    continue
+                raw = self._generate(self._batch_request(BATCH_SYSTEM_PROMPT, batch, BATCH_OUTPUT_TOKENS_PER_TASK))
+                parsed = self._parse_batch(raw, batch)
+            except Exception as e:
+                logger.warning("ai.suggest_for_tasks.batch_failed", extra={"size": len(batch), "error": e.__class__.__name__})
+                results.update({key: e for key, _, _ in batch})
+                continue
+            for (key, task, contexts), data in zip(batch, parsed):
+                try:
+                    results[key] = self._bundle_from_data(data, task=task)
+                except Exception:
+                    try:
+                        results[key] = self.suggest_for_task(task=task, contexts=contexts)
+                    except Exception as e:
+                        results[key] = e
+        return results
+
+    async def asuggest_for_tasks(
+        self,
+        items: list[tuple[str, dict[str, Any], list[dict[str, Any]]]],
+        *,
+        concurrency: int = 5,
+    ) -> dict[str, AiSuggestionBundle | Exception]:
+        """Async `suggest_for_tasks`: batches run concurrently, a failing batch maps its items to the exception."""
+        semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+        logger = logging.getLogger(__name__)
+
+        async def run_batch(batch):
+            async with semaphore:
+                try:
+                    if len(batch) == 1:
+                        key, task, contexts = batch[0]
+                        return {key: await self.asuggest_for_task(task=task, contexts=contexts)}
+                    raw = await self._agenerate(self._batch_request(BATCH_SYSTEM_PROMPT, batch, BATCH_OUTPUT_TOKENS_PER_TASK))
+                    parsed = self._parse_batch(raw, batch)
+                except Exception as e:
+                    logger.warning("ai.suggest_for_tasks.batch_failed", extra={"size": len(batch), "error": e.__class__.__name__})
+                    return {key: e for key, _, _ in batch}
+            out: dict[str, AiSuggestionBundle | Exception] = {}
+            retry = []
+            for (key, task, contexts), data in zip(batch, parsed):
+                try:
+                    out[key] = self._bundle_from_data(data, task=task)
+                except Exception:
+                    retry.append((key, task, contexts))
+            if retry:
+                out.update(await self.asuggest_many(retry, concurrency=concurrency))
+            return out
+
+        results: dict[str, AiSuggestionBundle | Exception] = {}
+        batches = self._split_batches(items, output_tokens_per_item=BATCH_OUTPUT_TOKENS_PER_TASK)
+        for partial in await asyncio.gather(*(run_batch(b) for b in batches)):
+            results.update(partial)
+        return results
+
+    def stream_suggestions_for_tasks(
+        self,
+        items: list[tuple[str, dict[str, Any], list[dict[str, Any]]]],
+        *,
+        concurrency: int = 1,
+    ) -> Iterator[tuple[str, AiSuggestionBundle | Exception]]:
+        """Yield (key, bundle) pairs as soon as each item's object is complete in the streamed answer.
+
+        With concurrency > 1, batches stream on worker threads and their results are
+        interleaved. Closing the generator stops the remaining work.
+        """
+        batches = self._split_batches(items, output_tokens_per_item=BATCH_OUTPUT_TOKENS_PER_TASK)
+        if concurrency <= 1 or len(batches) <= 1:
+            for batch in batches:
+                yield from self._stream_batch(batch)
+            return
+
+        done = object()
+        results: queue.Queue = queue.Queue()
+        cancelled = threading.Event()
+
+        def worker(batch):
+            pairs = self._stream_batch(batch)
+            try:
+                for pair in pairs:
+                    if cancelled.is_set():
+                        return
+                    results.put(pair)
+            finally:
+                pairs.close()
+                results.put(done)
+
+        executor = ThreadPoolExecutor(max_workers=min(int(concurrency), len(batches)), thread_name_prefix="ai-stream")
+        try:
+            for batch in batches:
+                executor.submit(worker, batch)
+            remaining = len(batches)
+            while remaining:
+                pair = results.get()
+                if pair is done:
+                    remaining -= 1
+                    continue
+                yield pair
+        finally:
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _stream_batch(self, batch: list[tuple]) -> Iterator[tuple[str, AiSuggestionBundle | Exception]]:
+        if len(batch) == 1:
+            key, task, contexts = batch[0]
+            try:
+                yield key, self.suggest_for_task(task=task, contexts=contexts)
+            except Exception as e:
+                yield key, e
+            return
+        pending = {f"t{i}": item for i, item in enumerate(batch)}
+        parser = IncrementalJsonParser(emit_depth=1)
+        try:
+            for chunk in self._stream(self._batch_request(BATCH_SYSTEM_PROMPT, batch, BATCH_OUTPUT_TOKENS_PER_TASK)):
+                for path, data in parser.feed(chunk):
+                    item = pending.get(path[0]) if len(path) == 1 else None
+                    if item is None:
+                        continue
+                    try:
+                        bundle = self._bundle_from_data(data, task=item[1])
+                    except Exception:
+                        continue  # retried singly below
+                    del pending[path[0]]
+                    yield item[0], bundle
+        except Exception as e:
+            logging.getLogger(__name__).warning("ai.stream_batch.failed", extra={"size": len(batch), "error": e.__class__.__name__})
+            for key, _, _ in pending.values():
+                yield key, e
+            return
+        for key, task, contexts in pending.values():
+            try:
+                yield key, self.suggest_for_task(task=task, contexts=contexts)
+            except Exception as e:
+                yield key, e
+
+    @staticmethod
+    def _split_batches(items: list[tuple], *, output_tokens_per_item: int) -> list[list[tuple]]:
+        """Greedy split so each batch fits the prompt budget and its answer fits the output cap."""
+        max_items = max(1, min(BATCH_MAX_ITEMS, BATCH_MAX_OUTPUT_TOKENS // max(1, output_tokens_per_item)))
+        batches: list[list[tuple]] = []
+        current: list[tuple] = []
+        used = 0
+        for item in items:
+            cost = estimate_json_tokens(item[1:])
+            if current and (used + cost > BATCH_PROMPT_TOKENS or len(current) >= max_items):
+                batches.append(current)
+                current, used = [], 0
+            current.append(item)
+            used += cost
+        if current:
+            batches.append(current)
+        return batches
+
+    @staticmethod
+    def _batch_request(system_prompt: str, batch: list[tuple], output_tokens_per_item: int) -> dict[str, Any]:
+        # Short positional keys keep the prompt small and are easy for the model to echo back
+        now_iso = bucketed_now().isoformat()
+        payload = {
+            "now": now_iso,
+            "items": [
+                {"key": f"t{i}", "task": task, "contexts": contexts or []}
+                for i, (_, task, contexts) in enumerate(batch)
+            ],
+        }
+        return {
+            "system_prompt": system_prompt,
+            "user_prompt": "Analyze each item and respond in JSON keyed by item key (now is UTC '" + now_iso + "'):\n\n" + json.dumps(payload, sort_keys=True),
+            "params": GenerateParams(max_tokens=min(BATCH_MAX_OUTPUT_TOKENS, output_tokens_per_item * len(batch)), temperature=0.2),
+        }
+
+    def _parse_batch(self, raw: str, batch: list[tuple]) -> list[Any]:
+        """Return the per-item answers in batch order; missing items come back as None."""
+        if raw and raw.strip().startswith("ERROR:"):
+            raise RuntimeError(raw.strip())
         try:
-            return json.loads(candidate)
+            data = self._parse_jsonlike(raw)
         except Exception:
-            # Attempt Python-literal parsing for single-quoted keys/strings
-            obj = ast.literal_eval(candidate)
-            if not isinstance(obj, dict):
-                raise ValueError("response is not a JSON object")
-            return obj
+            logging.getLogger(__name__).warning("ai.batch.parse_error", extra={"raw_prefix": (raw or "")[:200]})
+            return [None] * len(batch)
+        return [data.get(f"t{i}") for i in range(len(batch))]
+
+    @staticmethod
+    def _parse_jsonlike(text: str) -> dict[str, Any]:
+        # Single pass; skips prose/code fences around the object and accepts Python-style literals
+        return parse_json_object(text)
 
 
 # --- Advanced AI helpers ---
@@ -158,6 +460,13 @@ CONTEXT_ANALYSIS_SYSTEM = (
 )
 
 
+CONTEXT_ANALYSIS_BATCH_SYSTEM = (
+    "You analyze several context entries and respond ONLY JSON mapping each item's key to an object with keys: "
+    "keywords (array of strings), sentiment_score (float -1..1), has_urgency (bool), entities (array of strings), "
+    "reasoning (short)."
+)
+
+
 SCHEDULE_SYSTEM = (
     "You propose a small schedule plan for the given task and context. Respond ONLY JSON with keys: "
     "blocks (array of objects with start, end (ISO8601 UTC), label), recommended_deadline (ISO8601 or null), reasoning (short). "
@@ -165,16 +474,59 @@ SCHEDULE_SYSTEM = (
 )
 
 
+SCHEDULE_BATCH_SYSTEM = (
+    "You propose small schedule plans for several tasks, each with its own context. Respond ONLY JSON mapping each item's key "
+    "to an object with keys: blocks (array of objects with start, end (ISO8601 UTC), label), recommended_deadline (ISO8601 or null), "
+    "reasoning (short). Keep blocks within the next 7 days, avoid past times relative to now and do not overlap blocks across items."
+)
+
+
+PLAN_LABELS_SYSTEM = (
+    "You write labels for an already scheduled day plan; do not change any times. Respond ONLY JSON mapping each "
+    "item's key to an object with keys: label (short action phrase for its time blocks) and reasoning (one short sentence "
+    "on why it is scheduled where it is)."
+)
+
+
+SELECT_CONTEXTS_SYSTEM = (
+    "Select the most relevant contexts for the task. Respond ONLY JSON with key 'ids' as an array of up to K ids. "
+    "No extra keys."
+)
+
+
+TASKS_FROM_TEXT_SYSTEM = (
+    "Extract actionable tasks and any explicit or implied future deadlines. "
+    "Respond ONLY JSON with key 'tasks' as an array of objects with keys: "
+    "title (string), description (string), categories (array of strings), due_date (ISO8601 UTC or null). "
+    "Rules: (1) Interpret relative phrases like 'tomorrow' using the provided 'now' timestamp. "
+    "(2) Never return a due_date in the past; if ambiguous, choose the soonest future date. "
+    "(3) If only a date is known without time, set 09:00 UTC. Do not include extra keys or text."
+)
+
+
 class AiOrchestrator(AiOrchestrator):  # type: ignore[misc]
     def analyze_context(self, *, content: str, source_type: str) -> ContextAnalysis:
+        raw = self._generate(self._analyze_context_request(content, source_type))
+        return self._parse_context_analysis(raw)
+
+    async def aanalyze_context(self, *, content: str, source_type: str) -> ContextAnalysis:
+        raw = await self._agenerate(self._analyze_context_request(content, source_type))
+        return self._parse_context_analysis(raw)
+
+    @staticmethod
+    def _analyze_context_request(content: str, source_type: str) -> dict[str, Any]:
         payload = {"content": content, "source_type": source_type}
-        user_prompt = "Analyze and respond in JSON for this context:\n\n" + json.dumps(payload)
-        raw = self.provider.generate(
-            system_prompt=CONTEXT_ANALYSIS_SYSTEM,
-            user_prompt=user_prompt,
-            params=GenerateParams(max_tokens=300, temperature=0.2),
-        )
-        data = self._parse_jsonlike(raw)
+        return {
+            "system_prompt": CONTEXT_ANALYSIS_SYSTEM,
+            "user_prompt": "Analyze and respond in JSON for this context:\n\n" + json.dumps(payload, sort_keys=True),
+            "params": GenerateParams(max_tokens=300, temperature=0.2),
+        }
+
+    def _parse_context_analysis(self, raw: str) -> ContextAnalysis:
+        return self._context_analysis_from_data(self._parse_jsonlike(raw))
+
+    @staticmethod
+    def _context_analysis_from_data(data: dict[str, Any]) -> ContextAnalysis:
         return ContextAnalysis(
             keywords=list(data.get("keywords", [])),
             sentiment_score=float(max(-1.0, min(1.0, data.get("sentiment_score", 0.0)))),
@@ -183,56 +535,167 @@ class AiOrchestrator(AiOrchestrator):  # type: ignore[misc]
             reasoning=str(data.get("reasoning", "")),
         )
 
+    def analyze_contexts(self, items: list[tuple[str, str, str]]) -> dict[str, Optional[ContextAnalysis]]:
+        """Batched `analyze_context` for (key, content, source_type) items.
+
+        Entries the model leaves out or answers malformed map to None (as does a
+        whole batch on provider error) so callers can apply their own fallback
+        instead of paying for one more call per entry.
+        """
+        results: dict[str, Optional[ContextAnalysis]] = {}
+        batches = self._split_batches(
+            [(key, {"content": content, "source_type": source_type}) for key, content, source_type in items],
+            output_tokens_per_item=BATCH_OUTPUT_TOKENS_PER_CONTEXT,
+        )
+        for batch in batches:
+            if len(batch) == 1:
+                key, payload = batch[0]
+                try:
+                    results[key] = self.analyze_context(**payload)
+                except Exception:
+                    results[key] = None
+                continue
+            request = {
+                "system_prompt": CONTEXT_ANALYSIS_BATCH_SYSTEM,
+                "user_prompt": "Analyze each context and respond in JSON keyed by item key:\n\n"
+                + json.dumps({"items": [{"key": f"t{i}", **payload} for i, (_, payload) in enumerate(batch)]}, sort_keys=True),
+                "params": GenerateParams(
+                    max_tokens=min(BATCH_MAX_OUTPUT_TOKENS, BATCH_OUTPUT_TOKENS_PER_CONTEXT * len(batch)), temperature=0.2
+                ),
+            }
+            try:
+                parsed = self._parse_batch(self._generate(request), batch)
+            except RuntimeError:
+                parsed = [None] * len(batch)
+            for (key, _), data in zip(batch, parsed):
+                try:
+                    results[key] = self._context_analysis_from_data(data) if isinstance(data, dict) else None
+                except Exception:
+                    results[key] = None
+        return results
+
     def suggest_schedule(self, *, task: dict[str, Any], contexts: list[dict[str, Any]] | None = None) -> ScheduleSuggestion:
-        now_iso = timezone.now().isoformat()
+        raw = self._generate(self._schedule_request(task, contexts))
+        return self._parse_schedule(raw)
+
+    async def asuggest_schedule(self, *, task: dict[str, Any], contexts: list[dict[str, Any]] | None = None) -> ScheduleSuggestion:
+        raw = await self._agenerate(self._schedule_request(task, contexts))
+        return self._parse_schedule(raw)
+
+    @staticmethod
+    def _schedule_request(task: dict[str, Any], contexts: list[dict[str, Any]] | None) -> dict[str, Any]:
+        now_iso = bucketed_now().isoformat()
         payload = {"task": task, "contexts": contexts or [], "now": now_iso}
-        user_prompt = "Suggest schedule and respond in JSON (now is UTC '" + now_iso + "'):\n\n" + json.dumps(payload)
-        raw = self.provider.generate(
-            system_prompt=SCHEDULE_SYSTEM,
-            user_prompt=user_prompt,
-            params=GenerateParams(max_tokens=600, temperature=0.2),
-        )
+        return {
+            "system_prompt": SCHEDULE_SYSTEM,
+            "user_prompt": "Suggest schedule and respond in JSON (now is UTC '" + now_iso + "'):\n\n" + json.dumps(payload, sort_keys=True),
+            "params": GenerateParams(max_tokens=600, temperature=0.2),
+        }
+
+    def _parse_schedule(self, raw: str) -> ScheduleSuggestion:
         try:
             data = self._parse_jsonlike(raw)
-            blocks = []
-            for b in data.get("blocks", []) or []:
-                start = str(b.get("start"))
-                end = str(b.get("end"))
-                label = str(b.get("label", "Work"))
-                # best-effort sanitation
-                if start and end:
-                    blocks.append(TimeBlock(start=start, end=end, label=label))
-
-            # normalize deadline to not be in past
-            recommended = data.get("recommended_deadline")
-            normalized_deadline = None
-            if isinstance(recommended, str) and recommended.strip():
-                s = recommended.replace("Z", "+00:00")
+            return self._schedule_from_data(data)
+        except Exception:
+            return self._fallback_schedule()
+
+    @staticmethod
+    def _schedule_from_data(data: dict[str, Any]) -> ScheduleSuggestion:
+        if not isinstance(data, dict):
+            raise ValueError("schedule is not a JSON object")
+        blocks = []
+        for b in data.get("blocks", []) or []:
+            start = str(b.get("start"))
+            end = str(b.get("end"))
+            label = str(b.get("label", "Work"))
+            # best-effort sanitation
+            if start and end:
+                blocks.append(TimeBlock(start=start, end=end, label=label))
+
+        # normalize deadline to not be in past
+        recommended = data.get("recommended_deadline")
+        normalized_deadline = None
+        if isinstance(recommended, str) and recommended.strip():
+            s = recommended.replace("Z", "+00:00")
+            try:
+                dt = timezone.datetime.fromisoformat(s)
+                if timezone.is_naive(dt):
+                    dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
+                if dt < timezone.now():
+                    dt = timezone.now() + timedelta(days=1)
+                normalized_deadline = dt.astimezone(dt_timezone.utc).isoformat()
+            except Exception:
+                normalized_deadline = None
+
+        return ScheduleSuggestion(
+            blocks=blocks,
+            recommended_deadline=normalized_deadline,
+            reasoning=str(data.get("reasoning", "")),
+        )
+
+    @staticmethod
+    def _fallback_schedule() -> ScheduleSuggestion:
+        # Fallback minimal one-block suggestion: tomorrow 09:00-11:00 UTC
+        tomorrow = (timezone.now() + timedelta(days=1)).astimezone(dt_timezone.utc)
+        start = tomorrow.replace(hour=9, minute=0, second=0, microsecond=0).isoformat()
+        end = tomorrow.replace(hour=11, minute=0, second=0, microsecond=0).isoformat()
+        return ScheduleSuggestion(
+            blocks=[TimeBlock(start=start, end=end, label="Work on task")],
+            recommended_deadline=None,
+            reasoning="Fallback window suggested",
+        )
+
+    def suggest_schedules(self, items: list[tuple[str, dict[str, Any], list[dict[str, Any]]]]) -> dict[str, ScheduleSuggestion]:
+        """Batched `suggest_schedule` for (key, task, contexts) items; malformed items are retried singly."""
+        results: dict[str, ScheduleSuggestion] = {}
+        for batch in self._split_batches(items, output_tokens_per_item=BATCH_OUTPUT_TOKENS_PER_SCHEDULE):
+            if len(batch) == 1:
+                key, task, contexts = batch[0]
+                results[key] = self.suggest_schedule(task=task, contexts=contexts)
+                continue
+            raw = self._generate(self._batch_request(SCHEDULE_BATCH_SYSTEM, batch, BATCH_OUTPUT_TOKENS_PER_SCHEDULE))
+            try:
+                parsed = self._parse_batch(raw, batch)
+            except RuntimeError:
+                # Provider error: retrying item by item would only multiply failing calls
+                for key, _, _ in batch:
+                    results[key] = self._fallback_schedule()
+                continue
+            for (key, task, contexts), data in zip(batch, parsed):
                 try:
-                    dt = timezone.datetime.fromisoformat(s)
-                    if timezone.is_naive(dt):
-                        dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
-                    if dt < timezone.now():
-                        dt = timezone.now() + timedelta(days=1)
-                    normalized_deadline = dt.astimezone(dt_timezone.utc).isoformat()
+                    results[key] = self._schedule_from_data(data)
                 except Exception:
-                    normalized_deadline = None
+                    results[key] = self.suggest_schedule(task=task, contexts=contexts)
+        return results
 
-            return ScheduleSuggestion(
-                blocks=blocks,
-                recommended_deadline=normalized_deadline,
-                reasoning=str(data.get("reasoning", "")),
-            )
+    def label_plan(self, items: list[dict[str, Any]]) -> dict[str, dict[str, str]]:
+        """One call that labels a finished plan: {key: {label, reasoning}} for each item carrying a `key`.
+
+        Items the model skips or mangles are simply left out; callers keep their own labels.
+        """
+        if not items:
+            return {}
+        request = {
+            "system_prompt": PLAN_LABELS_SYSTEM,
+            "user_prompt": json.dumps({"items": items}, sort_keys=True, default=str),
+            "params": GenerateParams(max_tokens=min(BATCH_MAX_OUTPUT_TOKENS, 60 * len(items) + 100), temperature=0.2),
+        }
+        raw = self._generate(request)
+        if raw.strip().startswith("ERROR:"):
+            return {}
+        try:
+            data = self._parse_jsonlike(raw)
         except Exception:
-            # Fallback minimal one-block suggestion: tomorrow 09:00-11:00 UTC
-            tomorrow = (timezone.now() + timedelta(days=1)).astimezone(dt_timezone.utc)
-            start = tomorrow.replace(hour=9, minute=0, second=0, microsecond=0).isoformat()
-            end = tomorrow.replace(hour=11, minute=0, second=0, microsecond=0).isoformat()
-            return ScheduleSuggestion(
-                blocks=[TimeBlock(start=start, end=end, label="Work on task")],
-                recommended_deadline=None,
-                reasoning="Fallback window suggested",
-            )
+            return {}
+        labels: dict[str, dict[str, str]] = {}
+        for item in items:
+            entry = data.get(item["key"])
+            if isinstance(entry, dict) and entry.get("label"):
+                labels[item["key"]] = {
+                    "label": str(entry["label"])[:120],
+                    "reasoning": str(entry.get("reasoning") or "")[:300],
+                }
+        return labels
 
     def select_context_ids(self, *, task: dict[str, Any], contexts: list[dict[str, Any]], k: int = 5) -> list[str]:
         """Ask the model to pick up to k most relevant context IDs for the task.
@@ -240,16 +703,24 @@ class AiOrchestrator(AiOrchestrator):  # type: ignore[misc]
         Returns a list of context IDs (strings). Falls back to naive selection.
         """
         k = max(1, min(10, int(k or 5)))
-        system = (
-            "Select the most relevant contexts for the task. Respond ONLY JSON with key 'ids' as an array of up to K ids. "
-            "No extra keys."
-        )
+        raw = self._generate(self._select_contexts_request(task, contexts, k))
+        return self._parse_selected_ids(raw, contexts, k)
+
+    async def aselect_context_ids(self, *, task: dict[str, Any], contexts: list[dict[str, Any]], k: int = 5) -> list[str]:
+        k = max(1, min(10, int(k or 5)))
+        raw = await self._agenerate(self._select_contexts_request(task, contexts, k))
+        return self._parse_selected_ids(raw, contexts, k)
+
+    @staticmethod
+    def _select_contexts_request(task: dict[str, Any], contexts: list[dict[str, Any]], k: int) -> dict[str, Any]:
         payload = {"task": task, "contexts": contexts, "k": k}
-        raw = self.provider.generate(
-            system_prompt=system,
-            user_prompt="k=" + str(k) + "\n" + json.dumps(payload),
-            params=GenerateParams(max_tokens=200, temperature=0.1),
-        )
+        return {
+            "system_prompt": SELECT_CONTEXTS_SYSTEM,
+            "user_prompt": "k=" + str(k) + "\n" + json.dumps(payload, sort_keys=True),
+            "params": GenerateParams(max_tokens=200, temperature=0.1),
+        }
+
+    def _parse_selected_ids(self, raw: str, contexts: list[dict[str, Any]], k: int) -> list[str]:
         try:
             data = self._parse_jsonlike(raw)
             ids = [str(x) for x in (data.get("ids") or [])][:k]
@@ -265,59 +736,66 @@ class AiOrchestrator(AiOrchestrator):  # type: ignore[misc]
 
         Returns list of { title, description, categories, due_date } where due_date is ISO8601 UTC string or null.
         """
-        system = (
-            "Extract actionable tasks and any explicit or implied future deadlines. "
-            "Respond ONLY JSON with key 'tasks' as an array of objects with keys: "
-            "title (string), description (string), categories (array of strings), due_date (ISO8601 UTC or null). "
-            "Rules: (1) Interpret relative phrases like 'tomorrow' using the provided 'now' timestamp. "
-            "(2) Never return a due_date in the past; if ambiguous, choose the soonest future date. "
-            "(3) If only a date is known without time, set 09:00 UTC. Do not include extra keys or text."
-        )
-        now_iso = timezone.now().astimezone(dt_timezone.utc).isoformat()
-        user_prompt = "now=" + now_iso + "\n" + text
-        raw = self.provider.generate(
-            system_prompt=system,
-            user_prompt=user_prompt,
-            params=GenerateParams(max_tokens=800, temperature=0.2),
-        )
+        raw = self._generate(self._tasks_from_text_request(text))
         data = self._parse_jsonlike(raw)
-        tasks: list[dict[str, Any]] = []
-        for t in data.get("tasks", []) or []:
-            title = str(t.get("title", "")).strip()[:200]
-            description = str(t.get("description", "")).strip()
-            categories = [str(x) for x in (t.get("categories") or [])]
-            due_raw = t.get("due_date") or None
-            normalized_due: Optional[str] = None
-            if isinstance(due_raw, str) and due_raw.strip():
-                # Try strict ISO first; otherwise fall back to robust natural language parsing
-                s = due_raw.replace("Z", "+00:00")
-                dt = None
-                try:
-                    dt = timezone.datetime.fromisoformat(s)
-                    if timezone.is_naive(dt):
-                        dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
-                except Exception:
-                    pass
-                if dt is None:
-                    parsed = dateparser.parse(due_raw, settings={
-                        'RELATIVE_BASE': timezone.now().astimezone(dt_timezone.utc).replace(tzinfo=None),
-                        'RETURN_AS_TIMEZONE_AWARE': False,
-                        'PREFER_DATES_FROM': 'future',
-                        'TIMEZONE': 'UTC',
-                    })
-                    if parsed:
-                        dt = timezone.make_aware(parsed, timezone=dt_timezone.utc)
-                if dt is not None:
-                    now = timezone.now().astimezone(dt_timezone.utc)
-                    if dt < now:
-                        dt = (now + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
-                    normalized_due = dt.astimezone(dt_timezone.utc).isoformat()
-            tasks.append({
-                "title": title,
-                "description": description,
-                "categories": categories,
-                "due_date": normalized_due,
-            })
-        return tasks
+        return [self._normalize_generated_task(t) for t in data.get("tasks", []) or []]
+
+    def stream_tasks_from_text(self, *, text: str) -> Iterator[dict[str, Any]]:
+        """Streaming `generate_tasks_from_text`: yields each task as soon as its object is complete."""
+        parser = IncrementalJsonParser(emit_depth=2)
+        for chunk in self._stream(self._tasks_from_text_request(text)):
+            for path, data in parser.feed(chunk):
+                if len(path) == 2 and path[0] == "tasks" and isinstance(data, dict):
+                    yield self._normalize_generated_task(data)
+
+    async def agenerate_tasks_from_text(self, *, text: str) -> list[dict[str, Any]]:
+        raw = await self._agenerate(self._tasks_from_text_request(text))
+        data = self._parse_jsonlike(raw)
+        return [self._normalize_generated_task(t) for t in data.get("tasks", []) or []]
 
+    @staticmethod
+    def _tasks_from_text_request(text: str) -> dict[str, Any]:
+        now_iso = bucketed_now().isoformat()
+        return {
+            "system_prompt": TASKS_FROM_TEXT_SYSTEM,
+            "user_prompt": "now=" + now_iso + "\n" + text,
+            "params": GenerateParams(max_tokens=800, temperature=0.2),
+        }
 
+    @staticmethod
+    def _normalize_generated_task(t: dict[str, Any]) -> dict[str, Any]:
+        title = str(t.get("title", "")).strip()[:200]
+        description = str(t.get("description", "")).strip()
+        categories = [str(x) for x in (t.get("categories") or [])]
+        due_raw = t.get("due_date") or None
+        normalized_due: Optional[str] = None
+        if isinstance(due_raw, str) and due_raw.strip():
+            # Try strict ISO first; otherwise fall back to robust natural language parsing
+            s = due_raw.replace("Z", "+00:00")
+            dt = None
+            try:
+                dt = timezone.datetime.fromisoformat(s)
+                if timezone.is_naive(dt):
+                    dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
+            except Exception:
+                pass
+            if dt is None:
+                parsed = dateparser.parse(due_raw, settings={
+                    'RELATIVE_BASE': timezone.now().astimezone(dt_timezone.utc).replace(tzinfo=None),
+                    'RETURN_AS_TIMEZONE_AWARE': False,
+                    'PREFER_DATES_FROM': 'future',
+                    'TIMEZONE': 'UTC',
+                })
+                if parsed:
+                    dt = timezone.make_aware(parsed, timezone=dt_timezone.utc)
+            if dt is not None:
+                now = timezone.now().astimezone(dt_timezone.utc)
+                if dt < now:
+                    dt = (now + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0)
+                normalized_due = dt.astimezone(dt_timezone.utc).isoformat()
+        return {
+            "title": title,
+            "description": description,
+            "categories": categories,
+            "due_date": normalized_due,
+        }
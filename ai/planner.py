@@ -0,0 +1,267 @@
+"""Deterministic day planner: packs tasks into non-overlapping blocks within working hours.
+
+Tasks whose deadline falls inside the planning horizon are placed earliest
+deadline first; the rest follow by priority. Each task's estimated effort is
+split into blocks of `min_block_minutes`..`max_block_minutes` and put into the
+earliest free time that fits. No model call is involved; labels and reasoning
+can be filled in afterwards (see `AiOrchestrator.label_plan`).
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from typing import Any, Iterable, Optional
+from zoneinfo import ZoneInfo
+
+
+DEFAULT_EFFORT_MINUTES = 30
+MAX_EFFORT_MINUTES = 240
+# Extra effort assumed per 100 words of description when no estimate is stored
+EFFORT_MINUTES_PER_100_WORDS = 15
+
+
+def _env(name: str, default: str) -> str:
+    value = os.environ.get(name)
+    return value if value not in (None, "") else default
+
+
+def _parse_clock(value: str) -> time:
+    hours, _, minutes = value.strip().partition(":")
+    return time(int(hours), int(minutes or 0))
+
+
+@dataclass(frozen=True)
+class WorkingHours:
+    start: time = time(9, 0)
+    end: time = time(17, 30)
+    weekdays: frozenset[int] = frozenset(range(5))  # Monday=0
+    tz: str = "UTC"
+
+    @classmethod
+    def from_env(cls) -> "WorkingHours":
+        return cls(
+            start=_parse_clock(_env("AI_PLAN_DAY_START", "09:00")),
+            end=_parse_clock(_env("AI_PLAN_DAY_END", "17:30")),
+            weekdays=frozenset(int(d) for d in _env("AI_PLAN_WEEKDAYS", "0,1,2,3,4").split(",") if d.strip()),
+            tz=_env("AI_PLAN_TIMEZONE", "UTC"),
+        )
+
+    def windows(self, now: datetime, days: int) -> list[tuple[datetime, datetime]]:
+        """Working intervals (UTC) for the next `days` working days that still have time left after `now`."""
+        zone = ZoneInfo(self.tz)
+        local_now = now.astimezone(zone)
+        out: list[tuple[datetime, datetime]] = []
+        day = local_now.date()
+        # Bounded so an empty weekday set cannot loop forever
+        for _ in range(days + 14):
+            if len(out) >= days:
+                break
+            if day.weekday() in self.weekdays:
+                start = datetime.combine(day, self.start, zone).astimezone(dt_timezone.utc)
+                end = datetime.combine(day, self.end, zone).astimezone(dt_timezone.utc)
+                start = max(start, now)
+                if end > start:
+                    out.append((start, end))
+            day += timedelta(days=1)
+        return out
+
+
+@dataclass(frozen=True)
+class PlanConstraints:
+    hours: WorkingHours = field(default_factory=WorkingHours)
+    horizon_days: int = 1
+    # Block starts are aligned to this grid
+    slot_minutes: int = 15
+    min_block_minutes: int = 30
+    max_block_minutes: int = 120
+    break_minutes: int = 10
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "PlanConstraints":
+        values: dict[str, Any] = {
+            "hours": WorkingHours.from_env(),
+            "horizon_days": int(_env("AI_PLAN_HORIZON_DAYS", "1")),
+            "slot_minutes": int(_env("AI_PLAN_SLOT_MINUTES", "15")),
+            "min_block_minutes": int(_env("AI_PLAN_MIN_BLOCK_MINUTES", "30")),
+            "max_block_minutes": int(_env("AI_PLAN_MAX_BLOCK_MINUTES", "120")),
+            "break_minutes": int(_env("AI_PLAN_BREAK_MINUTES", "10")),
+        }
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**values)
+
+
+@dataclass(frozen=True)
+class PlanItem:
+    key: str
+    title: str
+    priority: float = 0.0
+    due: Optional[datetime] = None
+    effort_minutes: int = DEFAULT_EFFORT_MINUTES
+
+
+@dataclass(frozen=True)
+class PlannedBlock:
+    key: str
+    start: datetime
+    end: datetime
+
+
+@dataclass
+class DayPlan:
+    now: datetime
+    # Blocks per item key, in time order; only items that got at least one block
+    blocks: dict[str, list[PlannedBlock]] = field(default_factory=dict)
+    # Items with remaining effort that did not fit, with the minutes left over
+    unplaced: dict[str, int] = field(default_factory=dict)
+    # Items whose last block ends after their due date
+    late: set[str] = field(default_factory=set)
+
+    def ordered_keys(self) -> list[str]:
+        return sorted(self.blocks, key=lambda k: self.blocks[k][0].start)
+
+
+def estimate_effort_minutes(task: dict[str, Any]) -> int:
+    """Stored estimate (`ai_metadata.estimated_minutes`) or a guess from the description length."""
+    meta = task.get("ai_metadata") or {}
+    try:
+        stored = int(meta.get("estimated_minutes") or 0)
+    except (TypeError, ValueError):
+        stored = 0
+    if stored > 0:
+        return min(stored, MAX_EFFORT_MINUTES * 4)
+    words = len(str(task.get("description") or "").split())
+    return min(MAX_EFFORT_MINUTES, DEFAULT_EFFORT_MINUTES + EFFORT_MINUTES_PER_100_WORDS * (words // 100))
+
+
+class FreeSlots:
+    """Disjoint free intervals kept sorted by start.
+
+    Every placement takes time from the start of a free interval or splits it,
+    so the intervals never overlap and a sorted list with bisect gives the same
+    lookups an interval tree would.
+    """
+
+    def __init__(self, intervals: Iterable[tuple[datetime, datetime]]):
+        merged: list[list[datetime]] = []
+        for start, end in sorted(intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self._starts = [s for s, _ in merged]
+        self._ends = [e for _, e in merged]
+
+    def __iter__(self):
+        return iter(zip(self._starts, self._ends))
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def reserve(self, start: datetime, end: datetime) -> None:
+        """Remove [start, end) from the free time (e.g. an existing meeting)."""
+        i = max(0, bisect.bisect_right(self._starts, start) - 1)
+        while i < len(self._starts) and self._starts[i] < end:
+            s, e = self._starts[i], self._ends[i]
+            if e <= start:
+                i += 1
+                continue
+            pieces = [(s, start)] if s < start else []
+            if e > end:
+                pieces.append((end, e))
+            self._starts[i:i + 1] = [p[0] for p in pieces]
+            self._ends[i:i + 1] = [p[1] for p in pieces]
+            i += len(pieces)
+
+    def first_fit(self, minutes: int, grid: int) -> Optional[tuple[datetime, datetime]]:
+        """Earliest grid-aligned interval with at least `minutes` free, as (start, end of that free interval)."""
+        need = timedelta(minutes=minutes)
+        for s, e in zip(self._starts, self._ends):
+            start = _align(s, grid)
+            if e - start >= need:
+                return start, e
+        return None
+
+
+def _align(value: datetime, grid: int) -> datetime:
+    # Round up to the next multiple of `grid` minutes since the epoch
+    grid = max(1, grid)
+    minutes = math.ceil(value.timestamp() / 60.0 / grid - 1e-9) * grid
+    return datetime.fromtimestamp(minutes * 60.0, tz=value.tzinfo or dt_timezone.utc)
+
+
+def _order(items: list[PlanItem], horizon_end: datetime) -> list[PlanItem]:
+    # Deadlines inside the horizon go first, earliest deadline first; everything
+    # else (later or no deadline) by priority
+    def key(item: PlanItem):
+        pressing = item.due is not None and item.due <= horizon_end
+        return (
+            0 if pressing else 1,
+            item.due.timestamp() if pressing else -item.priority,
+            -item.priority,
+            item.key,
+        )
+
+    return sorted(items, key=key)
+
+
+def plan_day(
+    items: Iterable[PlanItem],
+    *,
+    now: datetime,
+    constraints: Optional[PlanConstraints] = None,
+    busy: Iterable[tuple[datetime, datetime]] = (),
+) -> DayPlan:
+    """Pack `items` into non-overlapping blocks in the working windows after `now`."""
+    c = constraints or PlanConstraints()
+    windows = c.hours.windows(now, max(1, c.horizon_days))
+    free = FreeSlots(windows)
+    for start, end in busy:
+        free.reserve(start, end)
+    plan = DayPlan(now=now)
+    if not windows:
+        plan.unplaced = {item.key: item.effort_minutes for item in items}
+        return plan
+
+    horizon_end = windows[-1][1]
+    brk = timedelta(minutes=c.break_minutes)
+    # Free time only shrinks, so once a block of this length has not fit, no longer one will
+    no_fit = math.inf
+    for item in _order(list(items), horizon_end):
+        remaining = max(c.slot_minutes, int(item.effort_minutes))
+        while remaining > 0:
+            need = min(remaining, c.min_block_minutes)
+            fit = free.first_fit(need, c.slot_minutes) if need < no_fit else None
+            if fit is None:
+                no_fit = min(no_fit, need)
+                break
+            start, slot_end = fit
+            available = int((slot_end - start).total_seconds() // 60)
+            minutes = min(remaining, c.max_block_minutes, available)
+            end = start + timedelta(minutes=minutes)
+            plan.blocks.setdefault(item.key, []).append(PlannedBlock(item.key, start, end))
+            free.reserve(start, min(slot_end, end + brk))
+            remaining -= minutes
+        if remaining > 0:
+            plan.unplaced[item.key] = remaining
+        blocks = plan.blocks.get(item.key)
+        if blocks and item.due is not None and blocks[-1].end > item.due:
+            plan.late.add(item.key)
+    return plan
+
+
+def default_reasoning(item: PlanItem, plan: DayPlan) -> str:
+    parts = []
+    if item.due is not None:
+        parts.append(f"due {item.due.astimezone(dt_timezone.utc):%a %H:%M} UTC")
+    parts.append(f"priority {item.priority:.2f}")
+    parts.append(f"~{item.effort_minutes} min")
+    if item.key in plan.late:
+        parts.append("cannot finish before the deadline")
+    if item.key in plan.unplaced:
+        parts.append(f"{plan.unplaced[item.key]} min did not fit")
+    return "; ".join(parts)
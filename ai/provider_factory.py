@@ -1,14 +1,65 @@
 from __future__ import annotations
 
 import os
+import threading
 from typing import Optional
 
 from .providers.base import AiProvider
 from .providers.openai_provider import OpenAiProvider
+from .ratelimit import rate_limited
 
 
-def get_provider() -> AiProvider:
-    provider = os.environ.get("AI_PROVIDER", "openai").lower()
+# Process-wide provider cache. Providers own pooled HTTP clients, so building one
+# per request would throw away keep-alive connections on every AI call.
+_lock = threading.Lock()
+_cached: Optional[tuple[tuple, AiProvider]] = None
+
+
+def _config_key() -> tuple:
+    names = (
+        "AI_PROVIDER",
+        "OPENAI_MODEL",
+        "OPENAI_API_KEY",
+        "OPENAI_BASE_URL",
+        "LM_STUDIO_BASE_URL",
+        "LM_STUDIO_MODEL",
+        "AI_HTTP_POOL_SIZE",
+        "AI_HTTP_KEEPALIVE_CONNECTIONS",
+        "AI_HTTP_KEEPALIVE_EXPIRY",
+        "AI_HTTP_TIMEOUT",
+        "AI_HTTP2",
+        "AI_HTTP_RETRIES",
+        "AI_BREAKER_WINDOW",
+        "AI_BREAKER_MIN_CALLS",
+        "AI_BREAKER_ERROR_RATE",
+        "AI_BREAKER_SLOW_CALL_SECONDS",
+        "AI_BREAKER_OPEN_SECONDS",
+        "AI_HEDGE",
+        "AI_HEDGE_QUANTILE",
+        "AI_HEDGE_INITIAL_DELAY",
+        "AI_HEDGE_MIN_DELAY",
+        "AI_HEDGE_MAX_DELAY",
+        "AI_HEDGE_WORKERS",
+        "AI_FAKE_SEED",
+        "AI_FAKE_LATENCY_MS",
+        "AI_FAKE_LATENCY_SIGMA",
+        "AI_FAKE_ERROR_RATE",
+        "AI_FAKE_TOKENS_PER_SECOND",
+        "AI_FAKE_CHUNK_CHARS",
+        "AI_CASSETTE_MODE",
+        "AI_CASSETTE_PATH",
+        "AI_CASSETTE_REPLAY_LATENCY",
+    )
+    # Rate limits may be set per provider (AI_RATE_OPENAI_RPM) or for all (AI_RATE_RPM)
+    rate = tuple(sorted((k, v) for k, v in os.environ.items() if k.startswith("AI_RATE_")))
+    return tuple(os.environ.get(name) for name in names) + rate
+
+
+def _build_single(provider: str) -> AiProvider:
+    if provider == "fake":
+        from .providers.fake_provider import FakeProvider
+
+        return FakeProvider.from_env()
     if provider == "lmstudio":
         from .providers.lmstudio_provider import LmStudioProvider
 
@@ -17,6 +68,83 @@ def get_provider() -> AiProvider:
             model=os.environ.get("LM_STUDIO_MODEL", "qwen2.5:3b"),
         )
     # default to openai
-    return OpenAiProvider()
+    return OpenAiProvider(
+        model=os.environ.get("OPENAI_MODEL", "gpt-4o-mini"),
+        api_key=os.environ.get("OPENAI_API_KEY", "fall-back-key-hardcode-here"),
+        base_url=os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1"),
+    )
+
+
+def _build_chain() -> AiProvider:
+    # AI_PROVIDER may be an ordered failover chain, e.g. "openai,lmstudio"
+    names = [name.strip().lower() for name in os.environ.get("AI_PROVIDER", "openai").split(",") if name.strip()]
+    names = list(dict.fromkeys(names)) or ["openai"]
+    if len(names) == 1:
+        return rate_limited(names[0], _build_single(names[0]))
+    from .providers.composite import FailoverProvider
+
+    # Each member is limited separately, so a throttled primary fails over to the next.
+    # FailoverProvider applies the limiter outside its circuit breakers (see its docstring)
+    return FailoverProvider(providers=[(name, rate_limited(name, _build_single(name))) for name in names])
+
+
+def _build_provider() -> AiProvider:
+    mode = os.environ.get("AI_CASSETTE_MODE", "").lower()
+    if mode not in ("record", "replay", "auto"):
+        return _build_chain()
+    from .providers.cassette import CassetteProvider
+
+    # Replay never touches the network, so don't build (or require keys for) the real chain
+    return CassetteProvider(
+        inner=None if mode == "replay" else _build_chain(),
+        path=os.environ.get("AI_CASSETTE_PATH", "ai_cassette.jsonl"),
+        mode=mode,
+        replay_latency=os.environ.get("AI_CASSETTE_REPLAY_LATENCY", "false").lower() in ("1", "true", "yes"),
+    )
+
+
+def provider_stats() -> Optional[dict]:
+    """Circuit breaker state per provider when a failover chain is configured."""
+    cached = _cached
+    provider = cached[1] if cached else None
+    provider = getattr(provider, "inner", provider)
+    stats = getattr(provider, "stats", None)
+    return stats() if callable(stats) else None
+
+
+def get_provider() -> AiProvider:
+    """Return the provider for the current configuration, shared by the whole process.
+
+    The cache is keyed on the provider environment so a config change builds a new
+    provider. Pooled clients inside providers are rebuilt per pid, which keeps this
+    safe under gunicorn preload and Celery prefork.
+    """
+    global _cached
+    key = _config_key()
+    cached = _cached
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _lock:
+        if _cached is None or _cached[0] != key:
+            _cached = (key, _build_provider())
+        return _cached[1]
+
+
+def reset_provider_cache() -> None:
+    global _cached
+    with _lock:
+        cached, _cached = _cached, None
+    close = getattr(cached[1], "close", None) if cached else None
+    if callable(close):
+        close()
+
+
+def _reset_after_fork() -> None:
+    global _lock
+    # The parent's lock may have been held at fork time; the provider itself is
+    # fork-aware and can be kept.
+    _lock = threading.Lock()
 
 
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import asyncio
 from dataclasses import dataclass
-from typing import Protocol
+from typing import Iterator, Protocol
 
 
 @dataclass
@@ -13,4 +14,21 @@ class GenerateParams:
 class AiProvider(Protocol):
     def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str: ...
 
+    async def agenerate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        """Async variant of `generate`.
 
+        The default runs the blocking call in a worker thread so it keeps using the
+        provider's process-wide connection pool; under WSGI every request gets a new
+        event loop, which would discard a loop-bound async client each time.
+        """
+        return await asyncio.to_thread(
+            self.generate, system_prompt=system_prompt, user_prompt=user_prompt, params=params
+        )
+
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        """Yield the completion as text chunks.
+
+        Errors before any output are yielded as a single "ERROR: ..." chunk, like
+        `generate`. The default yields the whole completion at once.
+        """
+        yield self.generate(system_prompt=system_prompt, user_prompt=user_prompt, params=params)
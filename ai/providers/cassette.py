@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator, Optional
+
+from .base import AiProvider, GenerateParams
+
+
+RECORD, REPLAY, AUTO = "record", "replay", "auto"
+
+# The orchestrator stamps prompts with the current time; leave it out of the key
+# so a cassette recorded today still replays tomorrow.
+_NOW_PATTERNS = (
+    re.compile(r'"now": "[^"]*"'),
+    re.compile(r"now is UTC '[^']*'"),
+    re.compile(r"^now=\S*", re.MULTILINE),
+)
+
+
+def cassette_key(system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+    for pattern in _NOW_PATTERNS:
+        user_prompt = pattern.sub("now", user_prompt)
+    material = json.dumps({"system": system_prompt, "user": user_prompt, "params": asdict(params)}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CassetteProvider(AiProvider):
+    """Record provider traffic to a JSONL file, or replay it offline.
+
+    `record` calls the wrapped provider and appends every answer (with its
+    latency and stream chunks) to `path`; "ERROR: ..." answers (timeouts,
+    429s, open circuits) are passed through but not recorded. `replay` answers only from the file;
+    repeated prompts cycle through their recordings in order and a miss is an
+    "ERROR: CassetteMiss" answer. `auto` replays hits and records misses. With
+    `replay_latency` the recorded latency is reproduced.
+    """
+
+    inner: Optional[AiProvider]
+    path: str
+    mode: str = REPLAY
+    replay_latency: bool = False
+    _entries: dict[str, list[dict[str, Any]]] = field(default_factory=lambda: defaultdict(list), init=False, repr=False)
+    _cursor: dict[str, int] = field(default_factory=lambda: defaultdict(int), init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        if self.mode in (REPLAY, AUTO):
+            self._load()
+
+    # --- AiProvider ---
+
+    def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        key = cassette_key(system_prompt, user_prompt, params)
+        entry = self._next(key)
+        if entry is not None:
+            if self.replay_latency:
+                time.sleep(entry.get("latency", 0.0))
+            return entry["response"]
+        if self.inner is None or self.mode == REPLAY:
+            return f"ERROR: CassetteMiss: {key[:12]}"
+        started = time.monotonic()
+        response = self.inner.generate(system_prompt=system_prompt, user_prompt=user_prompt, params=params)
+        self._record(key, response, time.monotonic() - started)
+        return response
+
+    async def agenerate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        key = cassette_key(system_prompt, user_prompt, params)
+        entry = self._next(key)
+        if entry is not None:
+            if self.replay_latency:
+                await asyncio.sleep(entry.get("latency", 0.0))
+            return entry["response"]
+        if self.inner is None or self.mode == REPLAY:
+            return f"ERROR: CassetteMiss: {key[:12]}"
+        started = time.monotonic()
+        response = await self.inner.agenerate(system_prompt=system_prompt, user_prompt=user_prompt, params=params)
+        self._record(key, response, time.monotonic() - started)
+        return response
+
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        key = cassette_key(system_prompt, user_prompt, params)
+        entry = self._next(key)
+        if entry is not None:
+            chunks = entry.get("chunks") or [entry["response"]]
+            pause = entry.get("latency", 0.0) / len(chunks) if self.replay_latency else 0.0
+            for chunk in chunks:
+                if pause:
+                    time.sleep(pause)
+                yield chunk
+            return
+        if self.inner is None or self.mode == REPLAY:
+            yield f"ERROR: CassetteMiss: {key[:12]}"
+            return
+        started = time.monotonic()
+        chunks: list[str] = []
+        for chunk in self.inner.stream(system_prompt=system_prompt, user_prompt=user_prompt, params=params):
+            chunks.append(chunk)
+            yield chunk
+        # Only complete streams are recorded
+        self._record(key, "".join(chunks), time.monotonic() - started, chunks)
+
+    def close(self) -> None:
+        close = getattr(self.inner, "close", None)
+        if callable(close):
+            close()
+
+    # --- storage ---
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a torn last line from an interrupted recording
+                self._entries[entry["key"]].append(entry)
+
+    def _next(self, key: str) -> Optional[dict[str, Any]]:
+        if self.mode == RECORD:
+            return None
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = self._cursor[key]
+            self._cursor[key] = index + 1
+            return entries[index % len(entries)]
+
+    def _record(self, key: str, response: str, latency: float, chunks: Optional[list[str]] = None) -> None:
+        if response.startswith("ERROR:"):
+            # A transient failure would otherwise be replayed as a hit forever
+            return
+        entry: dict[str, Any] = {"key": key, "response": response, "latency": round(latency, 4)}
+        if chunks is not None and len(chunks) > 1:
+            entry["chunks"] = chunks
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._entries[key].append(entry)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
@@ -0,0 +1,427 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, Sequence
+
+from ..ratelimit import RateLimitedProvider, RateLimiter, RateLimitTimeout, request_cost
+from .base import AiProvider, GenerateParams
+from .http import ProcessLocal
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _is_error(output: Any) -> bool:
+    return not isinstance(output, str) or output.startswith("ERROR")
+
+
+@dataclass(frozen=True)
+class BreakerConfig:
+    window: int = 50
+    min_calls: int = 10
+    error_rate: float = 0.5
+    # Calls slower than this count as failures, so a provider that is up but
+    # crawling gets tripped too
+    slow_call_seconds: float = 20.0
+    open_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "BreakerConfig":
+        return cls(
+            window=int(_env_float("AI_BREAKER_WINDOW", cls.window)),
+            min_calls=int(_env_float("AI_BREAKER_MIN_CALLS", cls.min_calls)),
+            error_rate=_env_float("AI_BREAKER_ERROR_RATE", cls.error_rate),
+            slow_call_seconds=_env_float("AI_BREAKER_SLOW_CALL_SECONDS", cls.slow_call_seconds),
+            open_seconds=_env_float("AI_BREAKER_OPEN_SECONDS", cls.open_seconds),
+        )
+
+
+class CircuitBreaker:
+    """Rolling-window breaker over the last `window` calls of one provider.
+
+    Opens when the failure rate (errors plus slow calls) reaches `error_rate`
+    after at least `min_calls`; after `open_seconds` a single probe call is let
+    through (half-open) and its outcome closes or re-opens the circuit. Latencies
+    of successful calls feed the percentiles used for hedging.
+    """
+
+    def __init__(self, config: Optional[BreakerConfig] = None):
+        self.config = config or BreakerConfig()
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=self.config.window)
+        self._latencies: deque[float] = deque(maxlen=self.config.window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        # caller holds the lock
+        if self._state == OPEN and now - self._opened_at >= self.config.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_at = None
+        return self._state
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            # One probe at a time; a probe that was granted but never reported
+            # (e.g. its chain ended early) expires after another open period
+            if state == HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.config.open_seconds):
+                self._probe_at = now
+                return True
+            return False
+
+    def record(self, ok: bool, latency: float) -> None:
+        ok = ok and latency < self.config.slow_call_seconds
+        with self._lock:
+            if ok:
+                self._latencies.append(latency)
+            if self._state == HALF_OPEN:
+                self._probe_at = None
+                if ok:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._trip()
+                return
+            self._outcomes.append(ok)
+            calls = len(self._outcomes)
+            if self._state == CLOSED and calls >= self.config.min_calls:
+                failures = calls - sum(self._outcomes)
+                if failures / calls >= self.config.error_rate:
+                    self._trip()
+
+    def _trip(self) -> None:
+        # caller holds the lock
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < max(1, self.config.min_calls // 2):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            calls = len(self._outcomes)
+            failures = calls - sum(self._outcomes)
+        p50, p95 = self.latency_quantile(0.5), self.latency_quantile(0.95)
+        return {
+            "state": state,
+            "calls": calls,
+            "error_rate": round(failures / calls, 4) if calls else 0.0,
+            "latency_p50": round(p50, 4) if p50 is not None else None,
+            "latency_p95": round(p95, 4) if p95 is not None else None,
+        }
+
+
+@dataclass(frozen=True)
+class HedgeConfig:
+    enabled: bool = False
+    quantile: float = 0.95
+    # Delay used until the primary has enough latency samples
+    initial_delay: float = 2.0
+    min_delay: float = 0.25
+    max_delay: float = 10.0
+    workers: int = 16
+
+    @classmethod
+    def from_env(cls) -> "HedgeConfig":
+        return cls(
+            enabled=os.environ.get("AI_HEDGE", "false").lower() in ("1", "true", "yes"),
+            quantile=_env_float("AI_HEDGE_QUANTILE", cls.quantile),
+            initial_delay=_env_float("AI_HEDGE_INITIAL_DELAY", cls.initial_delay),
+            min_delay=_env_float("AI_HEDGE_MIN_DELAY", cls.min_delay),
+            max_delay=_env_float("AI_HEDGE_MAX_DELAY", cls.max_delay),
+            workers=int(_env_float("AI_HEDGE_WORKERS", cls.workers)),
+        )
+
+
+class _HedgePool(ThreadPoolExecutor):
+    def close(self) -> None:
+        self.shutdown(wait=False)
+
+
+@dataclass
+class _Member:
+    name: str
+    provider: AiProvider
+    breaker: CircuitBreaker
+    limiter: Optional[RateLimiter] = None
+
+
+@dataclass
+class FailoverProvider(AiProvider):
+    """Ordered provider chain with per-provider circuit breakers and optional hedging.
+
+    Providers whose circuit is open are skipped. Without hedging the next provider
+    is tried only after the current one fails. With hedging, if the current
+    provider has not answered within its latency quantile (p95 by default), a
+    backup request goes to the next provider and the first successful answer
+    wins. Failures are "ERROR: ..." strings, like any single provider.
+
+    Rate-limited members are unwrapped and their limiter is applied here, outside
+    the breaker: time queued in the limiter is not counted as provider latency,
+    and a RateLimitTimeout moves on to the next provider without counting as a
+    failure.
+    """
+
+    providers: Sequence[tuple[str, AiProvider]]
+    breaker: BreakerConfig = field(default_factory=BreakerConfig.from_env)
+    hedge: HedgeConfig = field(default_factory=HedgeConfig.from_env)
+
+    def __post_init__(self) -> None:
+        self._members = []
+        for name, provider in self.providers:
+            limiter = None
+            if isinstance(provider, RateLimitedProvider):
+                provider, limiter = provider.inner, provider.limiter
+            self._members.append(_Member(name, provider, CircuitBreaker(self.breaker), limiter))
+        self._executor = ProcessLocal(lambda: _HedgePool(max_workers=self.hedge.workers, thread_name_prefix="ai-hedge"))
+
+    # --- AiProvider ---
+
+    def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        members = self._available()
+        if not members:
+            return self._all_open_error()
+        request = {"system_prompt": system_prompt, "user_prompt": user_prompt, "params": params}
+        if self.hedge.enabled and len(members) > 1:
+            return self._generate_hedged(members, request)
+        last = ""
+        for member in members:
+            last = self._call(member, request)
+            if not _is_error(last):
+                return last
+        return last
+
+    async def agenerate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        members = self._available()
+        if not members:
+            return self._all_open_error()
+        request = {"system_prompt": system_prompt, "user_prompt": user_prompt, "params": params}
+        if self.hedge.enabled and len(members) > 1:
+            return await self._agenerate_hedged(members, request)
+        last = ""
+        for member in members:
+            last = await self._acall(member, request)
+            if not _is_error(last):
+                return last
+        return last
+
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        # Fail over only before the first chunk; once output has been emitted the
+        # caller owns a partial answer. Streams are not hedged.
+        last = ""
+        members = self._available()
+        if not members:
+            yield self._all_open_error()
+            return
+        request = {"system_prompt": system_prompt, "user_prompt": user_prompt, "params": params}
+        for member in members:
+            lease, throttled = self._acquire(member, request)
+            if throttled:
+                last = throttled
+                continue
+            try:
+                started = time.monotonic()
+                chunks = member.provider.stream(**request)
+                try:
+                    first = next(chunks, "")
+                except Exception as e:
+                    first = f"ERROR: {e.__class__.__name__}: {e}"
+                if _is_error(first) or not first:
+                    member.breaker.record(False, time.monotonic() - started)
+                    last = first or "ERROR: empty stream"
+                    close = getattr(chunks, "close", None)
+                    if callable(close):
+                        close()
+                    continue
+                ok = False
+                try:
+                    yield first
+                    yield from chunks
+                    ok = True
+                finally:
+                    member.breaker.record(ok, time.monotonic() - started)
+                return
+            finally:
+                self._release(member, lease)
+        yield last
+
+    def close(self) -> None:
+        self._executor.close()
+        for member in self._members:
+            close = getattr(member.provider, "close", None)
+            if callable(close):
+                close()
+
+    def stats(self) -> dict[str, Any]:
+        return {member.name: member.breaker.snapshot() for member in self._members}
+
+    # --- internals ---
+
+    def _available(self) -> list[_Member]:
+        return [member for member in self._members if member.breaker.allow()]
+
+    def _all_open_error(self) -> str:
+        names = ", ".join(member.name for member in self._members)
+        return f"ERROR: CircuitOpen: no provider available ({names})"
+
+    def _hedge_delay(self, member: _Member) -> float:
+        quantile = member.breaker.latency_quantile(self.hedge.quantile)
+        delay = self.hedge.initial_delay if quantile is None else quantile
+        return min(self.hedge.max_delay, max(self.hedge.min_delay, delay))
+
+    def _acquire(self, member: _Member, request: dict[str, Any]) -> tuple[Optional[str], str]:
+        """(lease, "") once the member's limiter lets the call through, or (None, error) if it timed out."""
+        if member.limiter is None:
+            return None, ""
+        try:
+            return member.limiter.acquire(request_cost(**request)), ""
+        except RateLimitTimeout as e:
+            # Our own throttling, not the provider failing: skip it without touching the breaker
+            logger.info("ai.provider.throttled", extra={"provider": member.name})
+            return None, f"ERROR: RateLimitTimeout: {e}"
+
+    async def _aacquire(self, member: _Member, request: dict[str, Any]) -> tuple[Optional[str], str]:
+        if member.limiter is None:
+            return None, ""
+        try:
+            return await member.limiter.aacquire(request_cost(**request)), ""
+        except RateLimitTimeout as e:
+            logger.info("ai.provider.throttled", extra={"provider": member.name})
+            return None, f"ERROR: RateLimitTimeout: {e}"
+
+    @staticmethod
+    def _release(member: _Member, lease: Optional[str]) -> None:
+        if lease is not None:
+            member.limiter.release(lease)
+
+    def _call(self, member: _Member, request: dict[str, Any]) -> str:
+        lease, throttled = self._acquire(member, request)
+        if throttled:
+            return throttled
+        # Timed from here, so the breaker and hedge percentiles see upstream latency only
+        started = time.monotonic()
+        try:
+            output = member.provider.generate(**request)
+        except Exception as e:
+            output = f"ERROR: {e.__class__.__name__}: {e}"
+        finally:
+            self._release(member, lease)
+        member.breaker.record(not _is_error(output), time.monotonic() - started)
+        if _is_error(output):
+            logger.warning("ai.provider.failed", extra={"provider": member.name})
+        return output
+
+    async def _acall(self, member: _Member, request: dict[str, Any]) -> str:
+        lease, throttled = await self._aacquire(member, request)
+        if throttled:
+            return throttled
+        started = time.monotonic()
+        try:
+            output = await member.provider.agenerate(**request)
+        except asyncio.CancelledError:
+            # Lost a hedge race; not the provider's fault
+            raise
+        except Exception as e:
+            output = f"ERROR: {e.__class__.__name__}: {e}"
+        finally:
+            self._release(member, lease)
+        member.breaker.record(not _is_error(output), time.monotonic() - started)
+        if _is_error(output):
+            logger.warning("ai.provider.failed", extra={"provider": member.name})
+        return output
+
+    def _generate_hedged(self, members: list[_Member], request: dict[str, Any]) -> str:
+        executor = self._executor.get()
+        pending: dict[Future, _Member] = {}
+        queue = list(members)
+        last = ""
+
+        def launch() -> float:
+            member = queue.pop(0)
+            pending[executor.submit(self._call, member, request)] = member
+            return time.monotonic() + self._hedge_delay(member)
+
+        hedge_at = launch()
+        while pending:
+            # Wait for an answer, or until the newest attempt has run past its hedge delay
+            timeout = max(0.0, hedge_at - time.monotonic()) if queue else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                logger.info("ai.provider.hedged", extra={"provider": queue[0].name})
+                hedge_at = launch()
+                continue
+            for future in done:
+                pending.pop(future)
+                output = future.result()
+                if not _is_error(output):
+                    # Losers keep running in the pool; their outcome still feeds their breaker
+                    return output
+                last = output
+            if queue:
+                # Fail over right away instead of waiting out the hedge delay
+                hedge_at = launch()
+        return last
+
+    async def _agenerate_hedged(self, members: list[_Member], request: dict[str, Any]) -> str:
+        loop = asyncio.get_running_loop()
+        pending: dict[asyncio.Task, _Member] = {}
+        queue = list(members)
+        last = ""
+
+        def launch() -> float:
+            member = queue.pop(0)
+            pending[asyncio.ensure_future(self._acall(member, request))] = member
+            return loop.time() + self._hedge_delay(member)
+
+        hedge_at = launch()
+        try:
+            while pending:
+                timeout = max(0.0, hedge_at - loop.time()) if queue else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    logger.info("ai.provider.hedged", extra={"provider": queue[0].name})
+                    hedge_at = launch()
+                    continue
+                for task in done:
+                    pending.pop(task)
+                    output = task.result()
+                    if not _is_error(output):
+                        return output
+                    last = output
+                if queue:
+                    hedge_at = launch()
+            return last
+        finally:
+            # Unlike threads, losing coroutines can be cancelled
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Iterator
+
+from .base import AiProvider, GenerateParams
+
+
+_NOW = re.compile(r"now(?: is UTC '|=)([0-9T:.+\-]+)")
+_WORD = re.compile(r"[A-Za-z][A-Za-z\-']{3,}")
+_URGENT = ("urgent", "asap", "immediately", "today", "tomorrow", "deadline", "overdue")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value not in (None, "") else default
+
+
+def _payload(user_prompt: str) -> dict[str, Any]:
+    start = user_prompt.find("{")
+    if start == -1:
+        return {}
+    try:
+        value, _ = json.JSONDecoder().raw_decode(user_prompt, start)
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _now(user_prompt: str, payload: dict[str, Any]) -> datetime:
+    match = _NOW.search(user_prompt)
+    raw = payload.get("now") or (match.group(1) if match else None)
+    try:
+        now = datetime.fromisoformat(raw) if raw else None
+    except ValueError:
+        now = None
+    if now is None:
+        now = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+    return now if now.tzinfo else now.replace(tzinfo=dt_timezone.utc)
+
+
+def _keywords(text: str, limit: int = 5) -> list[str]:
+    seen: dict[str, None] = {}
+    for word in _WORD.findall(text or ""):
+        seen.setdefault(word.lower(), None)
+        if len(seen) >= limit:
+            break
+    return list(seen)
+
+
+@dataclass
+class FakeProvider(AiProvider):
+    """Offline stand-in that answers every orchestrator prompt with schema-valid JSON.
+
+    Answers depend only on the prompt and `seed`, so runs are reproducible.
+    Latency is lognormal around `latency_ms` (spread `latency_sigma`), streams are
+    paced at `tokens_per_second`, and `error_rate` of calls fail with an "ERROR:"
+    answer. The latency/error sequence is drawn from an RNG seeded with `seed`.
+    """
+
+    seed: int = 0
+    latency_ms: float = 400.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    tokens_per_second: float = 80.0
+    chunk_chars: int = 24
+
+    @classmethod
+    def from_env(cls) -> "FakeProvider":
+        return cls(
+            seed=int(_env_float("AI_FAKE_SEED", cls.seed)),
+            latency_ms=_env_float("AI_FAKE_LATENCY_MS", cls.latency_ms),
+            latency_sigma=_env_float("AI_FAKE_LATENCY_SIGMA", cls.latency_sigma),
+            error_rate=_env_float("AI_FAKE_ERROR_RATE", cls.error_rate),
+            tokens_per_second=_env_float("AI_FAKE_TOKENS_PER_SECOND", cls.tokens_per_second),
+            chunk_chars=int(_env_float("AI_FAKE_CHUNK_CHARS", cls.chunk_chars)),
+        )
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+
+    # --- AiProvider ---
+
+    def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        delay, fail = self._draw()
+        time.sleep(delay)
+        if fail:
+            return "ERROR: FakeProviderError: simulated failure"
+        return self.answer(system_prompt, user_prompt)
+
+    async def agenerate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        delay, fail = self._draw()
+        await asyncio.sleep(delay)
+        if fail:
+            return "ERROR: FakeProviderError: simulated failure"
+        return self.answer(system_prompt, user_prompt)
+
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        delay, fail = self._draw()
+        time.sleep(delay)  # time to first token
+        if fail:
+            yield "ERROR: FakeProviderError: simulated failure"
+            return
+        text = self.answer(system_prompt, user_prompt)
+        per_chunk = (self.chunk_chars / 4) / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        for i in range(0, len(text), self.chunk_chars):
+            if i:
+                time.sleep(per_chunk)
+            yield text[i:i + self.chunk_chars]
+
+    # --- answers ---
+
+    def answer(self, system_prompt: str, user_prompt: str) -> str:
+        from ai import orchestrator as o
+
+        handlers = {
+            o.SYSTEM_PROMPT: self._suggestion,
+            o.BATCH_SYSTEM_PROMPT: self._batch(self._suggestion),
+            o.CONTEXT_ANALYSIS_SYSTEM: self._context_analysis,
+            o.CONTEXT_ANALYSIS_BATCH_SYSTEM: self._batch(self._context_analysis),
+            o.SCHEDULE_SYSTEM: self._schedule,
+            o.SCHEDULE_BATCH_SYSTEM: self._batch(self._schedule),
+            o.SELECT_CONTEXTS_SYSTEM: self._select_contexts,
+            o.PLAN_LABELS_SYSTEM: self._plan_labels,
+            o.TASKS_FROM_TEXT_SYSTEM: self._tasks_from_text,
+        }
+        payload = _payload(user_prompt)
+        now = _now(user_prompt, payload)
+        rng = random.Random(self._prompt_seed(system_prompt, user_prompt))
+        handler = handlers.get(system_prompt)
+        data = handler(payload, now, rng, user_prompt) if handler else {"reasoning": "fake"}
+        return json.dumps(data)
+
+    def _suggestion(self, payload: dict[str, Any], now: datetime, rng: random.Random, _prompt: str = "", _slot: int = 0) -> dict[str, Any]:
+        task = payload.get("task") or {}
+        title = task.get("title") or "Task"
+        text = " ".join(str(task.get(k) or "") for k in ("title", "description"))
+        contexts = " ".join(str(c.get("content") or "") for c in payload.get("contexts") or [])
+        urgent = any(word in (text + " " + contexts).lower() for word in _URGENT)
+        deadline = now + timedelta(days=1 if urgent else rng.randint(2, 7))
+        return {
+            "priority_score": round(min(1.0, rng.uniform(0.2, 0.7) + (0.3 if urgent else 0.0)), 3),
+            "suggested_deadline": deadline.replace(hour=17, minute=0, second=0, microsecond=0).isoformat(),
+            "enhanced_description": f"{title}: {task.get('description') or 'complete the task'}".strip(),
+            "categories": [task["category_name"]] if task.get("category_name") else _keywords(text, 2),
+            "reasoning": "urgent wording in task or context" if urgent else "no urgency signals",
+        }
+
+    def _schedule(self, payload: dict[str, Any], now: datetime, rng: random.Random, _prompt: str = "", slot: int = 0) -> dict[str, Any]:
+        start = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1 + slot)
+        end = start + timedelta(minutes=rng.choice((30, 45, 60)))
+        title = (payload.get("task") or {}).get("title") or "Focus"
+        return {
+            "blocks": [{"start": start.isoformat(), "end": end.isoformat(), "label": title}],
+            "recommended_deadline": (start + timedelta(days=2)).isoformat(),
+            "reasoning": "next free hour",
+        }
+
+    @staticmethod
+    def _batch(handler):
+        def run(payload: dict[str, Any], now: datetime, rng: random.Random, prompt: str = "") -> dict[str, Any]:
+            out = {}
+            for slot, item in enumerate(payload.get("items") or []):
+                out[item.get("key")] = handler(item, now, rng, prompt, slot)
+            return out
+
+        return run
+
+    def _context_analysis(self, payload: dict[str, Any], now: datetime, rng: random.Random, _prompt: str = "", _slot: int = 0) -> dict[str, Any]:
+        content = str(payload.get("content") or "")
+        lowered = content.lower()
+        return {
+            "keywords": _keywords(content),
+            "sentiment_score": round(rng.uniform(-0.2, 0.4), 3),
+            "has_urgency": any(word in lowered for word in _URGENT),
+            "entities": [w for w in re.findall(r"\b[A-Z][a-z]+\b", content)][:3],
+            "reasoning": "keyword heuristics",
+        }
+
+    def _select_contexts(self, payload: dict[str, Any], now: datetime, rng: random.Random, _prompt: str = "", _slot: int = 0) -> dict[str, Any]:
+        k = int(payload.get("k") or 5)
+        ids = [c.get("id") for c in payload.get("contexts") or [] if c.get("id")]
+        return {"ids": ids[:k]}
+
+    def _plan_labels(self, payload: dict[str, Any], now: datetime, rng: random.Random, _prompt: str = "", _slot: int = 0) -> dict[str, Any]:
+        return {
+            item.get("key"): {"label": f"Work on {item.get('title') or 'task'}", "reasoning": "placed by the planner"}
+            for item in payload.get("items") or []
+        }
+
+    def _tasks_from_text(self, payload: dict[str, Any], now: datetime, rng: random.Random, prompt: str = "", _slot: int = 0) -> dict[str, Any]:
+        text = prompt.split("\n", 1)[1] if "\n" in prompt else prompt
+        tasks = []
+        for sentence in _SENTENCE.split(text):
+            sentence = sentence.strip(" -*\t")
+            if len(sentence) < 4:
+                continue
+            due = None
+            if "tomorrow" in sentence.lower():
+                due = (now + timedelta(days=1)).replace(hour=9, minute=0, second=0, microsecond=0).isoformat()
+            tasks.append(
+                {"title": sentence[:80], "description": sentence, "categories": _keywords(sentence, 1), "due_date": due}
+            )
+            if len(tasks) >= 10:
+                break
+        return {"tasks": tasks}
+
+    # --- randomness ---
+
+    def _prompt_seed(self, system_prompt: str, user_prompt: str) -> int:
+        digest = hashlib.sha256(f"{self.seed}\0{system_prompt}\0{user_prompt}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big")
+
+    def _draw(self) -> tuple[float, bool]:
+        with self._lock:
+            gauss = self._rng.gauss(0.0, 1.0)
+            fail = self._rng.random() < self.error_rate
+        delay = self.latency_ms / 1000.0 * math.exp(self.latency_sigma * gauss) if self.latency_ms > 0 else 0.0
+        return delay, fail
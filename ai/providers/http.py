@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Callable, Generic, Optional, TypeVar
+
+import httpx
+
+
+T = TypeVar("T")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def http2_available() -> bool:
+    """HTTP/2 in httpx needs the optional `h2` package (pip install httpx[http2])."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class HttpPoolConfig:
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    http2: bool = True
+    retries: int = 1
+
+    @classmethod
+    def from_env(cls, *, timeout: float = 60.0) -> "HttpPoolConfig":
+        return cls(
+            max_connections=_env_int("AI_HTTP_POOL_SIZE", cls.max_connections),
+            max_keepalive_connections=_env_int("AI_HTTP_KEEPALIVE_CONNECTIONS", cls.max_keepalive_connections),
+            keepalive_expiry=_env_float("AI_HTTP_KEEPALIVE_EXPIRY", cls.keepalive_expiry),
+            timeout=_env_float("AI_HTTP_TIMEOUT", timeout),
+            http2=os.environ.get("AI_HTTP2", "true").lower() == "true",
+            retries=_env_int("AI_HTTP_RETRIES", cls.retries),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+def build_http_client(config: HttpPoolConfig, **kwargs) -> httpx.Client:
+    """Build a pooled, keep-alive httpx client. httpx.Client is safe to share across threads."""
+    import certifi
+
+    transport = httpx.HTTPTransport(
+        verify=certifi.where(),
+        http2=config.http2 and http2_available(),
+        limits=config.limits(),
+        retries=config.retries,
+        trust_env=False,
+    )
+    return httpx.Client(
+        timeout=config.timeout,
+        transport=transport,
+        trust_env=False,  # ignore system proxy env that may inject unsupported args
+        **kwargs,
+    )
+
+
+_instances: "weakref.WeakSet[ProcessLocal]" = weakref.WeakSet()
+
+
+class ProcessLocal(Generic[T]):
+    """Lazily built value owned by the current process and shared by its threads.
+
+    Sockets must never be shared between a parent and a forked child (gunicorn
+    preload, Celery prefork), so the value is rebuilt whenever the pid changes.
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._value: Optional[T] = None
+        self._pid: Optional[int] = None
+        _instances.add(self)
+
+    def get(self) -> T:
+        pid = os.getpid()
+        value = self._value
+        if value is not None and self._pid == pid:
+            return value
+        with self._lock:
+            if self._value is None or self._pid != pid:
+                # Do not close an inherited value: its sockets still belong to the parent
+                self._value = self._factory()
+                self._pid = pid
+            return self._value
+
+    def close(self) -> None:
+        with self._lock:
+            value, self._value, self._pid = self._value, None, None
+        close = getattr(value, "close", None)
+        if callable(close):
+            close()
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+        self._value = None
+        self._pid = None
+
+
+def _reset_after_fork() -> None:
+    for instance in list(_instances):
+        instance._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -1,20 +1,26 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-import requests
+import json
+from dataclasses import dataclass, field
+from typing import Iterator
 
 from .base import AiProvider, GenerateParams
+from .http import HttpPoolConfig, ProcessLocal, build_http_client
 
 
 @dataclass
 class LmStudioProvider(AiProvider):
     base_url: str = "http://localhost:1234/v1"
     model: str = "qwen2.5:3b"
+    pool: HttpPoolConfig = field(default_factory=lambda: HttpPoolConfig.from_env(timeout=30.0))
+
+    def __post_init__(self) -> None:
+        self._http = ProcessLocal(lambda: build_http_client(self.pool, base_url=self.base_url))
 
     def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
         try:
-            resp = requests.post(
-                f"{self.base_url}/chat/completions",
+            resp = self._http.get().post(
+                "/chat/completions",
                 json={
                     "model": self.model,
                     "messages": [
@@ -24,7 +30,6 @@ class LmStudioProvider(AiProvider):
                     "temperature": params.temperature,
                     "max_tokens": params.max_tokens,
                 },
-                timeout=30,
             )
             resp.raise_for_status()
             data = resp.json()
@@ -32,4 +37,40 @@ class LmStudioProvider(AiProvider):
         except Exception as e:  # pragma: no cover
             return f"ERROR: {e}"
 
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        emitted = False
+        try:
+            with self._http.get().stream(
+                "POST",
+                "/chat/completions",
+                json={
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                    "temperature": params.temperature,
+                    "max_tokens": params.max_tokens,
+                    "stream": True,
+                },
+            ) as resp:
+                resp.raise_for_status()
+                # OpenAI-compatible server-sent events: "data: {...}" lines, then "data: [DONE]"
+                for line in resp.iter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    choices = json.loads(data).get("choices") or [{}]
+                    delta = (choices[0].get("delta") or {}).get("content")
+                    if delta:
+                        emitted = True
+                        yield delta
+        except Exception as e:  # pragma: no cover
+            if emitted:
+                raise RuntimeError(str(e)) from e
+            yield f"ERROR: {e}"
 
+    def close(self) -> None:
+        self._http.close()
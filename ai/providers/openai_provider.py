@@ -1,36 +1,39 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Iterator
 
 from .base import AiProvider, GenerateParams
+from .http import HttpPoolConfig, ProcessLocal, build_http_client
 
 
 @dataclass
 class OpenAiProvider(AiProvider):
     model: str = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
     api_key: str = os.environ.get("OPENAI_API_KEY", "fall-back-key-hardcode-here")
+    base_url: str = os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1")
+    pool: HttpPoolConfig = field(default_factory=HttpPoolConfig.from_env)
+
+    def __post_init__(self) -> None:
+        # One pooled client per process, reused by every call on every thread
+        self._http = ProcessLocal(lambda: build_http_client(self.pool))
+        self._client = ProcessLocal(self._build_client)
+
+    def _build_client(self):
+        # Lazy import so project works without openai installed for non-AI paths
+        from openai import OpenAI
+
+        return OpenAI(
+            api_key=self.api_key or os.environ.get("OPENAI_API_KEY", "fall-back-key-hardcode-here"),
+            http_client=self._http.get(),
+            base_url=self.base_url,
+            max_retries=0,
+        )
 
     def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
         try:
-            # Lazy import so project works without openai installed for non-AI paths
-            from openai import OpenAI
-            import httpx
-            import certifi
-
-            # Explicitly pass a default httpx client without proxies arg to avoid env injections
-            http_client = httpx.Client(
-                timeout=60.0,
-                verify=certifi.where(),
-                transport=httpx.HTTPTransport(retries=1),
-                trust_env=False,  # ignore system proxy env that may inject unsupported args
-            )
-            client = OpenAI(
-                api_key=self.api_key or os.environ.get("OPENAI_API_KEY", "fall-back-key-hardcode-here"),
-                http_client=http_client,
-                base_url=os.environ.get("OPENAI_BASE_URL", "https://api.openai.com/v1"),
-                max_retries=0,
-            )
+            client = self._client.get()
             resp = client.chat.completions.create(
                 model=self.model,
                 messages=[
@@ -46,5 +49,35 @@ class OpenAiProvider(AiProvider):
             # Include exception class for better diagnostics
             return f"ERROR: {e.__class__.__name__}: {e}"
 
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        emitted = False
+        try:
+            client = self._client.get()
+            chunks = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=params.temperature,
+                max_tokens=params.max_tokens,
+                response_format={"type": "json_object"},
+                stream=True,
+            )
+            try:
+                for chunk in chunks:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        emitted = True
+                        yield delta
+            finally:
+                # Closing early (client went away) releases the pooled connection
+                chunks.close()
+        except Exception as e:  # pragma: no cover - network
+            if emitted:
+                raise RuntimeError(f"{e.__class__.__name__}: {e}") from e
+            yield f"ERROR: {e.__class__.__name__}: {e}"
 
-
+    def close(self) -> None:
+        self._client.close()
+        self._http.close()
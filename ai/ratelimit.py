@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+
+from .providers.base import AiProvider, GenerateParams
+from .tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+# Poll interval while the in-flight cap is full (no refill time to wait for)
+IN_FLIGHT_POLL_SECONDS = 0.05
+
+
+def _env_number(name: str, key: str, default: float) -> float:
+    # Per-provider override first, e.g. AI_RATE_OPENAI_RPM, then AI_RATE_RPM
+    for var in (f"AI_RATE_{name.upper()}_{key}", f"AI_RATE_{key}"):
+        value = os.environ.get(var)
+        if value not in (None, ""):
+            return float(value)
+    return default
+
+
+@dataclass(frozen=True)
+class RateLimits:
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    max_in_flight: int = 0
+    wait_seconds: float = 30.0
+    # An in-flight slot whose holder died is reclaimed after this long
+    lease_seconds: float = 120.0
+
+    @classmethod
+    def from_env(cls, name: str) -> "RateLimits":
+        return cls(
+            requests_per_minute=int(_env_number(name, "RPM", 0)),
+            tokens_per_minute=int(_env_number(name, "TPM", 0)),
+            max_in_flight=int(_env_number(name, "MAX_IN_FLIGHT", 0)),
+            wait_seconds=_env_number(name, "WAIT_SECONDS", cls.wait_seconds),
+            lease_seconds=_env_number(name, "LEASE_SECONDS", cls.lease_seconds),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.requests_per_minute or self.tokens_per_minute or self.max_in_flight)
+
+
+class RateLimitTimeout(Exception):
+    pass
+
+
+# Token buckets for requests and tokens plus an in-flight lease set, updated
+# atomically. Returns 0 when granted, -1 when the in-flight cap is full, or the
+# number of milliseconds until enough budget has refilled.
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rpm, tpm, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local max_inflight, lease, ttl = tonumber(ARGV[4]), ARGV[5], tonumber(ARGV[6])
+if max_inflight > 0 then
+  redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+  if redis.call('ZCARD', KEYS[2]) >= max_inflight then
+    return -1
+  end
+end
+local state = redis.call('HMGET', KEYS[1], 'req', 'tok', 'ts')
+local elapsed = math.max(0, now - (tonumber(state[3]) or now))
+local wait = 0
+local req = 0
+local tok = 0
+if rpm > 0 then
+  req = math.min(rpm, (tonumber(state[1]) or rpm) + elapsed * rpm / 60000)
+  if req < 1 then wait = math.max(wait, (1 - req) * 60000 / rpm) end
+end
+if tpm > 0 then
+  cost = math.min(cost, tpm)
+  tok = math.min(tpm, (tonumber(state[2]) or tpm) + elapsed * tpm / 60000)
+  if tok < cost then wait = math.max(wait, (cost - tok) * 60000 / tpm) end
+end
+if wait > 0 then
+  return math.ceil(wait)
+end
+if rpm > 0 then req = req - 1 end
+if tpm > 0 then tok = tok - cost end
+redis.call('HSET', KEYS[1], 'req', tostring(req), 'tok', tostring(tok), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], 120000)
+if max_inflight > 0 then
+  redis.call('ZADD', KEYS[2], now + ttl, lease)
+  redis.call('PEXPIRE', KEYS[2], ttl + 60000)
+end
+return 0
+"""
+
+
+class _LocalState:
+    """In-process equivalent of the redis script, used when redis is unavailable."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.requests: Optional[float] = None
+        self.tokens: Optional[float] = None
+        self.updated = time.monotonic()
+        self.leases: dict[str, float] = {}
+
+    def try_acquire(self, limits: RateLimits, cost: int, lease: str) -> float:
+        now = time.monotonic()
+        with self.lock:
+            if limits.max_in_flight:
+                self.leases = {k: v for k, v in self.leases.items() if v > now}
+                if len(self.leases) >= limits.max_in_flight:
+                    return -1
+            elapsed = now - self.updated
+            wait = 0.0
+            rpm, tpm = limits.requests_per_minute, limits.tokens_per_minute
+            requests = tokens = 0.0
+            if rpm:
+                requests = min(rpm, (rpm if self.requests is None else self.requests) + elapsed * rpm / 60.0)
+                if requests < 1:
+                    wait = max(wait, (1 - requests) * 60.0 / rpm)
+            if tpm:
+                cost = min(cost, tpm)
+                tokens = min(tpm, (tpm if self.tokens is None else self.tokens) + elapsed * tpm / 60.0)
+                if tokens < cost:
+                    wait = max(wait, (cost - tokens) * 60.0 / tpm)
+            if wait > 0:
+                return wait
+            self.requests = requests - 1 if rpm else None
+            self.tokens = tokens - cost if tpm else None
+            self.updated = now
+            if limits.max_in_flight:
+                self.leases[lease] = now + limits.lease_seconds
+            return 0.0
+
+    def release(self, lease: str) -> None:
+        with self.lock:
+            self.leases.pop(lease, None)
+
+
+class RateLimiter:
+    """Requests/min, tokens/min and in-flight cap for one provider and model.
+
+    State lives in redis so every web and Celery process shares one budget;
+    when redis is unreachable each process falls back to its own local
+    buckets. Callers wait (with jitter) until budget is available or the
+    `wait_seconds` deadline passes.
+    """
+
+    def __init__(self, scope: str, limits: RateLimits, redis_getter: Optional[Callable[[], Any]] = None):
+        self.scope = scope
+        self.limits = limits
+        self._redis_getter = redis_getter
+        self._local = _LocalState()
+        self._script = None
+        self._bucket_key = f"ai:rl:{scope}:bucket"
+        self._inflight_key = f"ai:rl:{scope}:inflight"
+
+    def acquire(self, cost: int) -> str:
+        lease = uuid.uuid4().hex
+        deadline = time.monotonic() + self.limits.wait_seconds
+        while True:
+            wait = self._try_acquire(cost, lease)
+            if wait == 0:
+                return lease
+            time.sleep(self._pause(wait, deadline))
+
+    async def aacquire(self, cost: int) -> str:
+        lease = uuid.uuid4().hex
+        deadline = time.monotonic() + self.limits.wait_seconds
+        while True:
+            wait = self._try_acquire(cost, lease)
+            if wait == 0:
+                return lease
+            await asyncio.sleep(self._pause(wait, deadline))
+
+    def release(self, lease: str) -> None:
+        if not self.limits.max_in_flight:
+            return
+        self._local.release(lease)
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.zrem(self._inflight_key, lease)
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _pause(self, wait: float, deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if wait < 0:
+            wait = IN_FLIGHT_POLL_SECONDS
+        if remaining <= 0 or wait > remaining:
+            raise RateLimitTimeout(f"{self.scope}: no capacity within {self.limits.wait_seconds:g}s")
+        # Jitter spreads out waiters that were refused at the same moment
+        return wait * random.uniform(1.0, 1.25)
+
+    def _try_acquire(self, cost: int, lease: str) -> float:
+        client = self._redis()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(_ACQUIRE_LUA)
+                result = int(
+                    self._script(
+                        keys=[self._bucket_key, self._inflight_key],
+                        args=[
+                            self.limits.requests_per_minute,
+                            self.limits.tokens_per_minute,
+                            cost,
+                            self.limits.max_in_flight,
+                            lease,
+                            int(self.limits.lease_seconds * 1000),
+                        ],
+                    )
+                )
+                return result / 1000.0 if result > 0 else float(result)
+            except Exception as e:
+                self._redis_failed(e)
+        return self._local.try_acquire(self.limits, cost, lease)
+
+    def _redis(self) -> Any:
+        if self._redis_getter is None:
+            return None
+        return self._redis_getter()
+
+    def _redis_failed(self, error: Exception) -> None:
+        logger.warning("ai.ratelimit.redis_error", extra={"error": error.__class__.__name__})
+        self._script = None
+        from common.redis_client import mark_unavailable
+
+        mark_unavailable()
+
+
+def request_cost(system_prompt: str, user_prompt: str, params: GenerateParams) -> int:
+    # Output tokens are reserved up front; providers bill max_tokens against TPM limits too
+    return estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + int(params.max_tokens)
+
+
+class RateLimitedProvider(AiProvider):
+    """Wraps a provider so every call first takes a slot from its RateLimiter.
+
+    A call that cannot get capacity before the deadline returns an
+    "ERROR: RateLimitTimeout" answer instead of hitting the upstream.
+    """
+
+    def __init__(self, inner: AiProvider, limiter: RateLimiter):
+        self.inner = inner
+        self.limiter = limiter
+
+    def generate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        try:
+            lease = self.limiter.acquire(request_cost(system_prompt, user_prompt, params))
+        except RateLimitTimeout as e:
+            return f"ERROR: RateLimitTimeout: {e}"
+        try:
+            return self.inner.generate(system_prompt=system_prompt, user_prompt=user_prompt, params=params)
+        finally:
+            self.limiter.release(lease)
+
+    async def agenerate(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> str:
+        try:
+            lease = await self.limiter.aacquire(request_cost(system_prompt, user_prompt, params))
+        except RateLimitTimeout as e:
+            return f"ERROR: RateLimitTimeout: {e}"
+        try:
+            return await self.inner.agenerate(system_prompt=system_prompt, user_prompt=user_prompt, params=params)
+        finally:
+            self.limiter.release(lease)
+
+    def stream(self, *, system_prompt: str, user_prompt: str, params: GenerateParams) -> Iterator[str]:
+        try:
+            lease = self.limiter.acquire(request_cost(system_prompt, user_prompt, params))
+        except RateLimitTimeout as e:
+            yield f"ERROR: RateLimitTimeout: {e}"
+            return
+        try:
+            yield from self.inner.stream(system_prompt=system_prompt, user_prompt=user_prompt, params=params)
+        finally:
+            self.limiter.release(lease)
+
+    def close(self) -> None:
+        close = getattr(self.inner, "close", None)
+        if callable(close):
+            close()
+
+
+def rate_limited(name: str, provider: AiProvider) -> AiProvider:
+    """Wrap `provider` when AI_RATE_* limits are configured for it, else return it unchanged."""
+    limits = RateLimits.from_env(name)
+    if not limits.enabled:
+        return provider
+
+    from common.redis_client import get_redis
+
+    scope = f"{name}:{getattr(provider, 'model', '') or 'default'}"
+    return RateLimitedProvider(provider, RateLimiter(scope, limits, get_redis))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Iterable
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Fingerprints within this many differing bits are treated as near-duplicates
+NEAR_DUPLICATE_BITS = 3
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(_WORD.findall((text or "").casefold()))
+
+
+def _features(words: list[str], size: int = 3) -> Iterable[str]:
+    if len(words) < size:
+        return [" ".join(words)] if words else []
+    return (" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def simhash64(text: str) -> int:
+    """64-bit SimHash over word 3-shingles; similar texts differ in few bits."""
+    words = _WORD.findall((text or "").casefold())
+    weights = [0] * 64
+    for feature in _features(words):
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def is_near_duplicate(a: int, b: int, max_bits: int = NEAR_DUPLICATE_BITS) -> bool:
+    return hamming(a, b) <= max_bits
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+# Rough average for English prose and compact JSON with the GPT-style tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap, dependency-free token estimate used for budgeting prompts."""
+    if not text:
+        return 0
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_json_tokens(value: Any) -> int:
+    return estimate_tokens(json.dumps(value, separators=(",", ":"), default=str))
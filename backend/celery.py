@@ -11,4 +11,7 @@ app = Celery("backend")
 app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
+# Stamps publish time on every message and records per-queue wait when workers start tasks
+import common.queues  # noqa: E402,F401
+
 
@@ -41,6 +41,7 @@ INSTALLED_APPS = [
     "catalog",
     "contexts",
     "tasks",
+    "jobs",
 ]
 
 
@@ -163,6 +164,7 @@ SPECTACULAR_SETTINGS = {
         {"name": "tasks", "description": "Manage tasks"},
         {"name": "contexts", "description": "Daily context entries"},
         {"name": "categories", "description": "Categories"},
+        {"name": "jobs", "description": "Background AI jobs"},
         {"name": "auth", "description": "JWT authentication"},
     ],
 }
@@ -171,16 +173,71 @@ SPECTACULAR_SETTINGS = {
 AI_PROVIDER = os.environ.get("AI_PROVIDER", "openai")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
+# Max in-flight model calls per bulk request
+AI_BULK_CONCURRENCY = int(os.environ.get("AI_BULK_CONCURRENCY", "5"))
+# Tasks per Celery subtask in ai_recompute_priorities
+AI_RECOMPUTE_CHUNK_SIZE = int(os.environ.get("AI_RECOMPUTE_CHUNK_SIZE", "20"))
+# New context entries are analyzed in batches of up to CONTEXT_BATCH_SIZE, collected
+# for at most CONTEXT_BATCH_WINDOW_SECONDS (needs redis; otherwise one call per entry)
+CONTEXT_BATCH_SIZE = int(os.environ.get("CONTEXT_BATCH_SIZE", "20"))
+CONTEXT_BATCH_WINDOW_SECONDS = float(os.environ.get("CONTEXT_BATCH_WINDOW_SECONDS", "2"))
+# Category name map reload interval when redis (which carries the invalidation version) is down
+CATEGORY_CACHE_TTL_SECONDS = float(os.environ.get("CATEGORY_CACHE_TTL_SECONDS", "30"))
+# Buffered category usage counters are written to the database this often
+CATEGORY_USAGE_FLUSH_SECONDS = float(os.environ.get("CATEGORY_USAGE_FLUSH_SECONDS", "10"))
+# Near-duplicate contexts at ingest (compared against the owner's last CONTEXT_DEDUP_WINDOW
+# entries): "off", "mark" (stored with duplicate_of, not analyzed) or "merge" (not stored)
+CONTEXT_DEDUP_MODE = os.environ.get("CONTEXT_DEDUP_MODE", "mark")
+CONTEXT_DEDUP_WINDOW = int(os.environ.get("CONTEXT_DEDUP_WINDOW", "200"))
+# SimHash bits two entries may differ in and still count as duplicates (unrelated text differs in ~32)
+CONTEXT_DEDUP_MAX_BITS = int(os.environ.get("CONTEXT_DEDUP_MAX_BITS", "10"))
+# Most active tasks auto-plan-day packs into one plan (working hours etc. are AI_PLAN_* env vars)
+AI_PLAN_MAX_TASKS = int(os.environ.get("AI_PLAN_MAX_TASKS", "500"))
+# Async AI jobs (?async=1): webhook signing secret (defaults to SECRET_KEY) and optional
+# webhook host allowlist
+AI_JOB_WEBHOOK_SECRET = os.environ.get("AI_JOB_WEBHOOK_SECRET", "")
+AI_JOB_WEBHOOK_ALLOWED_HOSTS = [h for h in os.environ.get("AI_JOB_WEBHOOK_ALLOWED_HOSTS", "").split(",") if h]
+# RUNNING jobs older than this are failed by the fail_stale_jobs beat task (their worker died)
+AI_JOB_STALE_MINUTES = float(os.environ.get("AI_JOB_STALE_MINUTES", "30"))
+# Task import: rows per bulk insert/transaction, uploads larger than TASK_IMPORT_ASYNC_BYTES
+# run as a background job, and at most TASK_IMPORT_MAX_ERRORS row errors are listed
+TASK_IMPORT_CHUNK_SIZE = int(os.environ.get("TASK_IMPORT_CHUNK_SIZE", "1000"))
+TASK_IMPORT_ASYNC_BYTES = int(os.environ.get("TASK_IMPORT_ASYNC_BYTES", str(2 * 1024 * 1024)))
+TASK_IMPORT_MAX_ERRORS = int(os.environ.get("TASK_IMPORT_MAX_ERRORS", "100"))
 
 # Celery
 _redis_url = os.environ.get("REDIS_URL") or os.environ.get("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_BROKER_URL = _redis_url
+# Shared cache tier (AI response cache, counters); reuses the broker by default
+REDIS_URL = os.environ.get("CACHE_REDIS_URL", _redis_url)
 CELERY_RESULT_BACKEND = os.environ.get("CELERY_RESULT_BACKEND", _redis_url)
 CELERY_TIMEZONE = TIME_ZONE
 CELERY_TASK_ALWAYS_EAGER = os.environ.get("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true"
 CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+# Queues: AI calls are I/O bound and run on a threaded worker (see Procfile), with
+# interactive work (user-triggered jobs, context analysis) drained before the
+# nightly batch; bulk rescoring gets a prefork worker of its own
+from kombu import Queue  # type: ignore  # noqa: E402
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = [Queue("ai_interactive"), Queue("ai_batch"), Queue("cpu"), Queue("default")]
+CELERY_TASK_ROUTES = {
+    "jobs.tasks.run_ai_job": {"queue": "ai_interactive"},
+    "contexts.tasks.process_context_entry": {"queue": "ai_interactive"},
+    "contexts.tasks.process_context_batch": {"queue": "ai_interactive"},
+    "tasks.tasks.ai_recompute_priorities": {"queue": "ai_batch"},
+    "tasks.tasks.ai_recompute_priority_chunk": {"queue": "ai_batch"},
+    "tasks.tasks.recompute_priorities": {"queue": "cpu"},
+    "tasks.tasks.recompute_due_priorities": {"queue": "cpu"},
+    "catalog.tasks.flush_category_usage": {"queue": "cpu"},
+    "jobs.tasks.fail_stale_jobs": {"queue": "cpu"},
+}
+# A worker listening on several queues always takes from the first non-empty one
+# in its -Q order, and reserves one message at a time so a long AI call does not
+# hold others hostage
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "priority"}
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 
 # CORS
 CORS_ALLOWED_ORIGINS = [
@@ -227,9 +284,11 @@ LOGGING = {
 # Celery beat (periodic tasks)
 from celery.schedules import crontab  # type: ignore
 CELERY_BEAT_SCHEDULE = {
-    "recompute_task_priorities_daily": {
-        "task": "tasks.tasks.recompute_priorities",
-        "schedule": crontab(hour=3, minute=0),
+    # Only tasks whose urgency bucket changed are touched; replaces the 03:00 full scan
+    # (tasks.tasks.recompute_priorities is still available for manual full recomputes)
+    "recompute_due_task_priorities": {
+        "task": "tasks.tasks.recompute_due_priorities",
+        "schedule": crontab(minute=f"*/{os.environ.get('PRIORITY_REFRESH_MINUTES', '5')}"),
     }
 }
 
@@ -244,3 +303,13 @@ CELERY_BEAT_SCHEDULE.update(
     }
 )
 
+CELERY_BEAT_SCHEDULE["flush_category_usage"] = {
+    "task": "catalog.tasks.flush_category_usage",
+    "schedule": CATEGORY_USAGE_FLUSH_SECONDS,
+}
+
+CELERY_BEAT_SCHEDULE["fail_stale_jobs"] = {
+    "task": "jobs.tasks.fail_stale_jobs",
+    "schedule": crontab(minute="*/5"),
+}
+
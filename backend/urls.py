@@ -19,7 +19,7 @@ from django.urls import include, path
 
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from common.health import health_view
+from common.health import health_view, metrics_view
 from common.auth import RegisterView
 
 urlpatterns = [
@@ -37,9 +37,11 @@ urlpatterns = [
 
     # Health
     path("health/", health_view, name="health"),
+    path("health/metrics/", metrics_view, name="health-metrics"),
 
     # v1 API
     path("api/v1/", include("tasks.urls")),
     path("api/v1/", include("catalog.urls")),
     path("api/v1/", include("contexts.urls")),
+    path("api/v1/", include("jobs.urls")),
 ]
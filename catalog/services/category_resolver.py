@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+
+from catalog.models import Category
+from common.redis_client import get_redis, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+VERSION_KEY = "catalog:categories:version"
+NAME_MAX_LENGTH = Category._meta.get_field("name").max_length
+
+
+def _key(name: str) -> str:
+    return name.strip().casefold()
+
+
+class CategoryResolver:
+    """Case-insensitive category name lookup from a per-process name -> (id, name) map.
+
+    The map is rebuilt when the shared version in redis moves (bumped by the
+    Category signals and by `resolve_or_create`), or every
+    CATEGORY_CACHE_TTL_SECONDS when redis is unavailable. Returned categories
+    carry id and name only; other fields load from the database on access.
+    """
+
+    _lock = threading.Lock()
+    _names: Optional[dict[str, tuple[object, str]]] = None
+    _version: Optional[int] = None
+    _loaded_at = 0.0
+
+    @classmethod
+    def _shared_version(cls) -> Optional[int]:
+        client = get_redis()
+        if client is None:
+            return None
+        try:
+            return int(client.get(VERSION_KEY) or 0)
+        except Exception as e:
+            logger.warning("catalog.resolver.redis_error", extra={"error": e.__class__.__name__})
+            mark_unavailable()
+            return None
+
+    @classmethod
+    def _map(cls) -> dict[str, tuple[object, str]]:
+        version = cls._shared_version()
+        with cls._lock:
+            fresh = cls._names is not None and (
+                version == cls._version
+                if version is not None
+                else time.monotonic() - cls._loaded_at < settings.CATEGORY_CACHE_TTL_SECONDS
+            )
+            if fresh:
+                return cls._names
+            names: dict[str, tuple[object, str]] = {}
+            # Ordered like the old `name__iexact(...).first()`: on a casefold clash the first name wins
+            for pk, name in Category.objects.order_by("name").values_list("id", "name"):
+                names.setdefault(_key(name), (pk, name))
+            cls._names, cls._version, cls._loaded_at = names, version, time.monotonic()
+            return names
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop this process's map and move the shared version so other processes reload too."""
+        with cls._lock:
+            cls._names = None
+        client = get_redis()
+        if client is None:
+            return
+        try:
+            client.incr(VERSION_KEY)
+        except Exception as e:
+            logger.warning("catalog.resolver.redis_error", extra={"error": e.__class__.__name__})
+            mark_unavailable()
+
+    @staticmethod
+    def _category(entry: tuple[object, str]) -> Category:
+        return Category.from_db(None, ["id", "name"], entry)
+
+    @classmethod
+    def resolve(cls, names: Iterable[str]) -> dict[str, Category]:
+        """Existing categories for `names`, keyed by the name as given."""
+        mapping = cls._map()
+        found = {}
+        for name in names:
+            entry = mapping.get(_key(str(name)))
+            if entry is not None:
+                found[name] = cls._category(entry)
+        return found
+
+    @classmethod
+    def resolve_or_create(cls, names: Iterable[str]) -> dict[str, Category]:
+        """Categories for `names` (keyed by the name as given), creating missing ones in one INSERT.
+
+        bulk_create sends no signals, so the shared version is bumped here.
+        """
+        names = [n for n in names if str(n).strip()]
+        found = cls.resolve(names)
+        missing: dict[str, str] = {}
+        for name in names:
+            if name not in found:
+                missing.setdefault(_key(str(name)), str(name).strip()[:NAME_MAX_LENGTH])
+        if not missing:
+            return found
+        Category.objects.bulk_create([Category(name=n) for n in missing.values()], ignore_conflicts=True)
+        # Re-read rather than trust the new ids (a concurrent writer may have won the insert), and
+        # only reload the map once the rows are committed
+        created = {_key(c.name): c for c in Category.objects.filter(name__in=missing.values()).only("id", "name")}
+        transaction.on_commit(cls.invalidate)
+        for name in names:
+            category = created.get(_key(str(name)))
+            if name not in found and category is not None:
+                found[name] = category
+        return found
+
+    @classmethod
+    def choose(cls, suggestions: Iterable[str]) -> Optional[Category]:
+        """The first suggestion naming an existing category, else the first suggestion, created."""
+        suggestions = [str(s).strip() for s in suggestions if str(s).strip()]
+        if not suggestions:
+            return None
+        found = cls.resolve(suggestions)
+        for name in suggestions:
+            if name in found:
+                return found[name]
+        return cls.resolve_or_create(suggestions[:1]).get(suggestions[0])
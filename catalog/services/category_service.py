@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+from datetime import datetime
+from typing import Any, Mapping, Optional
+
 from catalog.models import Category
+from catalog.services.usage_buffer import CategoryUsageBuffer
 
 
 class CategoryService:
@@ -10,10 +14,10 @@ class CategoryService:
 
     @staticmethod
     def touch_usage(category: Category) -> None:
-        from django.utils import timezone
-
-        category.usage_count = (category.usage_count or 0) + 1
-        category.last_used_at = timezone.now()
-        category.save(update_fields=["usage_count", "last_used_at"])
-
+        """Count one use of the category; written to the row later by CategoryUsageBuffer."""
+        CategoryUsageBuffer.add({category.pk: 1})
 
+    @staticmethod
+    def record_usage(counts: Mapping[Any, int], when: Optional[datetime] = None) -> None:
+        """Count several uses at once, as {category id: uses}."""
+        CategoryUsageBuffer.add(counts, when)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Mapping, Optional
+
+from django.conf import settings
+from django.db.models import Case, DateTimeField, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from catalog.models import Category
+from common.redis_client import get_redis, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+COUNTS_KEY = "catalog:usage:counts"  # hash: category id -> pending increments
+LAST_USED_KEY = "catalog:usage:last_used"  # sorted set: category id -> latest use (epoch seconds)
+
+
+def _write(counts: Mapping[Any, int], last_used: Mapping[Any, float]) -> int:
+    """Apply buffered usage in one UPDATE: counters are added with F(), last_used_at only moves forward."""
+    ids = set(counts) | set(last_used)
+    if not ids:
+        return 0
+    increments = Case(
+        *(When(pk=pk, then=Value(n)) for pk, n in counts.items()), default=Value(0), output_field=IntegerField()
+    )
+    stamps = Case(
+        *(When(pk=pk, then=Value(datetime.fromtimestamp(ts, tz=dt_timezone.utc))) for pk, ts in last_used.items()),
+        default=F("last_used_at"),
+        output_field=DateTimeField(),
+    )
+    return Category.objects.filter(pk__in=ids).update(
+        usage_count=F("usage_count") + increments,
+        last_used_at=Greatest(Coalesce(F("last_used_at"), stamps), stamps),
+    )
+
+
+class CategoryUsageBuffer:
+    """Write-behind buffer for Category.usage_count / last_used_at.
+
+    Increments go to redis (HINCRBY, ZADD GT for the latest use) and are written
+    to the database by the periodic `catalog.tasks.flush_category_usage`.
+    Without redis, or with eager Celery (no beat), they are written straight
+    away: a buffer in a web process would never be seen by the worker's flush.
+    The in-process buffer only keeps what a failed flush could not write.
+    """
+
+    _lock = threading.Lock()
+    _counts: Counter = Counter()
+    _last_used: dict[Any, float] = {}
+
+    @classmethod
+    def add(cls, counts: Mapping[Any, int], when: Optional[datetime] = None) -> None:
+        counts = {pk: int(n) for pk, n in counts.items() if pk is not None and n}
+        if not counts:
+            return
+        ts = (when or timezone.now()).timestamp()
+        client = None if settings.CELERY_TASK_ALWAYS_EAGER else get_redis()
+        if client is not None:
+            try:
+                pipe = client.pipeline(transaction=False)
+                for pk, n in counts.items():
+                    pipe.hincrby(COUNTS_KEY, str(pk), n)
+                pipe.zadd(LAST_USED_KEY, {str(pk): ts for pk in counts}, gt=True)
+                pipe.execute()
+                return
+            except Exception as e:
+                logger.warning("catalog.usage.redis_error", extra={"error": e.__class__.__name__})
+                mark_unavailable()
+        _write(counts, dict.fromkeys(counts, ts))
+
+    @classmethod
+    def _keep(cls, counts: Mapping[Any, int], last_used: Mapping[Any, float]) -> None:
+        with cls._lock:
+            cls._counts.update(counts)
+            for pk, ts in last_used.items():
+                cls._last_used[pk] = max(ts, cls._last_used.get(pk, ts))
+
+    @classmethod
+    def flush_local(cls) -> int:
+        with cls._lock:
+            counts, last_used = dict(cls._counts), dict(cls._last_used)
+            cls._counts.clear()
+            cls._last_used.clear()
+        try:
+            return _write(counts, last_used)
+        except Exception:
+            # Keep them for the next flush rather than lose them
+            cls._keep(counts, last_used)
+            raise
+
+    @classmethod
+    def flush(cls) -> int:
+        """Write everything buffered in redis and in this process; returns categories updated."""
+        updated = cls.flush_local()
+        client = get_redis()
+        if client is None:
+            return updated
+        pipe = client.pipeline(transaction=True)
+        pipe.hgetall(COUNTS_KEY)
+        pipe.zrange(LAST_USED_KEY, 0, -1, withscores=True)
+        pipe.delete(COUNTS_KEY, LAST_USED_KEY)
+        raw_counts, raw_last_used, _ = pipe.execute()
+        counts = {uuid.UUID(k.decode()): int(v) for k, v in raw_counts.items()}
+        last_used = {uuid.UUID(k.decode()): float(ts) for k, ts in raw_last_used}
+        try:
+            return updated + _write(counts, last_used)
+        except Exception:
+            cls._keep(counts, last_used)
+            raise
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from catalog.models import Category
+from catalog.services.category_resolver import CategoryResolver
+
+# Saves that only touch these fields leave names unchanged
+_USAGE_FIELDS = frozenset({"usage_count", "last_used_at"})
+
+
+@receiver(post_save, sender=Category)
+def _category_saved(sender, instance, created, update_fields=None, **kwargs) -> None:
+    if not created and update_fields and set(update_fields) <= _USAGE_FIELDS:
+        return
+    transaction.on_commit(CategoryResolver.invalidate)
+
+
+@receiver(post_delete, sender=Category)
+def _category_deleted(sender, instance, **kwargs) -> None:
+    transaction.on_commit(CategoryResolver.invalidate)
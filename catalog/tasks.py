@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from celery import shared_task
+
+from .services.usage_buffer import CategoryUsageBuffer
+
+
+@shared_task
+def flush_category_usage() -> int:
+    """Write buffered category usage counters to the database (scheduled by beat)."""
+    return CategoryUsageBuffer.flush()
@@ -2,27 +2,52 @@ from __future__ import annotations
 
 from django.db import connection
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
 
 
-@api_view(["GET"])
-@permission_classes([AllowAny])
-def health_view(_request):
-    # DB check
+def _db_ok() -> bool:
     try:
         with connection.cursor() as cursor:
             cursor.execute("SELECT 1")
             _ = cursor.fetchone()
-        db_ok = True
+        return True
     except Exception:
-        db_ok = False
+        return False
+
 
-    # Broker check (optional): just echo if configured
-    # A real ping would use redis-py or Celery inspect, but avoid hard dependency here
-    broker_ok = True
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def health_view(_request):
+    # Liveness probe: unauthenticated and cheap, so it only checks the database.
+    # Broker, queue and AI stats are on the staff-only metrics endpoint.
+    db_ok = _db_ok()
+    return Response({"db": db_ok}, status=200 if db_ok else 503)
 
-    status = 200 if db_ok and broker_ok else 503
-    return Response({"db": db_ok, "broker": broker_ok}, status=status)
 
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def metrics_view(_request):
+    from ai.budget import budget_stats
+    from ai.cache import get_response_cache
+    from ai.provider_factory import provider_stats
+    from common.queues import queue_stats
 
+    db_ok = _db_ok()
+    # Queue depths are read from the broker, so it is reachable if every depth came back
+    # (None when tasks run eagerly and there is no broker to check)
+    queues = queue_stats()
+    broker_ok = queues is None or all(q.get("depth") is not None for q in queues.values())
+    # AI response cache counters (process-local view of both tiers)
+    cache = get_response_cache()
+    return Response(
+        {
+            "db": db_ok,
+            "broker": broker_ok,
+            "ai_cache": cache.stats() if cache is not None else None,
+            "ai_budget": budget_stats(),
+            "ai_providers": provider_stats(),
+            "queues": queues,
+        },
+        status=200 if db_ok and broker_ok else 503,
+    )
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from celery.signals import before_task_publish, task_prerun
+
+logger = logging.getLogger(__name__)
+
+
+ENQUEUED_AT_HEADER = "enqueued_at"
+_WAIT_KEY = "celery:queue_wait:{}"
+# kombu's redis transport keeps one list per priority step: "<queue>", "<queue>\x06\x163", ...
+_PRIORITY_SEP = "\x06\x16"
+_PRIORITY_STEPS = (0, 3, 6, 9)
+# Seconds to wait for the broker before reporting queue depths as unknown
+QUEUE_STATS_TIMEOUT = 2.0
+
+# Per-process fallback when the cache redis is unavailable
+_local_lock = threading.Lock()
+_local_waits: dict[str, dict[str, float]] = {}
+
+
+@before_task_publish.connect
+def _stamp_enqueued_at(headers: Optional[dict] = None, **_kwargs: Any) -> None:
+    if headers is not None:
+        headers.setdefault(ENQUEUED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def _record_queue_wait(task: Any = None, **_kwargs: Any) -> None:
+    request = getattr(task, "request", None)
+    if request is None or request.is_eager:
+        return
+    enqueued_at = getattr(request, ENQUEUED_AT_HEADER, None) or (request.headers or {}).get(ENQUEUED_AT_HEADER)
+    if not enqueued_at:
+        return
+    queue = (request.delivery_info or {}).get("routing_key") or "default"
+    record_wait(queue, max(0.0, time.time() - float(enqueued_at)))
+
+
+def record_wait(queue: str, seconds: float) -> None:
+    from common.redis_client import get_redis, mark_unavailable
+
+    client = get_redis()
+    if client is not None:
+        try:
+            key = _WAIT_KEY.format(queue)
+            pipe = client.pipeline()
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrbyfloat(key, "total_seconds", seconds)
+            pipe.hset(key, "last_seconds", round(seconds, 3))
+            pipe.execute()
+            return
+        except Exception as e:
+            logger.warning("queues.record_failed", extra={"error": e.__class__.__name__})
+            mark_unavailable()
+    with _local_lock:
+        stats = _local_waits.setdefault(queue, {"count": 0, "total_seconds": 0.0, "last_seconds": 0.0})
+        stats["count"] += 1
+        stats["total_seconds"] += seconds
+        stats["last_seconds"] = round(seconds, 3)
+
+
+def _wait_stats(queue: str) -> dict[str, Any]:
+    from common.redis_client import get_redis
+
+    raw: dict[str, Any] = {}
+    client = get_redis()
+    if client is not None:
+        try:
+            raw = {k.decode(): float(v) for k, v in client.hgetall(_WAIT_KEY.format(queue)).items()}
+        except Exception:
+            raw = {}
+    if not raw:
+        with _local_lock:
+            raw = dict(_local_waits.get(queue) or {})
+    count = int(raw.get("count") or 0)
+    return {
+        "started": count,
+        "avg_wait_seconds": round(raw["total_seconds"] / count, 3) if count else None,
+        "last_wait_seconds": raw.get("last_seconds"),
+    }
+
+
+def _oldest_age(client: Any, key: str, now: float) -> Optional[float]:
+    # Producers LPUSH and workers BRPOP, so the oldest message is the last element
+    raw = client.lindex(key, -1)
+    if not raw:
+        return None
+    try:
+        enqueued_at = json.loads(raw).get("headers", {}).get(ENQUEUED_AT_HEADER)
+    except (ValueError, AttributeError):
+        return None
+    return round(max(0.0, now - float(enqueued_at)), 3) if enqueued_at else None
+
+
+def queue_stats() -> Optional[dict[str, Any]]:
+    """Depth, oldest waiting message and observed wait time for each configured Celery queue.
+
+    Depth and age are read from the broker (redis transport only); wait times
+    are recorded by workers as tasks start. None when tasks run eagerly.
+    """
+    from django.conf import settings
+
+    from backend.celery import app
+
+    if getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+        return None
+    names = [q.name for q in (app.conf.task_queues or [])] or [app.conf.task_default_queue]
+    stats: dict[str, Any] = {name: _wait_stats(name) for name in names}
+    try:
+        with app.connection_for_read() as conn:
+            conn.ensure_connection(max_retries=1, timeout=QUEUE_STATS_TIMEOUT)
+            client = conn.default_channel.client
+            now = time.time()
+            for name in names:
+                keys = [name] + [f"{name}{_PRIORITY_SEP}{step}" for step in _PRIORITY_STEPS if step]
+                stats[name]["depth"] = sum(int(client.llen(key)) for key in keys)
+                ages = [age for age in (_oldest_age(client, key, now) for key in keys) if age is not None]
+                stats[name]["oldest_wait_seconds"] = max(ages) if ages else None
+    except Exception as e:
+        logger.warning("queues.broker_unavailable", extra={"error": e.__class__.__name__})
+        for name in names:
+            stats[name].setdefault("depth", None)
+    return stats
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_client: Any = None
+_retry_at = 0.0
+
+# After a failed connection attempt, stay in fallback mode this long before retrying
+RETRY_INTERVAL_SECONDS = 30.0
+
+
+def get_redis() -> Optional[Any]:
+    """Return a shared redis client for the configured broker URL, or None if unavailable.
+
+    Callers must treat None as "use the in-process fallback". redis-py pools are
+    pid-aware, so the client survives gunicorn/Celery forks.
+    """
+    global _client, _retry_at
+    if _client is not None:
+        return _client
+    if time.monotonic() < _retry_at:
+        return None
+    url = getattr(settings, "REDIS_URL", "") or ""
+    if not url.startswith(("redis://", "rediss://", "unix://")):
+        return None
+    with _lock:
+        if _client is not None:
+            return _client
+        try:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_connect_timeout=0.25, socket_timeout=1.0)
+            client.ping()
+        except Exception as e:
+            _retry_at = time.monotonic() + RETRY_INTERVAL_SECONDS
+            logger.warning("redis.unavailable", extra={"error": e.__class__.__name__})
+            return None
+        _client = client
+        return _client
+
+
+def mark_unavailable() -> None:
+    """Drop the client after a failed command so callers back off to their fallback."""
+    global _client, _retry_at
+    with _lock:
+        _client = None
+        _retry_at = time.monotonic() + RETRY_INTERVAL_SECONDS
+
+
+def reset_redis() -> None:
+    global _client, _retry_at
+    with _lock:
+        _client = None
+        _retry_at = 0.0
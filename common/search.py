@@ -0,0 +1,191 @@
+"""Database full-text search for list endpoints.
+
+PostgreSQL keeps a generated, weighted `search_vector` tsvector column with a GIN
+index on each searchable table; SQLite keeps an FTS5 table (`<table>_fts`),
+keyed by `id`, in sync with triggers. Both are created by migrations through
+`FullTextIndex`. `FullTextSearchFilter` matches `?search=` against them and
+annotates `relevance` (higher is better); `RelevanceOrderingFilter` orders by it
+unless `?ordering=` is given. On any other database, or when the index is
+missing, the search falls back to DRF's SearchFilter.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+
+TS_CONFIG = "english"
+VECTOR_COLUMN = "search_vector"
+RELEVANCE = "relevance"
+# FTS5 bm25() weight per tsvector weight class
+_BM25_WEIGHTS = {"A": 10.0, "B": 4.0, "C": 2.0, "D": 1.0}
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class FullTextIndex:
+    """Searchable columns of one table with their weights ("A" highest to "D")."""
+
+    table: str
+    columns: tuple[tuple[str, str], ...]
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+    def _pg_vector_sql(self) -> str:
+        parts = [
+            f"setweight(to_tsvector('{TS_CONFIG}', coalesce(\"{column}\", '')), '{weight}')"
+            for column, weight in self.columns
+        ]
+        return " || ".join(parts)
+
+    def create(self, schema_editor) -> None:
+        vendor = schema_editor.connection.vendor
+        if vendor == "postgresql":
+            schema_editor.execute(
+                f'ALTER TABLE "{self.table}" ADD COLUMN IF NOT EXISTS "{VECTOR_COLUMN}" tsvector '
+                f"GENERATED ALWAYS AS ({self._pg_vector_sql()}) STORED"
+            )
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.table}_{VECTOR_COLUMN}_gin" '
+                f'ON "{self.table}" USING GIN ("{VECTOR_COLUMN}")'
+            )
+        elif vendor == "sqlite":
+            # Recreated from scratch, so this also repairs a table whose triggers were dropped
+            self.drop(schema_editor)
+            for statement in self._sqlite_statements():
+                schema_editor.execute(statement)
+
+    def drop(self, schema_editor) -> None:
+        vendor = schema_editor.connection.vendor
+        if vendor == "postgresql":
+            schema_editor.execute(f'ALTER TABLE "{self.table}" DROP COLUMN IF EXISTS "{VECTOR_COLUMN}"')
+        elif vendor == "sqlite":
+            for trigger in self._sqlite_triggers():
+                schema_editor.execute(f'DROP TRIGGER IF EXISTS "{trigger}"')
+            schema_editor.execute(f'DROP TABLE IF EXISTS "{self.fts_table}"')
+
+    def _sqlite_triggers(self) -> list[str]:
+        return [f"{self.fts_table}_{action}" for action in ("insert", "delete", "update")]
+
+    def _sqlite_statements(self) -> list[str]:
+        """FTS5 table keyed by the row's primary key (an unindexed `id` column), its sync triggers and fill.
+
+        Not keyed on rowid: these tables have UUID primary keys, and SQLite may
+        renumber their rowids (VACUUM, table remakes).
+        """
+        fts, table = self.fts_table, self.table
+        insert, delete, update = self._sqlite_triggers()
+        names = ", ".join(f'"{c}"' for c, _ in self.columns)
+        new = ", ".join(f'new."{c}"' for c, _ in self.columns)
+        return [
+            f'CREATE VIRTUAL TABLE "{fts}" USING fts5("id" UNINDEXED, {names})',
+            f'CREATE TRIGGER "{insert}" AFTER INSERT ON "{table}" BEGIN '
+            f'INSERT INTO "{fts}"("id", {names}) VALUES (new."id", {new}); END',
+            f'CREATE TRIGGER "{delete}" AFTER DELETE ON "{table}" BEGIN '
+            f'DELETE FROM "{fts}" WHERE "id" = old."id"; END',
+            # Only fires when an indexed column changes, not on score/status updates
+            f'CREATE TRIGGER "{update}" AFTER UPDATE OF "id", {names} ON "{table}" BEGIN '
+            f'DELETE FROM "{fts}" WHERE "id" = old."id"; '
+            f'INSERT INTO "{fts}"("id", {names}) VALUES (new."id", {new}); END',
+            f'INSERT INTO "{fts}"("id", {names}) SELECT "id", {names} FROM "{table}"',
+        ]
+
+    def rebuild(self, connection) -> None:
+        with connection.schema_editor() as schema_editor:
+            self.create(schema_editor)
+
+    def is_available(self, connection) -> bool:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                columns = connection.introspection.get_table_description(cursor, self.table)
+            return any(c.name == VECTOR_COLUMN for c in columns)
+        if connection.vendor == "sqlite":
+            # Django's SQLite table remake (e.g. for AlterField) drops the triggers, leaving the index stale
+            expected = {self.fts_table, *self._sqlite_triggers()}
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(expected))})",
+                    list(expected),
+                )
+                return {row[0] for row in cursor.fetchall()} == expected
+        return False
+
+
+def fts5_query(text: str) -> str:
+    """FTS5 MATCH expression for free text: every word must match, as a prefix."""
+    return " ".join(f'"{term}"*' for term in _TERM.findall(text))
+
+
+class FullTextSearchFilter(SearchFilter):
+    """`?search=` over the view's `search_index` (a FullTextIndex), ranked by relevance.
+
+    Views list `relevance` in `ordering_fields` so `?ordering=-relevance` can be
+    combined with other fields; `relevance` is 0 when there is no search term.
+    """
+
+    # Availability per database alias and table, checked once per process
+    _available: dict[tuple[str, str], bool] = {}
+
+    def _index_available(self, queryset, index: FullTextIndex) -> bool:
+        key = (queryset.db, index.table)
+        if key not in self._available:
+            self._available[key] = index.is_available(connections[queryset.db])
+        return self._available[key]
+
+    def filter_queryset(self, request, queryset, view):
+        index: FullTextIndex | None = getattr(view, "search_index", None)
+        text = " ".join(self.get_search_terms(request))
+        if not text:
+            if RELEVANCE in (request.query_params.get("ordering") or ""):
+                queryset = queryset.annotate(**{RELEVANCE: Value(0.0, output_field=FloatField())})
+            return queryset
+        if index is None or not self._index_available(queryset, index):
+            queryset = super().filter_queryset(request, queryset, view)
+            return queryset.annotate(**{RELEVANCE: Value(0.0, output_field=FloatField())})
+
+        table = queryset.model._meta.db_table
+        if connections[queryset.db].vendor == "postgresql":
+            query = f"websearch_to_tsquery('{TS_CONFIG}', %s)"
+            matches = RawSQL(f'"{table}"."{VECTOR_COLUMN}" @@ {query}', [text], output_field=BooleanField())
+            relevance = RawSQL(f'ts_rank_cd("{table}"."{VECTOR_COLUMN}", {query})', [text], output_field=FloatField())
+        else:
+            match = fts5_query(text)
+            if not match:
+                return queryset.none()
+            fts = index.fts_table
+            weights = ", ".join(str(_BM25_WEIGHTS[w]) for _, w in index.columns)
+            matches = RawSQL(
+                f'"{table}"."id" IN (SELECT "id" FROM "{fts}" WHERE "{fts}" MATCH %s)',
+                [match],
+                output_field=BooleanField(),
+            )
+            # bm25() is lower for better matches; the leading 0 weighs the unindexed id column.
+            # OFFSET 0 keeps the ranked matches from being flattened into the correlated
+            # lookup, so they are computed once and looked up through an automatic index
+            relevance = RawSQL(
+                f'(SELECT "rank" FROM (SELECT "id", -bm25("{fts}", 0, {weights}) AS "rank" FROM "{fts}" '
+                f'WHERE "{fts}" MATCH %s LIMIT -1 OFFSET 0) AS "ranked" WHERE "ranked"."id" = "{table}"."id")',
+                [match],
+                output_field=FloatField(),
+            )
+        return queryset.filter(matches).annotate(**{RELEVANCE: relevance})
+
+
+class RelevanceOrderingFilter(OrderingFilter):
+    """OrderingFilter that ranks search results by relevance unless `?ordering=` is given.
+
+    Goes after FullTextSearchFilter, which adds the `relevance` annotation.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if request.query_params.get(self.ordering_param) is None and RELEVANCE in queryset.query.annotations:
+            return [f"-{RELEVANCE}", *(ordering or [])]
+        return ordering
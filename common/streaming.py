@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+STREAM_CONTENT_TYPES = {
+    "sse": "text/event-stream",
+    "ndjson": "application/x-ndjson",
+}
+
+EXPORT_CONTENT_TYPES = {
+    "csv": "text/csv",
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+# Encoded rows are buffered up to this many characters per streamed chunk
+EXPORT_CHUNK_CHARS = 64 * 1024
+
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets DRF content negotiation accept `Accept: text/event-stream`.
+
+    Streaming actions return a StreamingHttpResponse directly; this only renders
+    ordinary (e.g. error) responses as a single event.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return encode_event("sse", "error" if _is_error(renderer_context) else "message", data)
+
+
+class NdjsonRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return encode_event("ndjson", "error" if _is_error(renderer_context) else "message", data)
+
+
+class CsvRenderer(BaseRenderer):
+    """Accepts `?format=csv` during content negotiation; exports stream CSV themselves."""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, default=str).encode("utf-8")
+
+
+def _is_error(renderer_context: Optional[dict]) -> bool:
+    response = (renderer_context or {}).get("response")
+    return bool(response is not None and response.status_code >= 400)
+
+
+def stream_mode(request) -> Optional[str]:
+    """Streaming mode requested via `?stream=sse|ndjson` or the Accept header, else None."""
+    mode = (request.query_params.get("stream") or "").lower()
+    if mode in STREAM_CONTENT_TYPES:
+        return mode
+    accept = request.META.get("HTTP_ACCEPT", "")
+    for name, content_type in STREAM_CONTENT_TYPES.items():
+        if content_type in accept:
+            return name
+    return None
+
+
+def encode_event(mode: str, event: str, data: Any) -> bytes:
+    payload = json.dumps(data, default=str)
+    if mode == "sse":
+        return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+    return (json.dumps({"event": event, "data": data}, default=str) + "\n").encode("utf-8")
+
+
+def event_stream_response(events: Iterable[tuple[str, Any]], mode: str) -> StreamingHttpResponse:
+    """Stream (event, data) pairs as SSE frames or NDJSON lines.
+
+    When the client disconnects the server closes the iterator, which closes
+    `events` and lets the producer stop early.
+    """
+
+    def frames() -> Iterator[bytes]:
+        try:
+            for event, data in events:
+                yield encode_event(mode, event, data)
+        finally:
+            close = getattr(events, "close", None)
+            if callable(close):
+                close()
+
+    resp = StreamingHttpResponse(frames(), content_type=STREAM_CONTENT_TYPES[mode])
+    resp["Cache-Control"] = "no-cache"
+    resp["X-Accel-Buffering"] = "no"  # disable proxy buffering (nginx)
+    return resp
+
+
+def _export_lines(fmt: str, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+        return
+    if fmt == "ndjson":
+        for row in rows:
+            yield json.dumps(dict(zip(header, row)), default=str) + "\n"
+        return
+    yield "["
+    for i, row in enumerate(rows):
+        yield ("" if i == 0 else ", ") + json.dumps(dict(zip(header, row)), default=str)
+    yield "]"
+
+
+def export_chunks(fmt: str, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Encode rows as CSV, a JSON array or NDJSON, yielding ~EXPORT_CHUNK_CHARS pieces."""
+    pending: list[str] = []
+    size = 0
+    for line in _export_lines(fmt, header, rows):
+        pending.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_CHARS:
+            yield "".join(pending).encode("utf-8")
+            pending, size = [], 0
+    if pending:
+        yield "".join(pending).encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def export_response(
+    fmt: str, header: Sequence[str], rows: Iterable[Sequence[Any]], filename: str, compress: bool = False
+) -> StreamingHttpResponse:
+    """Stream an export download; memory use does not grow with the number of rows.
+
+    `rows` should be lazy (e.g. a queryset's `values_list().iterator()`). With
+    `compress` the file is gzipped on the fly and served as `<filename>.gz`.
+    """
+    chunks = export_chunks(fmt, header, rows)
+    if compress:
+        resp = StreamingHttpResponse(gzip_chunks(chunks), content_type="application/gzip")
+        filename += ".gz"
+    else:
+        resp = StreamingHttpResponse(chunks, content_type=EXPORT_CONTENT_TYPES[fmt])
+    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return resp
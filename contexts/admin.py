@@ -5,9 +5,9 @@ from .models import ContextEntry
 
 @admin.register(ContextEntry)
 class ContextEntryAdmin(admin.ModelAdmin):
-    list_display = ("source_type", "created_at", "sentiment_score")
+    list_display = ("source_type", "created_at", "sentiment_score", "duplicate_of")
     search_fields = ("content",)
-    list_filter = ("source_type", "created_at")
+    list_filter = ("source_type", "created_at", ("duplicate_of", admin.EmptyFieldListFilter))
     date_hierarchy = "created_at"
     ordering = ("-created_at",)
 
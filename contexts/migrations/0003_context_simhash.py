@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from ai.similarity import normalize_text, simhash64
+
+
+def backfill_simhash(apps, schema_editor):
+    # Existing rows get a fingerprint so new entries can match them; none are marked as duplicates
+    ContextEntry = apps.get_model('contexts', 'ContextEntry')
+    batch = []
+    for entry in ContextEntry.objects.filter(simhash__isnull=True).only('id', 'content').iterator(chunk_size=1000):
+        normalized = normalize_text(entry.content)
+        if not normalized:
+            continue
+        value = simhash64(normalized)
+        entry.simhash = value - (1 << 64) if value >= 1 << 63 else value
+        batch.append(entry)
+        if len(batch) >= 1000:
+            ContextEntry.objects.bulk_update(batch, ['simhash'])
+            batch = []
+    if batch:
+        ContextEntry.objects.bulk_update(batch, ['simhash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contexts', '0002_add_owner'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contextentry',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='contexts.contextentry'),
+        ),
+        migrations.AddField(
+            model_name='contextentry',
+            name='simhash',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='contextentry',
+            index=models.Index(fields=['owner', 'simhash'], name='contexts_owner_simhash_idx'),
+        ),
+        migrations.RunPython(backfill_simhash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from common.search import FullTextIndex
+
+
+SEARCH_INDEX = FullTextIndex("contexts_contextentry", (("content", "A"),))
+
+
+def create_search_index(apps, schema_editor):
+    SEARCH_INDEX.create(schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    SEARCH_INDEX.drop(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contexts', '0003_context_simhash'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
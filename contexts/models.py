@@ -12,6 +12,12 @@ class ContextSourceType(models.TextChoices):
     OTHER = "other", "Other"
 
 
+class ContextDedupMode(models.TextChoices):
+    OFF = "off", "Off"
+    MARK = "mark", "Mark"
+    MERGE = "merge", "Merge"
+
+
 class ContextEntry(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name="contexts")
@@ -21,10 +27,14 @@ class ContextEntry(models.Model):
     processed_insights = models.JSONField(default=dict, blank=True)
     sentiment_score = models.FloatField(null=True, blank=True)
     keywords = models.JSONField(default=list, blank=True)
+    # Signed 64-bit SimHash of the content (ai.similarity.simhash64)
+    simhash = models.BigIntegerField(null=True, blank=True)
+    duplicate_of = models.ForeignKey("self", null=True, blank=True, on_delete=models.SET_NULL, related_name="duplicates")
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["owner", "simhash"], name="contexts_owner_simhash_idx")]
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         return f"{self.source_type}: {self.content[:32]}"
@@ -5,6 +5,7 @@ from .models import ContextEntry, ContextSourceType
 
 class ContextEntrySerializer(serializers.ModelSerializer):
     owner = serializers.PrimaryKeyRelatedField(read_only=True)
+    duplicate_of = serializers.PrimaryKeyRelatedField(read_only=True)
     class Meta:
         model = ContextEntry
         fields = [
@@ -16,6 +17,7 @@ class ContextEntrySerializer(serializers.ModelSerializer):
             "processed_insights",
             "sentiment_score",
             "keywords",
+            "duplicate_of",
             "created_at",
         ]
         read_only_fields = ["processed_insights", "sentiment_score", "keywords", "created_at"]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from django.conf import settings
+
+from common.redis_client import get_redis, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+PENDING_KEY = "ai:contexts:pending"
+FLUSH_SCHEDULED_KEY = "ai:contexts:flush_scheduled"
+
+
+class ContextAnalysisBatcher:
+    """Collects new context entries in redis so they are analyzed in batches.
+
+    The first entry of a burst schedules a flush `CONTEXT_BATCH_WINDOW_SECONDS`
+    later; reaching `CONTEXT_BATCH_SIZE` pending entries flushes right away.
+    Without redis (or with eager Celery) every entry is analyzed on its own.
+    """
+
+    @staticmethod
+    def submit(entry_id: Any) -> None:
+        from contexts.tasks import process_context_batch, process_context_entry
+
+        client = None if settings.CELERY_TASK_ALWAYS_EAGER else get_redis()
+        if client is None:
+            process_context_entry.delay(str(entry_id))
+            return
+        size = settings.CONTEXT_BATCH_SIZE
+        window = settings.CONTEXT_BATCH_WINDOW_SECONDS
+        try:
+            pending = client.rpush(PENDING_KEY, str(entry_id))
+            # One immediate flush per full batch
+            if pending % size == 0:
+                process_context_batch.delay()
+            # The flag expires on its own in case the scheduled flush is lost
+            elif client.set(FLUSH_SCHEDULED_KEY, 1, nx=True, ex=max(1, int(window * 4))):
+                process_context_batch.apply_async(countdown=window)
+        except Exception as e:
+            logger.warning("contexts.batch.redis_error", extra={"error": e.__class__.__name__})
+            mark_unavailable()
+            process_context_entry.delay(str(entry_id))
+
+    @staticmethod
+    def take(limit: int) -> tuple[list[str], int]:
+        """Pop up to `limit` pending entry ids; returns (ids, still pending)."""
+        client = get_redis()
+        if client is None:
+            return [], 0
+        # Clear the flag first so entries arriving from now on schedule a new flush
+        client.delete(FLUSH_SCHEDULED_KEY)
+        pipe = client.pipeline(transaction=True)
+        pipe.lrange(PENDING_KEY, 0, limit - 1)
+        pipe.ltrim(PENDING_KEY, limit, -1)
+        pipe.llen(PENDING_KEY)
+        ids, _, remaining = pipe.execute()
+        return [i.decode() if isinstance(i, bytes) else str(i) for i in ids], int(remaining)
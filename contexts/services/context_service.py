@@ -1,10 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Optional
 
+from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
-from contexts.models import ContextEntry, ContextSourceType
+from ai.similarity import hamming, normalize_text, simhash64
+from contexts.models import ContextDedupMode, ContextEntry, ContextSourceType
 
 
 @dataclass
@@ -15,16 +19,74 @@ class ContextCreateDTO:
     owner_id: int | None = None
 
 
+def content_simhash(content: str) -> Optional[int]:
+    """SimHash of the normalized content as a signed 64-bit value (fits a BigIntegerField)."""
+    normalized = normalize_text(content)
+    if not normalized:
+        return None
+    value = simhash64(normalized)
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
 class ContextService:
+    @staticmethod
+    def find_duplicate(owner_id: int | None, fingerprint: Optional[int]) -> Optional[ContextEntry]:
+        """The owner's most recent original entry within CONTEXT_DEDUP_MAX_BITS of `fingerprint`.
+
+        An exact fingerprint hit comes from the (owner, simhash) index; near hits
+        are looked for among the last CONTEXT_DEDUP_WINDOW originals only.
+        """
+        if fingerprint is None:
+            return None
+        originals = ContextEntry.objects.filter(owner_id=owner_id, duplicate_of__isnull=True)
+        exact = originals.filter(simhash=fingerprint).order_by("-created_at").first()
+        if exact is not None:
+            return exact
+        max_bits = settings.CONTEXT_DEDUP_MAX_BITS
+        recent = originals.exclude(simhash__isnull=True).order_by("-created_at")
+        for entry_id, other in recent.values_list("id", "simhash")[: settings.CONTEXT_DEDUP_WINDOW]:
+            if hamming(fingerprint, other) <= max_bits:
+                return originals.get(id=entry_id)
+        return None
+
     @staticmethod
     @transaction.atomic
-    def ingest(dto: ContextCreateDTO) -> ContextEntry:
+    def ingest(dto: ContextCreateDTO) -> tuple[ContextEntry, bool]:
+        """Store a context entry; returns (entry, created) like get_or_create.
+
+        Depending on CONTEXT_DEDUP_MODE a near-duplicate of a recent entry is
+        stored pointing at it through `duplicate_of` (with its analysis copied),
+        or not stored at all, in which case the original is returned with its
+        `raw_metadata["duplicate_count"]` incremented.
+        """
+        fingerprint = content_simhash(dto.content)
+        mode = settings.CONTEXT_DEDUP_MODE
+        original = None
+        if mode != ContextDedupMode.OFF:
+            original = ContextService.find_duplicate(dto.owner_id, fingerprint)
+
+        if original is not None and mode == ContextDedupMode.MERGE:
+            original = ContextEntry.objects.select_for_update().get(pk=original.pk)
+            meta = dict(original.raw_metadata or {})
+            meta["duplicate_count"] = int(meta.get("duplicate_count") or 0) + 1
+            meta["last_duplicate_at"] = timezone.now().isoformat()
+            original.raw_metadata = meta
+            original.save(update_fields=["raw_metadata"])
+            return original, False
+
         entry = ContextEntry.objects.create(
             content=dto.content,
             source_type=dto.source_type,
             raw_metadata=dto.raw_metadata or {},
             owner_id=dto.owner_id,
+            simhash=fingerprint,
+            duplicate_of=original,
+            keywords=list(original.keywords or []) if original else [],
+            sentiment_score=original.sentiment_score if original else None,
+            processed_insights={**(original.processed_insights or {}), "duplicate_of": str(original.id)} if original else {},
         )
-        return entry
-
+        return entry, True
 
+    @staticmethod
+    def needs_analysis(entry: ContextEntry, created: bool) -> bool:
+        return created and entry.duplicate_of_id is None
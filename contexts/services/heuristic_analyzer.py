@@ -0,0 +1,90 @@
+"""Model-free context analysis: keywords, sentiment and urgency from cue lexicons.
+
+This is the fallback when the model is unavailable, so it is built to be
+cheap: the text is lowercased and tokenized once, and the same tokens feed
+keyword counting and a set lookup against every cue lexicon. Matching is
+whole-word (so "good" does not fire inside "goodbye"), inflected forms are
+listed per cue, and each distinct cue counts once.
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable
+
+
+URGENT, POSITIVE, NEGATIVE = "urgent", "positive", "negative"
+
+# cue -> (lexicon, matched forms); forms are listed because matching is whole-word
+CUES: dict[str, tuple[str, tuple[str, ...]]] = {
+    "urgent": (URGENT, ("urgent", "urgently")),
+    "asap": (URGENT, ("asap",)),
+    "immediately": (URGENT, ("immediately",)),
+    "today": (URGENT, ("today",)),
+    "deadline": (URGENT, ("deadline", "deadlines")),
+    "overdue": (URGENT, ("overdue",)),
+    "thanks": (POSITIVE, ("thanks", "thank you")),
+    "great": (POSITIVE, ("great",)),
+    "good": (POSITIVE, ("good",)),
+    "well done": (POSITIVE, ("well done",)),
+    "appreciate": (POSITIVE, ("appreciate", "appreciated")),
+    "delay": (NEGATIVE, ("delay", "delays", "delayed")),
+    "problem": (NEGATIVE, ("problem", "problems")),
+    "issue": (NEGATIVE, ("issue", "issues")),
+    "blocked": (NEGATIVE, ("blocked", "blocker", "blockers")),
+    "fail": (NEGATIVE, ("fail", "fails", "failed", "failing", "failure")),
+}
+WEIGHTS = {URGENT: 0.2, POSITIVE: 0.1, NEGATIVE: -0.1}
+
+STOPWORDS = frozenset({"this", "that", "with", "from", "have", "will", "your", "about", "https", "http"})
+
+_FORM_TO_CUE = {form: cue for cue, (_, forms) in CUES.items() for form in forms}
+_WORD_FORMS = frozenset(f for f in _FORM_TO_CUE if " " not in f)
+_PHRASE_FORMS = {tuple(f.split()): f for f in _FORM_TO_CUE if " " in f}
+_PHRASE_HEADS = frozenset(words[0] for words in _PHRASE_FORMS)
+# Runs of ASCII letters, the same tokens the keyword extractor has always used
+_TOKEN_RE = re.compile(r"[a-z]+")
+
+
+@dataclass(frozen=True)
+class HeuristicAnalysis:
+    keywords: list[str]
+    sentiment_score: float
+    has_urgency: bool
+    cues: tuple[str, ...]
+
+
+def _keywords(words: list[str], max_keywords: int) -> list[str]:
+    counts = Counter(w for w in words if len(w) >= 4 and w not in STOPWORDS)
+    return [w for w, _ in counts.most_common(max_keywords)]
+
+
+def _cues(words: list[str]) -> set[str]:
+    present = set(words)
+    found = {_FORM_TO_CUE[f] for f in present & _WORD_FORMS}
+    # Phrases are checked pairwise, and only when one of their first words occurs at all
+    if present & _PHRASE_HEADS:
+        found.update(_FORM_TO_CUE[_PHRASE_FORMS[pair]] for pair in zip(words, words[1:]) if pair in _PHRASE_FORMS)
+    return found
+
+
+def extract_keywords(text: str, max_keywords: int = 10) -> list[str]:
+    return _keywords(_TOKEN_RE.findall((text or "").lower()), max_keywords)
+
+
+def analyze(text: str, max_keywords: int = 10) -> HeuristicAnalysis:
+    words = _TOKEN_RE.findall((text or "").lower())
+    found = _cues(words)
+    lexicons = [CUES[c][0] for c in found]
+    sentiment = sum((WEIGHTS[lex] for lex in lexicons), 0.0)
+    return HeuristicAnalysis(
+        keywords=_keywords(words, max_keywords),
+        sentiment_score=max(-1.0, min(1.0, round(sentiment, 6))),
+        has_urgency=URGENT in lexicons,
+        cues=tuple(sorted(found)),
+    )
+
+
+def analyze_many(texts: Iterable[str], max_keywords: int = 10) -> list[HeuristicAnalysis]:
+    return [analyze(t, max_keywords) for t in texts]
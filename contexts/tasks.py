@@ -1,36 +1,30 @@
 from __future__ import annotations
 
-import re
-from collections import Counter
-from typing import Iterable
+from typing import Iterable, Optional
 
 from celery import shared_task
+from django.conf import settings
 from django.db import transaction
 
 from .models import ContextEntry
-from ai.orchestrator import AiOrchestrator
+from .services import heuristic_analyzer
+from .services.analysis_batcher import ContextAnalysisBatcher
+from ai.orchestrator import AiOrchestrator, ContextAnalysis
 from ai.provider_factory import get_provider
 
 
 def _extract_keywords(text: str, max_keywords: int = 10) -> list[str]:
-    words = re.findall(r"[A-Za-z]{4,}", text.lower())
-    stop = {"this", "that", "with", "from", "have", "will", "your", "about", "https", "http"}
-    filtered = [w for w in words if w not in stop]
-    common = Counter(filtered).most_common(max_keywords)
-    return [w for w, _ in common]
+    return heuristic_analyzer.extract_keywords(text, max_keywords)
 
 
-@shared_task
-def process_context_entry(entry_id: str) -> None:
-    entry = ContextEntry.objects.filter(id=entry_id).first()
-    if not entry:
-        return
-
-    # Prefer AI analysis when available, fallback to heuristic
+def _apply_analysis(
+    entry: ContextEntry,
+    analysis: Optional[ContextAnalysis],
+    heuristic: Optional[heuristic_analyzer.HeuristicAnalysis] = None,
+) -> None:
+    """Set keywords/sentiment/insights from the model's analysis, or from heuristics when it is None."""
     content = entry.content or ""
-    try:
-        orchestrator = AiOrchestrator(get_provider())
-        analysis = orchestrator.analyze_context(content=content, source_type=entry.source_type)
+    if analysis is not None:
         keywords = list(analysis.keywords or []) or _extract_keywords(content)
         sentiment = float(analysis.sentiment_score)
         insights = {
@@ -41,32 +35,62 @@ def process_context_entry(entry_id: str) -> None:
             "keyword_count": len(keywords),
             "reasoning": analysis.reasoning,
         }
-    except Exception:
-        keywords = _extract_keywords(content)
-        sentiment = 0.0
-        urgent_cues = ["urgent", "asap", "immediately", "today", "deadline", "overdue"]
-        positive_cues = ["thanks", "great", "good", "well done", "appreciate"]
-        negative_cues = ["delay", "problem", "issue", "blocked", "fail"]
-        for cue in urgent_cues:
-            if cue in content.lower():
-                sentiment += 0.2
-        for cue in positive_cues:
-            if cue in content.lower():
-                sentiment += 0.1
-        for cue in negative_cues:
-            if cue in content.lower():
-                sentiment -= 0.1
+    else:
+        heuristic = heuristic or heuristic_analyzer.analyze(content)
+        keywords = heuristic.keywords
+        sentiment = heuristic.sentiment_score
         insights = {
             "length": len(content),
-            "has_urgency": any(c in content.lower() for c in urgent_cues),
+            "has_urgency": heuristic.has_urgency,
             "source_type": entry.source_type,
             "keyword_count": len(keywords),
         }
+    entry.keywords = keywords
+    entry.sentiment_score = max(-1.0, min(1.0, sentiment))
+    entry.processed_insights = insights
 
+
+def analyze_entries(entries: Iterable[ContextEntry]) -> int:
+    """Analyze entries with one batched model call where possible and save them in bulk."""
+    entries = list(entries)
+    if not entries:
+        return 0
+    # Prefer AI analysis when available; entries it does not cover get the heuristics in one pass
+    try:
+        orchestrator = AiOrchestrator(get_provider())
+        analyses = orchestrator.analyze_contexts([(str(e.id), e.content or "", e.source_type) for e in entries])
+    except Exception:
+        analyses = {}
+    missing = [entry for entry in entries if analyses.get(str(entry.id)) is None]
+    heuristics = dict(zip((e.id for e in missing), heuristic_analyzer.analyze_many(e.content or "" for e in missing)))
+    for entry in entries:
+        _apply_analysis(entry, analyses.get(str(entry.id)), heuristics.get(entry.id))
+    # Near-duplicates stored before their original was analyzed take over its analysis
+    by_id = {entry.id: entry for entry in entries}
+    duplicates = list(ContextEntry.objects.filter(duplicate_of__in=list(by_id)))
+    for duplicate in duplicates:
+        original = by_id[duplicate.duplicate_of_id]
+        duplicate.keywords = original.keywords
+        duplicate.sentiment_score = original.sentiment_score
+        duplicate.processed_insights = {**original.processed_insights, "duplicate_of": str(original.id)}
     with transaction.atomic():
-        entry.keywords = keywords
-        entry.sentiment_score = max(-1.0, min(1.0, sentiment))
-        entry.processed_insights = insights
-        entry.save(update_fields=["keywords", "sentiment_score", "processed_insights"])
+        ContextEntry.objects.bulk_update(entries + duplicates, ["keywords", "sentiment_score", "processed_insights"])
+    return len(entries)
 
 
+@shared_task
+def process_context_entry(entry_id: str) -> None:
+    entry = ContextEntry.objects.filter(id=entry_id).first()
+    if not entry or entry.duplicate_of_id:
+        return
+    analyze_entries([entry])
+
+
+@shared_task
+def process_context_batch() -> int:
+    """Flush the pending-entry buffer filled by ContextAnalysisBatcher, one batch per run."""
+    ids, remaining = ContextAnalysisBatcher.take(settings.CONTEXT_BATCH_SIZE)
+    if remaining:
+        # More arrived than fit in one batch; keep draining without waiting for the window
+        process_context_batch.delay()
+    return analyze_entries(ContextEntry.objects.filter(id__in=ids, duplicate_of__isnull=True))
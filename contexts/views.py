@@ -1,12 +1,13 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
 from rest_framework import mixins, viewsets
-from rest_framework.filters import OrderingFilter, SearchFilter
+
+from common.search import RELEVANCE, FullTextIndex, FullTextSearchFilter, RelevanceOrderingFilter
 
 from .models import ContextEntry
 from .serializers import ContextEntrySerializer
 from .services.context_service import ContextCreateDTO, ContextService
-from .tasks import process_context_entry
+from .services.analysis_batcher import ContextAnalysisBatcher
 
 
 class ContextEntryViewSet(
@@ -17,10 +18,12 @@ class ContextEntryViewSet(
 ):
     queryset = ContextEntry.objects.select_related("owner").all()
     serializer_class = ContextEntrySerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RelevanceOrderingFilter]
     filterset_fields = ["source_type"]
+    # Full-text index created by contexts/migrations/0004_context_search; search_fields is the fallback
+    search_index = FullTextIndex(ContextEntry._meta.db_table, (("content", "A"),))
     search_fields = ["content"]
-    ordering_fields = ["created_at"]
+    ordering_fields = [RELEVANCE, "created_at"]
     ordering = ["-created_at"]
 
     def perform_create(self, serializer):
@@ -31,10 +34,12 @@ class ContextEntryViewSet(
             raw_metadata=validated.get("raw_metadata", {}),
             owner_id=self.request.user.id if self.request and self.request.user and self.request.user.is_authenticated else None,
         )
-        entry = ContextService.ingest(dto)
+        entry, created = ContextService.ingest(dto)
         serializer.instance = entry
-        # Enqueue async processing unless running in eager mode
-        process_context_entry.delay(str(entry.id))
+        # Analyzed asynchronously, batched with other entries created around the same time;
+        # near-duplicates reuse their original's analysis
+        if ContextService.needs_analysis(entry, created):
+            ContextAnalysisBatcher.submit(entry.id)
 
     def get_queryset(self):
         qs = super().get_queryset()
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import AiJob
+
+
+@admin.register(AiJob)
+class AiJobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "status", "owner", "task", "created_at", "finished_at")
+    list_filter = ("kind", "status", "created_at")
+    ordering = ("-created_at",)
+    readonly_fields = ("params", "result", "error")
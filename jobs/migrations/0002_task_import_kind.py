@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='aijob',
+            name='kind',
+            field=models.CharField(choices=[('ai_apply', 'Apply AI suggestions'), ('schedule_suggestions', 'Schedule suggestions'), ('nl_create', 'Create tasks from text'), ('link_contexts_ai', 'Link contexts'), ('task_import', 'Import tasks')], max_length=32),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import uuid
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class AiJobKind(models.TextChoices):
+    AI_APPLY = "ai_apply", "Apply AI suggestions"
+    SCHEDULE_SUGGESTIONS = "schedule_suggestions", "Schedule suggestions"
+    NL_CREATE = "nl_create", "Create tasks from text"
+    LINK_CONTEXTS = "link_contexts_ai", "Link contexts"
+    TASK_IMPORT = "task_import", "Import tasks"
+
+
+class AiJobStatus(models.TextChoices):
+    QUEUED = "queued", "Queued"
+    RUNNING = "running", "Running"
+    SUCCEEDED = "succeeded", "Succeeded"
+    FAILED = "failed", "Failed"
+
+
+FINISHED_STATUSES = (AiJobStatus.SUCCEEDED, AiJobStatus.FAILED)
+
+
+class AiJob(models.Model):
+    """An AI action run in the background; `result` holds the synchronous endpoint's response body."""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.CASCADE, related_name="ai_jobs")
+    kind = models.CharField(max_length=32, choices=AiJobKind.choices)
+    status = models.CharField(max_length=16, choices=AiJobStatus.choices, default=AiJobStatus.QUEUED)
+    task = models.ForeignKey("tasks.Task", null=True, blank=True, on_delete=models.SET_NULL, related_name="ai_jobs")
+    params = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    webhook_url = models.URLField(max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["owner", "-created_at"]),
+        ]
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"{self.kind} ({self.status})"
@@ -0,0 +1,30 @@
+from rest_framework import serializers
+
+from .models import AiJob
+from .services.job_service import INTERNAL_PARAMS
+
+
+class AiJobSerializer(serializers.ModelSerializer):
+    owner = serializers.PrimaryKeyRelatedField(read_only=True)
+    params = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AiJob
+        fields = [
+            "id",
+            "owner",
+            "kind",
+            "status",
+            "task",
+            "params",
+            "result",
+            "error",
+            "webhook_url",
+            "created_at",
+            "started_at",
+            "finished_at",
+        ]
+        read_only_fields = fields
+
+    def get_params(self, obj: AiJob) -> dict:
+        return {k: v for k, v in (obj.params or {}).items() if k not in INTERNAL_PARAMS}
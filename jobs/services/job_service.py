@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import AiJob, AiJobKind, AiJobStatus
+
+logger = logging.getLogger(__name__)
+
+
+# Each handler is called as handler(task, params) and returns the response body
+# of the matching synchronous endpoint
+HANDLERS = {
+    AiJobKind.AI_APPLY: "tasks.services.ai_actions.apply_suggestions",
+    AiJobKind.SCHEDULE_SUGGESTIONS: "tasks.services.ai_actions.suggest_schedule",
+    AiJobKind.NL_CREATE: "tasks.services.ai_actions.create_from_text",
+    AiJobKind.LINK_CONTEXTS: "tasks.services.ai_actions.link_contexts",
+    AiJobKind.TASK_IMPORT: "tasks.services.import_service.import_job",
+}
+# Called as cleanup(params) when a job is given up for stale, to release what its handler would have
+STALE_CLEANUPS = {
+    AiJobKind.TASK_IMPORT: "tasks.services.import_service.discard_upload",
+}
+TASKLESS_KINDS = {AiJobKind.NL_CREATE, AiJobKind.TASK_IMPORT}
+# Params only the handler needs; left out of the job API and webhook bodies
+INTERNAL_PARAMS = frozenset({"path", "owner_id"})
+# Kinds that are database work rather than model calls skip the AI worker
+QUEUES = {AiJobKind.TASK_IMPORT: "cpu"}
+
+SIGNATURE_HEADER = "X-Ergotask-Signature"
+
+
+@dataclass
+class AiJobCreateDTO:
+    kind: str
+    owner_id: Optional[int] = None
+    task_id: Optional[Any] = None
+    params: dict = field(default_factory=dict)
+    webhook_url: str = ""
+
+
+class AiJobService:
+    @staticmethod
+    def validate_webhook_url(url: str) -> str:
+        """Accept http(s) URLs on allowed hosts that resolve only to public addresses."""
+        url = (url or "").strip()
+        if not url:
+            return ""
+        AiJobService.webhook_address(url)
+        return url
+
+    @staticmethod
+    def webhook_address(url: str) -> str:
+        """The public address to deliver a webhook URL to; raises ValidationError if there is none.
+
+        Delivery connects to this address rather than resolving the host again,
+        so a host re-pointed at an internal address after the check (DNS
+        rebinding) is never reached.
+        """
+        URLValidator(schemes=["http", "https"])(url)
+        parsed = urlparse(url)
+        host = parsed.hostname or ""
+        allowed = getattr(settings, "AI_JOB_WEBHOOK_ALLOWED_HOSTS", [])
+        if allowed and host not in allowed:
+            raise ValidationError("Webhook host is not allowed.")
+        try:
+            infos = socket.getaddrinfo(host, parsed.port or (443 if parsed.scheme == "https" else 80))
+        except (socket.gaierror, UnicodeError):
+            raise ValidationError("Webhook host does not resolve.")
+        addresses = []
+        for info in infos:
+            address = ipaddress.ip_address(info[4][0].split("%", 1)[0])
+            address = getattr(address, "ipv4_mapped", None) or address
+            if not address.is_global:
+                # Loopback, private, link-local (cloud metadata), reserved, ...
+                raise ValidationError("Webhook host resolves to a non-public address.")
+            addresses.append(str(address))
+        if not addresses:
+            raise ValidationError("Webhook host does not resolve.")
+        return addresses[0]
+
+    @staticmethod
+    def enqueue(dto: AiJobCreateDTO) -> AiJob:
+        """Create a queued job and dispatch it to a worker once the transaction commits."""
+        from jobs.tasks import run_ai_job
+
+        job = AiJob.objects.create(
+            kind=dto.kind,
+            owner_id=dto.owner_id,
+            task_id=dto.task_id,
+            params=dto.params or {},
+            webhook_url=AiJobService.validate_webhook_url(dto.webhook_url),
+        )
+        options = {"queue": QUEUES[dto.kind]} if dto.kind in QUEUES else {}
+        transaction.on_commit(lambda: run_ai_job.apply_async((str(job.id),), **options))
+        return job
+
+    @staticmethod
+    def run(job_id: Any) -> Optional[AiJob]:
+        """Execute a queued job. Returns None when another worker already claimed it."""
+        claimed = AiJob.objects.filter(id=job_id, status=AiJobStatus.QUEUED).update(
+            status=AiJobStatus.RUNNING, started_at=timezone.now()
+        )
+        if not claimed:
+            return None
+        job = AiJob.objects.select_related("task").get(id=job_id)
+        try:
+            if job.task is None and job.kind not in TASKLESS_KINDS:
+                raise LookupError("The task for this job no longer exists")
+            handler = import_string(HANDLERS[job.kind])
+            job.result = handler(job.task, job.params)
+            job.status = AiJobStatus.SUCCEEDED
+        except Exception as e:
+            logger.exception("jobs.ai_job.failed", extra={"job_id": str(job.id), "kind": job.kind})
+            job.status = AiJobStatus.FAILED
+            job.error = f"{e.__class__.__name__}: {e}"
+        job.finished_at = timezone.now()
+        # Only if still RUNNING: fail_stale may have given up on this job meanwhile
+        saved = AiJob.objects.filter(id=job.id, status=AiJobStatus.RUNNING).update(
+            status=job.status, result=job.result, error=job.error, finished_at=job.finished_at
+        )
+        if not saved:
+            logger.warning("jobs.ai_job.finished_after_stale", extra={"job_id": str(job.id), "kind": job.kind})
+            return job
+        AiJobService.notify(job)
+        return job
+
+    @staticmethod
+    def fail_stale(older_than: timedelta) -> int:
+        """Fail RUNNING jobs started more than `older_than` ago (their worker died); returns how many."""
+        now = timezone.now()
+        failed = 0
+        for job in AiJob.objects.filter(status=AiJobStatus.RUNNING, started_at__lt=now - older_than):
+            error = "WorkerLost: the job did not finish in time"
+            if not AiJob.objects.filter(id=job.id, status=AiJobStatus.RUNNING).update(
+                status=AiJobStatus.FAILED, error=error, finished_at=now
+            ):
+                continue
+            job.status, job.error, job.finished_at = AiJobStatus.FAILED, error, now
+            logger.warning("jobs.ai_job.stale", extra={"job_id": str(job.id), "kind": job.kind})
+            if job.kind in STALE_CLEANUPS:
+                try:
+                    import_string(STALE_CLEANUPS[job.kind])(job.params)
+                except Exception:
+                    logger.exception("jobs.ai_job.cleanup_failed", extra={"job_id": str(job.id)})
+            AiJobService.notify(job)
+            failed += 1
+        return failed
+
+    @staticmethod
+    def notify(job: AiJob) -> None:
+        if job.webhook_url:
+            from jobs.tasks import deliver_job_webhook
+
+            deliver_job_webhook.delay(str(job.id))
+
+    @staticmethod
+    def webhook_request(job: AiJob, address: str) -> dict[str, Any]:
+        """httpx.Client.post() arguments for delivering `job` to its webhook, pinned to `address`.
+
+        The URL names the address and the original host goes in Host (and SNI for
+        https, so the certificate is still checked against the host name).
+        """
+        from jobs.serializers import AiJobSerializer
+
+        body = json.dumps(AiJobSerializer(job).data, cls=DjangoJSONEncoder).encode("utf-8")
+        secret = (getattr(settings, "AI_JOB_WEBHOOK_SECRET", "") or settings.SECRET_KEY).encode("utf-8")
+        signature = hmac.new(secret, body, hashlib.sha256).hexdigest()
+        parsed = urlparse(job.webhook_url)
+        pinned_host = f"[{address}]" if ":" in address else address
+        host = f"[{parsed.hostname}]" if ":" in parsed.hostname else parsed.hostname
+        port = "" if parsed.port is None else f":{parsed.port}"
+        return {
+            "url": parsed._replace(netloc=pinned_host + port).geturl(),
+            "content": body,
+            "headers": {
+                "Content-Type": "application/json",
+                "Host": host + port,
+                SIGNATURE_HEADER: f"sha256={signature}",
+            },
+            "auth": (parsed.username, parsed.password or "") if parsed.username else None,
+            "extensions": {"sni_hostname": parsed.hostname} if parsed.scheme == "https" else {},
+        }
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+import httpx
+from celery import shared_task
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from .models import AiJob
+from .services.job_service import AiJobService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def run_ai_job(job_id: str) -> str | None:
+    job = AiJobService.run(job_id)
+    return job.status if job else None
+
+
+@shared_task
+def fail_stale_jobs() -> int:
+    """Periodic: fail jobs left RUNNING by a worker that died."""
+    return AiJobService.fail_stale(timedelta(minutes=settings.AI_JOB_STALE_MINUTES))
+
+
+@shared_task(bind=True, autoretry_for=(httpx.HTTPError,), retry_backoff=True, retry_backoff_max=300, max_retries=5)
+def deliver_job_webhook(self, job_id: str) -> int | None:
+    """POST the finished job to its webhook URL, signed with HMAC-SHA256; retried with backoff."""
+    job = AiJob.objects.filter(id=job_id).first()
+    if not job or not job.webhook_url:
+        return None
+    try:
+        # Checked again: the host may resolve differently now than when the job was created
+        address = AiJobService.webhook_address(job.webhook_url)
+    except ValidationError:
+        logger.warning("jobs.webhook.refused", extra={"job_id": str(job.id)})
+        return None
+    with httpx.Client(timeout=10.0, follow_redirects=False) as client:
+        response = client.post(**AiJobService.webhook_request(job, address))
+    response.raise_for_status()
+    return response.status_code
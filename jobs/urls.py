@@ -0,0 +1,12 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import AiJobViewSet
+
+
+router = DefaultRouter()
+router.register(r"jobs", AiJobViewSet, basename="job")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
@@ -0,0 +1,65 @@
+from django.core.exceptions import ValidationError
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, status, viewsets
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from .models import AiJob
+from .serializers import AiJobSerializer
+from .services.job_service import AiJobCreateDTO, AiJobService
+
+# Seconds a client should wait before polling an unfinished job again
+POLL_RETRY_AFTER = 2
+
+
+def async_requested(request) -> bool:
+    """`?async=1` or `Prefer: respond-async` asks for a 202 and a job instead of waiting for the model."""
+    flag = (request.query_params.get("async") or "").lower()
+    return flag in ("1", "true", "yes") or "respond-async" in request.headers.get("Prefer", "")
+
+
+def enqueue_response(request, kind: str, task=None, params: dict | None = None) -> Response:
+    """Queue an AI job for the current user and answer 202 with the job and its Location."""
+    user = request.user
+    try:
+        job = AiJobService.enqueue(
+            AiJobCreateDTO(
+                kind=kind,
+                owner_id=user.id if user and user.is_authenticated else None,
+                task_id=task.id if task is not None else None,
+                params=params or {},
+                webhook_url=str(request.data.get("webhook_url") or "") if hasattr(request.data, "get") else "",
+            )
+        )
+    except ValidationError as e:
+        return Response({"webhook_url": e.messages}, status=status.HTTP_400_BAD_REQUEST)
+    # Eager Celery has already run it; report whatever state it is in now
+    job.refresh_from_db()
+    headers = {"Location": reverse("job-detail", args=[job.id], request=request)}
+    if not job.is_finished:
+        headers["Retry-After"] = str(POLL_RETRY_AFTER)
+    return Response(AiJobSerializer(job).data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+
+class AiJobViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    queryset = AiJob.objects.all()
+    serializer_class = AiJobSerializer
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ["kind", "status", "task"]
+    ordering_fields = ["created_at", "finished_at"]
+    ordering = ["-created_at"]
+
+    def retrieve(self, request, *args, **kwargs):
+        """Poll here (or pass a `webhook_url`) for the result; unfinished jobs carry `Retry-After`."""
+        response = super().retrieve(request, *args, **kwargs)
+        if response.data.get("finished_at") is None:
+            response["Retry-After"] = str(POLL_RETRY_AFTER)
+        return response
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        user = getattr(self.request, "user", None)
+        if user and user.is_authenticated:
+            return qs.filter(owner=user)
+        return qs.none()
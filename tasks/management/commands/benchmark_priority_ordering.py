@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import random
+import statistics
+import time
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from tasks.models import Task, TaskStatus
+from tasks.services.priority_engine import recompute_all
+from tasks.services.priority_query import EFFECTIVE_PRIORITY, with_effective_priority
+from tasks.services.task_service import TaskService
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare ordering by the stored priority_score with the live effective_priority expression"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100_000)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--keep", action="store_true", help="Keep the generated tasks instead of rolling back")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                if not options["keep"]:
+                    raise _Rollback
+        except _Rollback:
+            self.stdout.write("Generated tasks rolled back")
+
+    def _run(self, options):
+        rng = random.Random(options["seed"])
+        now = timezone.now()
+        user = get_user_model().objects.create(username=f"bench-{uuid4().hex[:8]}")
+        statuses = [TaskStatus.TODO, TaskStatus.IN_PROGRESS, TaskStatus.DONE]
+
+        started = time.monotonic()
+        batch = []
+        for i in range(options["rows"]):
+            due = now + timezone.timedelta(hours=rng.uniform(-48, 24 * 21)) if rng.random() < 0.8 else None
+            meta = {"last_ai": {"priority_score": round(rng.random(), 3)}} if rng.random() < 0.5 else {}
+            batch.append(
+                Task(
+                    owner=user,
+                    title=f"Benchmark task {i}",
+                    status=rng.choice(statuses),
+                    priority_score=rng.random(),
+                    due_date=due,
+                    ai_metadata=meta,
+                )
+            )
+            if len(batch) >= 5000:
+                Task.objects.bulk_create(batch)
+                batch = []
+        Task.objects.bulk_create(batch)
+        self.stdout.write(f"Inserted {options['rows']} tasks in {time.monotonic() - started:.2f}s")
+
+        qs = Task.objects.filter(owner=user)
+        page = options["page_size"]
+        stored = self._time(lambda: list(qs.order_by("-priority_score", "due_date").values_list("pk", flat=True)[:page]), options)
+        live = self._time(
+            lambda: list(
+                with_effective_priority(qs, now).order_by(f"-{EFFECTIVE_PRIORITY}", "due_date").values_list("pk", flat=True)[:page]
+            ),
+            options,
+        )
+        self.stdout.write(f"First page ordered by stored priority_score: {stored * 1000:.1f} ms (median)")
+        self.stdout.write(f"First page ordered by live effective_priority: {live * 1000:.1f} ms (median)")
+
+        # The expression must agree with the per-task formula; check before the
+        # recompute pass rewrites the stored scores it reads
+        sample = list(with_effective_priority(qs, now).order_by("?")[:200])
+        worst = 0.0
+        for task in sample:
+            expected = TaskService.recompute_priority(task, now=now)
+            worst = max(worst, abs(expected - getattr(task, EFFECTIVE_PRIORITY)))
+        self.stdout.write(f"Max difference from TaskService.recompute_priority on 200 rows: {worst:.2e}")
+
+        started = time.monotonic()
+        result = recompute_all(qs, now=now)
+        self.stdout.write(
+            f"Full recompute pass (alternative to the live ordering): {time.monotonic() - started:.2f}s, "
+            f"{result.updated} scores changed"
+        )
+
+    def _time(self, fn, options) -> float:
+        fn()  # warm up
+        samples = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples)
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from contexts.views import ContextEntryViewSet
+from tasks.views import TaskViewSet
+
+
+class Command(BaseCommand):
+    help = "Recreate the full-text search indexes for tasks and contexts (e.g. after a SQLite table rebuild)"
+
+    def handle(self, *args, **options):
+        for index in (TaskViewSet.search_index, ContextEntryViewSet.search_index):
+            index.rebuild(connection)
+            self.stdout.write(f"Rebuilt search index for {index.table}")
+        self.stdout.write(self.style.SUCCESS("Search indexes rebuilt."))
@@ -44,6 +44,7 @@ class Command(BaseCommand):
                 "category": work,
                 "status": TaskStatus.TODO,
                 "due_date": timezone.now() + timezone.timedelta(days=2),
+                "urgency_next_at": timezone.now(),
             },
         )
         t2, _ = Task.objects.get_or_create(
@@ -53,6 +54,7 @@ class Command(BaseCommand):
                 "category": personal,
                 "status": TaskStatus.TODO,
                 "due_date": timezone.now() + timezone.timedelta(days=1),
+                "urgency_next_at": timezone.now(),
             },
         )
         if contexts:
@@ -71,6 +71,7 @@ class Command(BaseCommand):
                 category=random.choice(list(categories.values())),
                 status=random.choice(statuses),
                 due_date=(now + timezone.timedelta(days=random.randint(0, 14))),
+                urgency_next_at=now,
                 priority_score=random.random(),
             )
 
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:19
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_urgency_next_at(apps, schema_editor):
+    # Mark every task with a due date as due now; the next refresh run computes the real times
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(due_date__isnull=False).update(urgency_next_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='urgency_next_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_urgency_next_at, migrations.RunPython.noop),
+    ]
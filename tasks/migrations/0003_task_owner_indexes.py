@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+        ('contexts', '0002_add_owner'),
+        ('tasks', '0002_urgency_next_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', '-priority_score'], name='tasks_task_owner_i_91e55c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'due_date'], name='tasks_task_owner_i_3addd0_idx'),
+        ),
+    ]
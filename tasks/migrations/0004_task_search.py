@@ -0,0 +1,25 @@
+from django.db import migrations
+
+from common.search import FullTextIndex
+
+
+SEARCH_INDEX = FullTextIndex("tasks_task", (("title", "A"), ("description", "B")))
+
+
+def create_search_index(apps, schema_editor):
+    SEARCH_INDEX.create(schema_editor)
+
+
+def drop_search_index(apps, schema_editor):
+    SEARCH_INDEX.drop(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_task_owner_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
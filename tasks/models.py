@@ -23,7 +23,12 @@ class Task(models.Model):
     category = models.ForeignKey(Category, null=True, blank=True, on_delete=models.SET_NULL)
     status = models.CharField(max_length=20, choices=TaskStatus.choices, default=TaskStatus.TODO)
     priority_score = models.FloatField(default=0.0)
+    # Stored score that urgency refreshes start from, so they don't feed on their own
+    # output; NULL means the current priority_score (captured by the next refresh)
+    priority_base = models.FloatField(null=True, blank=True)
     due_date = models.DateTimeField(null=True, blank=True)
+    # When the time-dependent part of priority_score next changes; NULL when it no longer will
+    urgency_next_at = models.DateTimeField(null=True, blank=True, db_index=True)
     ai_metadata = models.JSONField(default=dict, blank=True)
     contexts = models.ManyToManyField(ContextEntry, blank=True, related_name="tasks")
     created_at = models.DateTimeField(auto_now_add=True)
@@ -35,6 +40,10 @@ class Task(models.Model):
             models.Index(fields=["priority_score"]),
             models.Index(fields=["due_date"]),
             models.Index(fields=["created_at"]),
+            # Per-owner list paths: stored-score ordering and the due-date ramp that
+            # the live effective_priority ordering reads
+            models.Index(fields=["owner", "-priority_score"]),
+            models.Index(fields=["owner", "due_date"]),
         ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial
@@ -10,6 +10,8 @@ class TaskSerializer(serializers.ModelSerializer):
     category_detail = CategorySerializer(source="category", read_only=True)
     contexts_detail = ContextEntrySerializer(source="contexts", many=True, read_only=True)
     owner = serializers.PrimaryKeyRelatedField(read_only=True)
+    # Only present when the queryset was annotated (ordering=effective_priority)
+    effective_priority = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Task
@@ -22,6 +24,7 @@ class TaskSerializer(serializers.ModelSerializer):
             "category_detail",
             "status",
             "priority_score",
+            "effective_priority",
             "due_date",
             "ai_metadata",
             "contexts",
@@ -0,0 +1,228 @@
+"""AI actions on tasks, shared by the synchronous endpoints and background jobs.
+
+Each action takes the task (or None) and the request parameters and returns
+the JSON body the synchronous endpoint responds with, so an async job's result
+has exactly the same shape.
+"""
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import timezone as dt_timezone
+from typing import Any, Optional
+
+from django.utils import timezone
+
+from ai.orchestrator import AiOrchestrator
+from ai.planner import PlanConstraints, PlanItem, default_reasoning, estimate_effort_minutes, plan_day
+from ai.provider_factory import get_provider
+from catalog.services.category_resolver import CategoryResolver
+from catalog.services.category_service import CategoryService
+from contexts.models import ContextEntry
+from tasks.models import Task
+from tasks.services.ai_payloads import budgeted_context_payloads, context_payloads, task_payload
+from tasks.services.task_service import TaskCreateDTO, TaskService
+
+
+def _parse_datetime(value: Any):
+    s = str(value).replace("Z", "+00:00")
+    dt = timezone.datetime.fromisoformat(s)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
+    return dt
+
+
+def apply_suggestions(task: Task, params: Optional[dict] = None) -> dict:
+    """Run AI suggestions and persist best-effort updates on the task.
+
+    Applies:
+    - enhanced_description
+    - suggested_deadline
+    - category (match existing by case-insensitive name, otherwise auto-create from first suggestion)
+    - priority_score
+    Stores the raw suggestion in ai_metadata under key 'last_ai_apply'.
+    """
+    from tasks.serializers import TaskSerializer
+
+    orchestrator = AiOrchestrator(get_provider())
+    payload_task = task_payload(task)
+    payload_contexts = context_payloads(task)
+    bundle = orchestrator.suggest_for_task(task=payload_task, contexts=payload_contexts)
+
+    # Apply description
+    if bundle.enhanced_description:
+        task.description = bundle.enhanced_description
+
+    # Apply deadline
+    if bundle.suggested_deadline:
+        try:
+            dt = _parse_datetime(bundle.suggested_deadline)
+            task.due_date = dt
+            task.urgency_next_at = TaskService.next_urgency_change(dt)
+        except Exception:
+            # ignore parse errors; keep existing due_date
+            pass
+
+    # Apply category: first suggestion naming an existing one (case-insensitive), else create the first
+    suggestions = bundle.categories or []
+    chosen_category = CategoryResolver.choose(suggestions)
+    if chosen_category:
+        task.category = chosen_category
+
+    # Apply priority score
+    try:
+        pr = float(bundle.priority_score)
+        task.priority_score = max(0.0, min(1.0, pr))
+        task.priority_base = task.priority_score
+    except Exception:
+        pass
+
+    # Record metadata
+    meta = dict(task.ai_metadata or {})
+    meta["last_ai_apply"] = {
+        "priority_score": bundle.priority_score,
+        "suggested_deadline": bundle.suggested_deadline,
+        "categories": suggestions,
+        "reasoning": bundle.reasoning,
+    }
+    task.ai_metadata = meta
+
+    task.save()
+
+    # Touch category usage if applicable
+    if chosen_category:
+        try:
+            CategoryService.touch_usage(chosen_category)
+        except Exception:
+            pass
+
+    return TaskSerializer(task).data
+
+
+def suggest_schedule(task: Task, params: Optional[dict] = None) -> dict:
+    orchestrator = AiOrchestrator(get_provider())
+    payload_task = task_payload(task)
+    payload_contexts = context_payloads(task, operation="schedule")
+    suggestion = orchestrator.suggest_schedule(task=payload_task, contexts=payload_contexts)
+    return {
+        "blocks": [{"start": b.start, "end": b.end, "label": b.label} for b in suggestion.blocks],
+        "recommended_deadline": suggestion.recommended_deadline,
+        "reasoning": suggestion.reasoning,
+    }
+
+
+def create_task_from_ai(t: dict) -> Task:
+    cat = CategoryResolver.choose(t.get("categories") or [])
+    # parse due_date if provided
+    due_val = None
+    due_iso = t.get("due_date")
+    if due_iso:
+        try:
+            due_val = _parse_datetime(due_iso)
+        except Exception:
+            due_val = None
+    dto = TaskCreateDTO(title=t.get("title") or "Untitled", description=t.get("description") or "", category=cat, due_date=due_val)
+    task = TaskService.create_task(dto)
+    if cat:
+        try:
+            CategoryService.touch_usage(cat)
+        except Exception:
+            pass
+    return task
+
+
+def create_from_text(task: Optional[Task], params: dict) -> dict:
+    """Create multiple tasks from free-text input (`params["text"]`)."""
+    orchestrator = AiOrchestrator(get_provider())
+    created = [str(create_task_from_ai(t).id) for t in orchestrator.generate_tasks_from_text(text=params["text"])]
+    return {"created": created, "count": len(created)}
+
+
+def link_contexts(task: Task, params: Optional[dict] = None) -> dict:
+    """Link top-k contexts (`params["k"]`, default 5) to the task using AI selection."""
+    k = int((params or {}).get("k") or 5)
+    payload_task = task_payload(task)
+    all_contexts = context_payloads(task, operation="select")
+    # If task has no contexts yet, consider recent global contexts
+    if not all_contexts:
+        recent = list(ContextEntry.objects.filter(duplicate_of__isnull=True).order_by("-created_at")[:50])
+        all_contexts = budgeted_context_payloads(recent, payload_task, operation="select")
+
+    orchestrator = AiOrchestrator(get_provider())
+    ids = orchestrator.select_context_ids(task=payload_task, contexts=all_contexts, k=k)
+    selected = list(ContextEntry.objects.filter(id__in=ids))
+    if selected:
+        task.contexts.add(*selected)
+    return {"linked": [str(c.id) for c in selected]}
+
+
+def _plan_constraints(params: dict) -> PlanConstraints:
+    """Working hours from AI_PLAN_* settings, overridable per request with start/end ("HH:MM") and days."""
+    constraints = PlanConstraints.from_env()
+    hours = constraints.hours
+    if params.get("start"):
+        hours = replace(hours, start=timezone.datetime.strptime(str(params["start"]), "%H:%M").time())
+    if params.get("end"):
+        hours = replace(hours, end=timezone.datetime.strptime(str(params["end"]), "%H:%M").time())
+    if params.get("timezone"):
+        hours = replace(hours, tz=str(params["timezone"]))
+        hours.windows(timezone.now(), 0)  # fail early on an unknown zone
+    days = params.get("days")
+    return replace(constraints, hours=hours, horizon_days=max(1, min(14, int(days))) if days else constraints.horizon_days)
+
+
+def plan_active_tasks(tasks: list[Task], params: Optional[dict] = None) -> dict:
+    """Pack tasks into one non-overlapping plan with the local planner.
+
+    `params["labels"] == "ai"` adds a single model call that rewrites block
+    labels and reasoning; the times are never changed by it.
+    """
+    params = params or {}
+    now = timezone.now()
+    items = {
+        str(t.id): PlanItem(
+            key=str(t.id),
+            title=t.title,
+            priority=float(t.priority_score or 0.0),
+            due=t.due_date,
+            effort_minutes=estimate_effort_minutes({"description": t.description, "ai_metadata": t.ai_metadata}),
+        )
+        for t in tasks
+    }
+    plan = plan_day(items.values(), now=now, constraints=_plan_constraints(params))
+
+    labels: dict[str, dict[str, str]] = {}
+    if str(params.get("labels") or "").lower() == "ai" and plan.blocks:
+        orchestrator = AiOrchestrator(get_provider())
+        labels = orchestrator.label_plan(
+            [
+                {
+                    "key": key,
+                    "title": items[key].title,
+                    "due": items[key].due.isoformat() if items[key].due else None,
+                    "blocks": [[b.start.isoformat(), b.end.isoformat()] for b in plan.blocks[key]],
+                }
+                for key in plan.ordered_keys()
+            ]
+        )
+
+    entries = []
+    for key in plan.ordered_keys():
+        item = items[key]
+        blocks = plan.blocks[key]
+        label = labels.get(key, {}).get("label") or item.title
+        entries.append(
+            {
+                "task_id": key,
+                "title": item.title,
+                "blocks": [{"start": b.start.isoformat(), "end": b.end.isoformat(), "label": label} for b in blocks],
+                "recommended_deadline": (item.due or blocks[-1].end).isoformat(),
+                "reasoning": labels.get(key, {}).get("reasoning") or default_reasoning(item, plan),
+                "at_risk": key in plan.late,
+            }
+        )
+    unscheduled = [
+        {"task_id": key, "title": items[key].title, "minutes": minutes}
+        for key, minutes in plan.unplaced.items()
+        if key not in plan.blocks
+    ]
+    return {"now": now.isoformat(), "plan": entries, "unscheduled": unscheduled}
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Iterable
+
+from ai.budget import DEFAULT_OPERATION, fit_contexts
+from ai.cache import canonical_json
+from tasks.models import Task
+
+
+# Bump when the payload shape changes so stored fingerprints stop matching
+FINGERPRINT_VERSION = 1
+
+
+def task_payload(task: Task) -> dict[str, Any]:
+    """Task fields sent to the model. Expects `category` to be select_related."""
+    return {
+        "title": task.title,
+        "description": task.description,
+        "category_name": task.category.name if task.category else None,
+        "status": task.status,
+        "due_date": task.due_date.isoformat() if task.due_date else None,
+    }
+
+
+def context_payload(context) -> dict[str, Any]:
+    return {"id": str(context.id), "source_type": context.source_type, "content": context.content}
+
+
+def budgeted_context_payloads(
+    contexts: Iterable, task_data: dict[str, Any], operation: str = DEFAULT_OPERATION
+) -> list[dict[str, Any]]:
+    """Context payloads deduplicated and trimmed to the operation's token budget.
+
+    Entries stored as near-duplicates (`duplicate_of`) collapse into the first
+    entry of their group before the budget's own content deduplication runs.
+    """
+    groups: dict[Any, Any] = {}
+    for c in contexts:
+        groups.setdefault(getattr(c, "duplicate_of_id", None) or c.id, c)
+    payloads, _report = fit_contexts([context_payload(c) for c in groups.values()], task=task_data, operation=operation)
+    return payloads
+
+
+def context_payloads(task: Task, limit: int = 10, operation: str = DEFAULT_OPERATION) -> list[dict[str, Any]]:
+    """Linked contexts sent to the model. Uses the prefetch cache when `contexts` is prefetched."""
+    return budgeted_context_payloads(task.contexts.all()[:limit], task_payload(task), operation)
+
+
+def ai_input_fingerprint(task: Task) -> str:
+    """Hash of everything the model sees for this task: its fields, the linked
+    contexts (id and content hash) and the prompts. Equal fingerprints mean a
+    fresh suggestion would be asked the same question.
+
+    Both prompts are hashed: batched refreshes ask with BATCH_SYSTEM_PROMPT and
+    single tasks (or items retried one by one) with SYSTEM_PROMPT.
+    """
+    from ai.orchestrator import BATCH_SYSTEM_PROMPT, SYSTEM_PROMPT
+
+    contexts = sorted(
+        (str(c.id), hashlib.blake2b((c.content or "").encode("utf-8"), digest_size=8).hexdigest())
+        for c in task.contexts.all()
+    )
+    material = canonical_json(
+        {
+            "version": FINGERPRINT_VERSION,
+            "prompt": hashlib.blake2b((SYSTEM_PROMPT + BATCH_SYSTEM_PROMPT).encode("utf-8"), digest_size=8).hexdigest(),
+            "task": task_payload(task),
+            "contexts": contexts,
+        }
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
@@ -0,0 +1,239 @@
+"""Bulk task import: streamed parsing, chunked inserts and per-row error reporting.
+
+Rows are read lazily from CSV, NDJSON or JSON uploads and handled in chunks of
+TASK_IMPORT_CHUNK_SIZE. Each chunk resolves its category names through
+CategoryResolver (one INSERT for the missing ones), scores all of its tasks in
+one vectorized pass (priority_engine) and is inserted with bulk_create in its
+own transaction. Category usage is added up and recorded once at the end.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timezone as dt_timezone
+from typing import IO, Any, Iterable, Iterator, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from ai.json_stream import IncrementalJsonParser
+from catalog.models import Category
+from catalog.services.category_resolver import CategoryResolver
+from catalog.services.category_service import CategoryService
+from tasks.models import Task, TaskStatus
+from tasks.services.priority_engine import (
+    _chunks,
+    _epoch_us,
+    _from_epoch_us,
+    next_change_chunk,
+    score_chunk,
+)
+
+READ_CHUNK_BYTES = 64 * 1024
+TITLE_MAX_LENGTH = Task._meta.get_field("title").max_length
+CATEGORY_MAX_LENGTH = Category._meta.get_field("name").max_length
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: list[str] = field(default_factory=list)
+    errors: list[dict[str, Any]] = field(default_factory=list)
+    error_count: int = 0
+    usage: Counter = field(default_factory=Counter)  # category id -> tasks created
+
+    def add_error(self, row: int, message: str) -> None:
+        self.error_count += 1
+        if len(self.errors) < settings.TASK_IMPORT_MAX_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "created": self.created,
+            "count": len(self.created),
+            "errors": self.errors,
+            "error_count": self.error_count,
+        }
+
+
+def _field(obj: dict, *names: str) -> Any:
+    for name in names:
+        value = obj.get(name)
+        if value:
+            return value
+    return None
+
+
+def _parse_due(value: Any):
+    if not value:
+        return None
+    try:
+        dt = timezone.datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ImportRowError(f"Invalid due_date: {value!r}")
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt, timezone=dt_timezone.utc)
+    return dt
+
+
+def _clean_row(obj: Any) -> tuple[str, str, Optional[str], str, Any]:
+    """(title, description, category name, status, due date) for one input row."""
+    if not isinstance(obj, dict):
+        raise ImportRowError("Row is not an object")
+    title = str(_field(obj, "title", "Title") or "").strip()
+    if not title:
+        raise ImportRowError("Missing title")
+    if len(title) > TITLE_MAX_LENGTH:
+        raise ImportRowError(f"Title longer than {TITLE_MAX_LENGTH} characters")
+    status = str(_field(obj, "status", "Status") or TaskStatus.TODO).strip()
+    if status not in TaskStatus.values:
+        raise ImportRowError(f"Invalid status: {status!r}")
+    category = str(_field(obj, "category", "Category") or "").strip()[:CATEGORY_MAX_LENGTH] or None
+    description = str(_field(obj, "description", "Description") or "")
+    return title, description, category, status, _parse_due(_field(obj, "due_date", "DueDate"))
+
+
+def iter_csv(stream: IO[bytes]) -> Iterator[dict]:
+    return csv.DictReader(codecs.iterdecode(stream, "utf-8-sig", errors="ignore"))
+
+
+def iter_ndjson(stream: IO[bytes]) -> Iterator[Any]:
+    for line in codecs.iterdecode(stream, "utf-8", errors="ignore"):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                yield ImportRowError(f"Invalid JSON line: {e}")
+
+
+def iter_json(stream: IO[bytes]) -> Iterator[Any]:
+    """Items of a top-level array, or of `{"items": [...]}`, without loading the whole document.
+
+    Every item is yielded, scalars included (they become row errors), so row
+    numbers match array positions.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    parser: Optional[IncrementalJsonParser] = None
+    while True:
+        raw = stream.read(READ_CHUNK_BYTES)
+        text = decoder.decode(raw, final=not raw)
+        if parser is None:
+            head = text.lstrip()
+            if not head:
+                if raw:
+                    continue
+                return
+            # Items of a root array are at depth 1; of {"items": [...]} at depth 2
+            parser = IncrementalJsonParser(
+                emit_depth=1 if head.startswith("[") else 2, retain_emitted=False, emit_scalars=True
+            )
+        for path, value in parser.feed(text):
+            if path[:-1] in ((), ("items",)) and isinstance(path[-1], int):
+                yield value
+        if not raw:
+            if not parser.done:
+                yield ImportRowError("Incomplete JSON document")
+            return
+
+
+def iter_upload(stream: IO[bytes], name: str) -> Iterator[Any]:
+    name = (name or "").lower()
+    if name.endswith(".csv"):
+        return iter_csv(stream)
+    if name.endswith((".ndjson", ".jsonl")):
+        return iter_ndjson(stream)
+    return iter_json(stream)
+
+
+def _import_chunk(rows: list[tuple[int, Any]], owner_id: Optional[int], result: ImportResult) -> None:
+    cleaned = []
+    for row_number, obj in rows:
+        try:
+            if isinstance(obj, ImportRowError):
+                raise obj
+            cleaned.append((row_number, _clean_row(obj)))
+        except ImportRowError as e:
+            result.add_error(row_number, str(e))
+    if not cleaned:
+        return
+
+    now = timezone.now()
+    now_us = int(_epoch_us(now))
+    n = len(cleaned)
+    due_us = np.fromiter((_epoch_us(values[4]) for _, values in cleaned), dtype=np.float64, count=n)
+    in_progress = np.fromiter((values[3] == TaskStatus.IN_PROGRESS for _, values in cleaned), dtype=bool, count=n)
+    # New tasks: stored score 0 and no AI score, as in TaskService.create_task
+    zeros = np.zeros(n)
+    scores = score_chunk(zeros, np.full(n, np.nan), due_us, in_progress, now_us)
+    next_changes = next_change_chunk(due_us, now_us)
+
+    with transaction.atomic():
+        categories = CategoryResolver.resolve_or_create({values[2] for _, values in cleaned if values[2]})
+        tasks = [
+            Task(
+                owner_id=owner_id,
+                title=title,
+                description=description,
+                category=categories.get(category) if category else None,
+                status=status,
+                due_date=due,
+                priority_score=float(score),
+                priority_base=0.0,
+                urgency_next_at=_from_epoch_us(next_change),
+            )
+            for (_, (title, description, category, status, due)), score, next_change in zip(
+                cleaned, scores, next_changes
+            )
+        ]
+        Task.objects.bulk_create(tasks, batch_size=500)
+    result.usage.update(t.category_id for t in tasks if t.category_id)
+    result.created.extend(str(t.id) for t in tasks)
+
+
+class TaskImportService:
+    @staticmethod
+    def run(items: Iterable[Any], owner_id: Optional[int] = None, chunk_size: Optional[int] = None) -> ImportResult:
+        """Import rows (dicts) chunk by chunk; bad rows are reported, not fatal.
+
+        Row numbers are 1-based positions in `items`. Chunks that were already
+        committed stay committed if a later chunk fails at the database level.
+        """
+        result = ImportResult()
+        size = chunk_size or settings.TASK_IMPORT_CHUNK_SIZE
+        try:
+            for chunk in _chunks(enumerate(items, start=1), size):
+                _import_chunk(chunk, owner_id, result)
+        finally:
+            CategoryService.record_usage(result.usage)
+        return result
+
+    @staticmethod
+    def save_upload(uploaded) -> str:
+        """Store an upload for a background import; returns its storage path."""
+        return default_storage.save(f"imports/{timezone.now():%Y%m%d}/{uploaded.name}", uploaded)
+
+
+def import_job(task: Optional[Task], params: dict) -> dict:
+    """Background job handler: import a stored upload (`params["path"]`), then delete it."""
+    path = params["path"]
+    try:
+        with default_storage.open(path, "rb") as stream:
+            result = TaskImportService.run(iter_upload(stream, path), owner_id=params.get("owner_id"))
+    finally:
+        discard_upload(params)
+    return result.as_dict()
+
+
+def discard_upload(params: dict) -> None:
+    """Delete a job's stored upload; also used when the job is failed as stale."""
+    if params.get("path"):
+        default_storage.delete(params["path"])
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import BooleanField, Case, Q, QuerySet, Value, When
+from django.db.models.fields.json import KT
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.services.task_service import (
+    AI_WEIGHT,
+    DUE_WEIGHT,
+    IN_PROGRESS_BOOST,
+    STATUS_WEIGHT,
+    STORED_WEIGHT,
+    URGENCY_BUCKET_HOURS,
+    URGENCY_HORIZON_HOURS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_CHUNK_SIZE = 5000
+# Differences below this are float noise, not a changed score
+SCORE_TOLERANCE = 1e-12
+_HOUR_US = 3600 * 1_000_000
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+ProgressCallback = Callable[[int, int, int], None]
+
+
+@dataclass
+class RecomputeResult:
+    processed: int = 0
+    updated: int = 0
+    seconds: float = 0.0
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def score_chunk(
+    stored: np.ndarray,
+    ai_scores: np.ndarray,
+    due_us: np.ndarray,
+    in_progress: np.ndarray,
+    now_us: int,
+) -> np.ndarray:
+    """Vectorized `TaskService.recompute_priority` for one chunk.
+
+    `stored` is the stored term (`priority_base`, else `priority_score`);
+    `ai_scores` and `due_us` (due date in epoch microseconds) use NaN for missing
+    values; a missing AI score falls back to the stored term, as in the
+    per-task version.
+    """
+    ai = np.where(np.isnan(ai_scores), stored, ai_scores)
+    hours = np.maximum((due_us - now_us) / 1e6 / 3600.0, 0.0)
+    due = np.where(np.isnan(due_us), 0.0, np.maximum(0.0, 1.0 - np.minimum(hours / URGENCY_HORIZON_HOURS, 1.0)))
+    boost = np.where(in_progress, IN_PROGRESS_BOOST, 0.0)
+    score = AI_WEIGHT * ai + DUE_WEIGHT * due + STORED_WEIGHT * stored + STATUS_WEIGHT * boost
+    return np.clip(score, 0.0, 1.0)
+
+
+def next_change_chunk(due_us: np.ndarray, now_us: int) -> np.ndarray:
+    """Vectorized `TaskService.next_urgency_change` in epoch microseconds (NaN = never)."""
+    remaining = due_us - now_us
+    horizon = URGENCY_HORIZON_HOURS * _HOUR_US
+    bucket = URGENCY_BUCKET_HOURS * _HOUR_US
+    with np.errstate(invalid="ignore"):
+        on_ramp = due_us - (np.ceil(remaining / bucket) - 1) * bucket
+        nxt = np.where(remaining > horizon, due_us - horizon, on_ramp)
+        return np.where(np.isnan(due_us) | (remaining <= 0), np.nan, nxt)
+
+
+def _rows(queryset: QuerySet, chunk_size: int) -> Iterator[tuple]:
+    # Only the columns the formula needs; the AI score is pulled out of the JSON
+    # in SQL so ai_metadata and description never leave the database.
+    return (
+        queryset.order_by("pk")
+        .annotate(
+            _has_apply=Case(
+                When(Q(ai_metadata__has_key="last_ai_apply"), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            ),
+            _apply_score=KT("ai_metadata__last_ai_apply__priority_score"),
+            _last_score=KT("ai_metadata__last_ai__priority_score"),
+        )
+        .values_list(
+            "pk",
+            "priority_score",
+            "due_date",
+            "status",
+            "_has_apply",
+            "_apply_score",
+            "_last_score",
+            "urgency_next_at",
+            "priority_base",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _epoch_us(value: Optional[datetime]) -> float:
+    if value is None:
+        return np.nan
+    delta = value - _EPOCH
+    return float((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def _from_epoch_us(value: float) -> Optional[datetime]:
+    if np.isnan(value):
+        return None
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[list[tuple]]:
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _score_rows(
+    chunk: Sequence[tuple], now_us: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return (stored scores, new scores, stored next-change times, new next-change times,
+    stored bases, bases to keep)."""
+    n = len(chunk)
+    stored = np.fromiter((row[1] or 0.0 for row in chunk), dtype=np.float64, count=n)
+    # The stored term comes from priority_base, never from the score a previous
+    # refresh wrote; rows without one keep their current score as the base
+    stored_base = np.fromiter((_to_float(row[8]) for row in chunk), dtype=np.float64, count=n)
+    base = np.where(np.isnan(stored_base), stored, stored_base)
+    # last_ai_apply wins when present; otherwise last_ai; otherwise the stored score
+    ai_scores = np.fromiter((_to_float(row[5] if row[4] else row[6]) for row in chunk), dtype=np.float64, count=n)
+    due_us = np.fromiter((_epoch_us(row[2]) for row in chunk), dtype=np.float64, count=n)
+    in_progress = np.fromiter((row[3] == "in_progress" for row in chunk), dtype=bool, count=n)
+    next_us = np.fromiter((_epoch_us(row[7]) for row in chunk), dtype=np.float64, count=n)
+    scores = score_chunk(base, ai_scores, due_us, in_progress, now_us)
+    return stored, scores, next_us, next_change_chunk(due_us, now_us), stored_base, base
+
+
+def _supports_update_from(db) -> bool:
+    if db.vendor == "postgresql":
+        return True
+    if db.vendor == "sqlite":
+        import sqlite3
+
+        return sqlite3.sqlite_version_info >= (3, 33, 0)
+    return False
+
+
+def _write_scores(rows: list[tuple[Any, float, Optional[datetime], float]], batch_size: int) -> None:
+    """Write (pk, priority_score, urgency_next_at, priority_base) rows."""
+    if not rows:
+        return
+    db = connections[Task.objects.db]  # the real wrapper, not the thread-local proxy
+    with transaction.atomic(using=db.alias):
+        if not _supports_update_from(db):
+            objs = [
+                Task(pk=pk, priority_score=score, urgency_next_at=next_at, priority_base=base)
+                for pk, score, next_at, base in rows
+            ]
+            Task.objects.bulk_update(
+                objs, ["priority_score", "urgency_next_at", "priority_base"], batch_size=batch_size
+            )
+            return
+        # One UPDATE ... FROM (VALUES ...) per batch: a join against the new values
+        # instead of the per-row CASE that bulk_update builds
+        table = db.ops.quote_name(Task._meta.db_table)
+        prep_pk = Task._meta.pk.get_db_prep_value
+        prep_dt = Task._meta.get_field("urgency_next_at").get_db_prep_value
+        if db.vendor == "postgresql":
+            row = "(%s::uuid, %s::double precision, %s::timestamptz, %s::double precision)"
+        else:
+            row = "(%s, %s, %s, %s)"
+        with db.cursor() as cursor:
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start:start + batch_size]
+                params: list[Any] = []
+                for pk, score, next_at, base in batch:
+                    params.extend((prep_pk(pk, db), score, prep_dt(next_at, db), base))
+                cursor.execute(
+                    f"WITH v(id, score, next_at, base) AS (VALUES {', '.join([row] * len(batch))}) "
+                    f"UPDATE {table} SET priority_score = v.score, urgency_next_at = v.next_at, "
+                    f"priority_base = v.base "
+                    f"FROM v WHERE {table}.id = v.id",
+                    params,
+                )
+
+
+def recompute_all(
+    queryset: Optional[QuerySet] = None,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    write_batch_size: int = 1000,
+    now: Optional[datetime] = None,
+    progress: Optional[ProgressCallback] = None,
+) -> RecomputeResult:
+    """Recompute stored priority scores for every task in `queryset` in bulk.
+
+    Streams the needed columns in chunks, scores each chunk with NumPy and writes
+    back only the rows whose score or next urgency change time moved.
+    `progress(processed, updated, total)` is called after every chunk.
+    """
+    started = time.monotonic()
+    qs = Task.objects.all() if queryset is None else queryset
+    total = qs.count() if progress else 0
+    now_us = int(_epoch_us(now or timezone.now()))
+    result = RecomputeResult()
+    for chunk in _chunks(_rows(qs, chunk_size), chunk_size):
+        stored, scores, stored_next, next_us, stored_base, base = _score_rows(chunk, now_us)
+        score_changed = np.abs(scores - stored) > SCORE_TOLERANCE
+        next_changed = ~((stored_next == next_us) | (np.isnan(stored_next) & np.isnan(next_us)))
+        dirty = np.flatnonzero(score_changed | next_changed | np.isnan(stored_base))
+        _write_scores(
+            [(chunk[i][0], float(scores[i]), _from_epoch_us(next_us[i]), float(base[i])) for i in dirty],
+            write_batch_size,
+        )
+        result.processed += len(chunk)
+        result.updated += int(score_changed.sum())
+        if progress:
+            progress(result.processed, result.updated, total)
+    result.seconds = round(time.monotonic() - started, 3)
+    logger.info(
+        "tasks.priorities.recomputed",
+        extra={"processed": result.processed, "updated": result.updated, "seconds": result.seconds},
+    )
+    return result
+
+
+def recompute_due(
+    *,
+    now: Optional[datetime] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> RecomputeResult:
+    """Recompute only tasks whose urgency bucket has changed since they were last scored."""
+    now = now or timezone.now()
+    queryset = Task.objects.filter(urgency_next_at__lte=now)
+    return recompute_all(queryset, chunk_size=chunk_size, now=now, progress=progress)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from django.db import NotSupportedError
+from django.db.models import Case, DateTimeField, F, FloatField, Func, Q, QuerySet, Value, When
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, Coalesce, Greatest, Least
+from django.utils import timezone
+
+from tasks.services.task_service import (
+    AI_WEIGHT,
+    DUE_WEIGHT,
+    IN_PROGRESS_BOOST,
+    STATUS_WEIGHT,
+    STORED_WEIGHT,
+    URGENCY_HORIZON_HOURS,
+)
+
+
+EFFECTIVE_PRIORITY = "effective_priority"
+
+
+class HoursUntil(Func):
+    """Hours from `now` until a datetime column (negative once it has passed)."""
+
+    output_field = FloatField()
+    arity = 2
+
+    def __init__(self, expression, now: datetime, **extra):
+        super().__init__(expression, Value(now, output_field=DateTimeField()), **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="((julianday(%(expressions)s)) * 24.0)",
+            arg_joiner=") - julianday(",
+            **extra_context,
+        )
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler,
+            connection,
+            template="(EXTRACT(EPOCH FROM (%(expressions)s)) / 3600.0)",
+            arg_joiner=" - ",
+            **extra_context,
+        )
+
+    def as_sql(self, compiler, connection, function=None, template=None, arg_joiner=None, **extra_context):
+        if template is None:
+            raise NotSupportedError(f"HoursUntil is not implemented for {connection.vendor}")
+        return super().as_sql(compiler, connection, function, template, arg_joiner, **extra_context)
+
+
+def _stored_component():
+    return Coalesce(F("priority_base"), F("priority_score"), output_field=FloatField())
+
+
+def _ai_component():
+    # Same precedence as TaskService.recompute_priority: last_ai_apply, then last_ai,
+    # then the stored score
+    stored = _stored_component()
+    return Case(
+        When(
+            Q(ai_metadata__has_key="last_ai_apply"),
+            then=Coalesce(Cast(KT("ai_metadata__last_ai_apply__priority_score"), FloatField()), stored),
+        ),
+        default=Coalesce(Cast(KT("ai_metadata__last_ai__priority_score"), FloatField()), stored),
+        output_field=FloatField(),
+    )
+
+
+def _due_component(now: datetime):
+    hours = Greatest(HoursUntil("due_date", now), Value(0.0))
+    ramp = Greatest(Value(0.0), Value(1.0) - Least(hours / Value(URGENCY_HORIZON_HOURS), Value(1.0)))
+    return Case(When(due_date__isnull=True, then=Value(0.0)), default=ramp, output_field=FloatField())
+
+
+def effective_priority(now: Optional[datetime] = None):
+    """`TaskService.recompute_priority` as a database expression, evaluated at `now`.
+
+    Unlike the stored `priority_score`, whose due-urgency term is only as fresh
+    as the last refresh, this is live at query time.
+    """
+    now = now or timezone.now()
+    status_boost = Case(
+        When(status="in_progress", then=Value(IN_PROGRESS_BOOST)), default=Value(0.0), output_field=FloatField()
+    )
+    score = (
+        Value(AI_WEIGHT) * _ai_component()
+        + Value(DUE_WEIGHT) * _due_component(now)
+        + Value(STORED_WEIGHT) * _stored_component()
+        + Value(STATUS_WEIGHT) * status_boost
+    )
+    return Greatest(Value(0.0), Least(Value(1.0), score), output_field=FloatField())
+
+
+def with_effective_priority(queryset: QuerySet, now: Optional[datetime] = None) -> QuerySet:
+    return queryset.annotate(**{EFFECTIVE_PRIORITY: effective_priority(now)})
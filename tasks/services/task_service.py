@@ -11,6 +11,18 @@ from tasks.models import Task
 from catalog.services.category_service import CategoryService
 
 
+# Hybrid priority weights, shared with the bulk engine in priority_engine.py
+AI_WEIGHT = 0.4
+DUE_WEIGHT = 0.3
+STORED_WEIGHT = 0.2
+STATUS_WEIGHT = 0.1
+IN_PROGRESS_BOOST = 0.1
+# Due urgency ramps from 0 to 1 over the last week before the deadline
+URGENCY_HORIZON_HOURS = 168.0
+# Stored scores are refreshed once per bucket while a task is on the ramp
+URGENCY_BUCKET_HOURS = 1.0
+
+
 @dataclass
 class TaskCreateDTO:
     title: str
@@ -46,7 +58,9 @@ class TaskService:
             due_date=dto.due_date,
             owner_id=dto.owner_id,
         )
+        task.priority_base = task.priority_score
         task.priority_score = TaskService._initial_priority(task)
+        task.urgency_next_at = TaskService.next_urgency_change(task.due_date)
         task.save()
 
         if dto.contexts_ids:
@@ -72,7 +86,10 @@ class TaskService:
             # allow clearing due_date
             task.due_date = dto.due_date
 
+        # An edit folds the current score in once; later urgency refreshes start from it
+        task.priority_base = task.priority_score
         task.priority_score = TaskService.recompute_priority(task)
+        task.urgency_next_at = TaskService.next_urgency_change(task.due_date)
         task.save()
 
         if dto.contexts_ids is not None:
@@ -88,17 +105,25 @@ class TaskService:
         return task
 
     @staticmethod
-    def recompute_priority(task: Task) -> float:
-        """Hybrid scoring combining due-urgency + stored AI score + status boost."""
+    def recompute_priority(task: Task, now=None) -> float:
+        """Hybrid scoring combining due-urgency + stored AI score + status boost.
+
+        The stored term is `priority_base` (falling back to `priority_score`), not
+        the last refreshed score, so re-evaluating as the deadline nears gives the
+        same result as evaluating once.
+        """
         from django.utils import timezone
 
+        now = now or timezone.now()
+        stored = task.priority_base if task.priority_base is not None else (task.priority_score or 0.0)
+
         base = 0.2
         # due urgency within a week
         due_component = 0.0
         try:
             if task.due_date:
-                delta_hours = max((task.due_date - timezone.now()).total_seconds() / 3600.0, 0.0)
-                due_component = max(0.0, 1.0 - min(delta_hours / 168.0, 1.0))
+                delta_hours = max((task.due_date - now).total_seconds() / 3600.0, 0.0)
+                due_component = max(0.0, 1.0 - min(delta_hours / URGENCY_HORIZON_HOURS, 1.0))
         except Exception:
             pass
 
@@ -107,16 +132,46 @@ class TaskService:
         try:
             meta = task.ai_metadata or {}
             ai_last = meta.get("last_ai_apply") or meta.get("last_ai") or {}
-            ai_component = float(ai_last.get("priority_score", task.priority_score or 0.0))
+            ai_component = float(ai_last.get("priority_score", stored))
         except Exception:
-            ai_component = float(task.priority_score or 0.0)
+            ai_component = float(stored)
 
         # status boost: in_progress gets a nudge
-        status_boost = 0.1 if getattr(task, "status", "") == "in_progress" else 0.0
+        status_boost = IN_PROGRESS_BOOST if getattr(task, "status", "") == "in_progress" else 0.0
 
-        final_score = 0.4 * ai_component + 0.3 * due_component + 0.2 * (task.priority_score or 0.0) + 0.1 * status_boost
+        final_score = (
+            AI_WEIGHT * ai_component
+            + DUE_WEIGHT * due_component
+            + STORED_WEIGHT * stored
+            + STATUS_WEIGHT * status_boost
+        )
         return float(max(0.0, min(1.0, final_score)))
 
+    @staticmethod
+    def next_urgency_change(due_date, now=None):
+        """Next time the due component of the score moves to a new bucket, or None.
+
+        Before the week-long ramp starts that is the start of the ramp; on the ramp
+        it is the next bucket boundary counted back from the deadline; once the task
+        is overdue (or has no due date) the component is constant.
+        """
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        if not due_date:
+            return None
+        now = now or timezone.now()
+        remaining = due_date - now
+        if remaining <= timedelta(0):
+            return None
+        horizon = timedelta(hours=URGENCY_HORIZON_HOURS)
+        if remaining > horizon:
+            return due_date - horizon
+        bucket = timedelta(hours=URGENCY_BUCKET_HOURS)
+        buckets_left = -(-remaining // bucket) - 1  # ceil(remaining / bucket) - 1
+        return due_date - buckets_left * bucket
+
     @staticmethod
     def _initial_priority(task: Task) -> float:
         return TaskService.recompute_priority(task)
@@ -1,58 +1,128 @@
 from __future__ import annotations
 
-from celery import shared_task
+import logging
+
+from celery import chord, group, shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
 from .models import Task
-from .services.task_service import TaskService
+from .services.ai_payloads import ai_input_fingerprint, context_payloads, task_payload
+from .services import priority_engine
 from ai.orchestrator import AiOrchestrator
 from ai.provider_factory import get_provider
 
+logger = logging.getLogger(__name__)
 
-@shared_task
-def recompute_priorities() -> int:
-    count = 0
-    for task in Task.objects.all():
-        old = task.priority_score
-        task.priority_score = TaskService.recompute_priority(task)
-        if task.priority_score != old:
-            task.save(update_fields=["priority_score"])
-            count += 1
-    return count
+
+@shared_task(bind=True)
+def recompute_priorities(self, chunk_size: int = priority_engine.DEFAULT_CHUNK_SIZE) -> int:
+    """Bulk-recompute stored priority scores; reports PROGRESS meta while running."""
+
+    def progress(processed: int, updated: int, total: int) -> None:
+        if self.request.id and not self.request.is_eager:
+            self.update_state(state="PROGRESS", meta={"processed": processed, "updated": updated, "total": total})
+
+    return priority_engine.recompute_all(chunk_size=int(chunk_size), progress=progress).updated
 
 
 @shared_task
-def ai_recompute_priorities(limit: int | None = None) -> int:
+def recompute_due_priorities() -> int:
+    """Frequent, cheap refresh of tasks whose due-urgency bucket has rolled over (indexed on urgency_next_at)."""
+    return priority_engine.recompute_due().updated
+
+
+@shared_task(bind=True)
+def ai_recompute_priorities(self, limit: int | None = None, force: bool = False) -> int:
     """Use the AI orchestrator to refresh priority scores for tasks.
 
     Optionally limit the number of tasks processed (e.g., newest first by updated_at).
+    Tasks whose AI input is unchanged since the last run are skipped unless `force`;
+    the rest are scored in parallel chunks and the result is the number updated.
     """
     qs = Task.objects.select_related("category").prefetch_related("contexts").order_by("-updated_at")
     if limit:
         qs = qs[: int(limit)]
-    orchestrator = AiOrchestrator(get_provider())
-    updated = 0
+    stale: list[str] = []
+    skipped = 0
     for task in qs:
-        payload_task = {
-            "title": task.title,
-            "description": task.description,
-            "category_name": task.category.name if task.category else None,
-            "status": task.status,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-        }
-        payload_contexts = [
-            {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-            for c in task.contexts.all()[:10]
-        ]
-        bundle = orchestrator.suggest_for_task(task=payload_task, contexts=payload_contexts)
+        last = (task.ai_metadata or {}).get("last_ai") or {}
+        if not force and last.get("fingerprint") == ai_input_fingerprint(task):
+            skipped += 1
+            continue
+        stale.append(str(task.id))
+    logger.info("tasks.ai_recompute.planned", extra={"stale": len(stale), "skipped": skipped})
+    if not stale:
+        return 0
+    size = max(1, int(settings.AI_RECOMPUTE_CHUNK_SIZE))
+    chunks = [stale[i:i + size] for i in range(0, len(stale), size)]
+    if self.request.is_eager:
+        # An eager task cannot join a chord (Celery refuses result.get() inside a task)
+        return ai_recompute_priorities_done([ai_recompute_priority_chunk(ids) for ids in chunks])
+    header = group(ai_recompute_priority_chunk.s(ids) for ids in chunks)
+    # The chord's summed count becomes this task's result
+    return self.replace(chord(header, ai_recompute_priorities_done.s()))
+
+
+@shared_task
+def ai_recompute_priority_chunk(task_ids: list[str]) -> int:
+    tasks = list(Task.objects.filter(id__in=task_ids).select_related("category").prefetch_related("contexts"))
+    orchestrator = AiOrchestrator(get_provider())
+    bundles = orchestrator.suggest_for_tasks([(str(t.id), task_payload(t), context_payloads(t)) for t in tasks])
+    failed = [key for key, bundle in bundles.items() if isinstance(bundle, Exception)]
+    if failed:
+        # Provider failure: leave these fingerprints untouched so the next run retries them
+        error = bundles[failed[0]]
+        logger.warning(
+            "tasks.ai_recompute.chunk_failed", extra={"size": len(failed), "error": str(error)[:200]}
+        )
+    computed_at = timezone.now().isoformat()
+    scored: dict = {}  # task id -> (score or None to keep, last_ai entry or None)
+    for task in tasks:
+        bundle = bundles[str(task.id)]
+        if isinstance(bundle, Exception):
+            continue
         try:
-            pr = float(bundle.priority_score)
-            pr = max(0.0, min(1.0, pr))
+            pr = max(0.0, min(1.0, float(bundle.priority_score)))
         except Exception:
-            pr = task.priority_score
-        if pr != task.priority_score:
-            task.priority_score = pr
-            task.save(update_fields=["priority_score"])
-            updated += 1
+            pr = None
+        last_ai = None
+        if not bundle.fallback:
+            last_ai = {"priority_score": pr, "fingerprint": ai_input_fingerprint(task), "computed_at": computed_at}
+        scored[task.id] = (pr, last_ai)
+
+    # Re-read under lock: the model call is slow and ai_metadata may have changed meanwhile
+    # (ai-apply, PATCH), so only last_ai is replaced and unchanged rows are not written
+    updated = 0
+    with transaction.atomic():
+        changed = []
+        rows = Task.objects.select_for_update().filter(id__in=list(scored))
+        for row in rows.only("id", "priority_score", "priority_base", "ai_metadata"):
+            pr, last_ai = scored[row.id]
+            dirty = False
+            previous = (row.ai_metadata or {}).get("last_ai") or {}
+            if last_ai is not None and (
+                previous.get("fingerprint") != last_ai["fingerprint"] or previous.get("priority_score") != pr
+            ):
+                row.ai_metadata = {**(row.ai_metadata or {}), "last_ai": last_ai}
+                dirty = True
+            if pr is not None and pr != row.priority_score:
+                row.priority_score = pr
+                updated += 1
+                dirty = True
+            if pr is not None and pr != row.priority_base:
+                # Urgency refreshes start from the new AI score
+                row.priority_base = pr
+                dirty = True
+            if dirty:
+                changed.append(row)
+        Task.objects.bulk_update(changed, ["priority_score", "priority_base", "ai_metadata"])
     return updated
 
 
+@shared_task
+def ai_recompute_priorities_done(counts: list[int]) -> int:
+    total = sum(int(c or 0) for c in counts)
+    logger.info("tasks.ai_recompute.completed", extra={"updated": total})
+    return total
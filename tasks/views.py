@@ -1,28 +1,43 @@
+from asgiref.sync import async_to_sync
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
 from django.db import models
 from rest_framework import mixins, viewsets
 from rest_framework.decorators import action
-from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 
 from .models import Task
 from .serializers import TaskSerializer
+from .services import ai_actions
+from .services.ai_payloads import context_payloads, task_payload
+from .services.import_service import TaskImportService, iter_upload
+from .services.priority_query import EFFECTIVE_PRIORITY, with_effective_priority
 from .services.task_service import TaskCreateDTO, TaskService, TaskUpdateDTO
 from ai.orchestrator import AiOrchestrator
 from ai.provider_factory import get_provider
 from catalog.models import Category
-from catalog.services.category_service import CategoryService
-from django.utils import timezone
+from jobs.models import AiJobKind
+from jobs.views import async_requested, enqueue_response
+from common.search import RELEVANCE, FullTextIndex, FullTextSearchFilter, RelevanceOrderingFilter
+from common.streaming import (
+    CsvRenderer,
+    EventStreamRenderer,
+    NdjsonRenderer,
+    event_stream_response,
+    export_response,
+    stream_mode,
+)
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
-from django.http import HttpResponse
-import csv
-import io
-import json
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from django.utils import timezone as tz
 
 
+STREAMING_RENDERERS = [JSONRenderer, BrowsableAPIRenderer, EventStreamRenderer, NdjsonRenderer]
+EXPORT_FIELDS = ["id", "title", "description", "category", "status", "priority_score", "due_date"]
+
+
 class TaskViewSet(
     mixins.CreateModelMixin,
     mixins.UpdateModelMixin,
@@ -33,10 +48,13 @@ class TaskViewSet(
 ):
     queryset = Task.objects.select_related("category", "owner").prefetch_related("contexts")
     serializer_class = TaskSerializer
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, RelevanceOrderingFilter]
     filterset_fields = ["category", "status"]
+    # Full-text index created by tasks/migrations/0004_task_search; search_fields is the fallback
+    search_index = FullTextIndex(Task._meta.db_table, (("title", "A"), ("description", "B")))
     search_fields = ["title", "description"]
-    ordering_fields = ["priority_score", "due_date", "created_at"]
+    # effective_priority is the live score (see priority_query); it is annotated on demand
+    ordering_fields = ["priority_score", EFFECTIVE_PRIORITY, RELEVANCE, "due_date", "created_at"]
     ordering = ["-priority_score", "due_date", "-created_at"]
     parser_classes = [JSONParser, MultiPartParser, FormParser]
 
@@ -45,17 +63,8 @@ class TaskViewSet(
         task = self.get_object()
 
         orchestrator = AiOrchestrator(get_provider())
-        payload_task = {
-            "title": task.title,
-            "description": task.description,
-            "category_name": task.category.name if task.category else None,
-            "status": task.status,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-        }
-        payload_contexts = [
-            {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-            for c in task.contexts.all()[:10]
-        ]
+        payload_task = task_payload(task)
+        payload_contexts = context_payloads(task)
         bundle = orchestrator.suggest_for_task(task=payload_task, contexts=payload_contexts)
 
         return Response(
@@ -68,28 +77,29 @@ class TaskViewSet(
             }
         )
 
-    @action(detail=False, methods=["post"], url_path="ai-bulk-suggestions")
+    @action(detail=False, methods=["post"], url_path="ai-bulk-suggestions", renderer_classes=STREAMING_RENDERERS)
     def ai_bulk_suggestions(self, request):
+        """Suggestions for many tasks. `?stream=sse|ndjson` emits each one as soon as the model finishes it."""
         ids = request.data if isinstance(request.data, list) else request.data.get("task_ids", [])
         if not isinstance(ids, list) or not ids:
             return Response({"detail": "Provide task_ids as a non-empty array"}, status=400)
         tasks = list(Task.objects.filter(id__in=ids).select_related("category").prefetch_related("contexts"))
         orchestrator = AiOrchestrator(get_provider())
+        items = [(str(t.id), task_payload(t), context_payloads(t)) for t in tasks]
+
+        mode = stream_mode(request)
+        if mode:
+            pairs = orchestrator.stream_suggestions_for_tasks(items, concurrency=settings.AI_BULK_CONCURRENCY)
+            return event_stream_response(self._suggestion_events(pairs), mode)
+
+        # Several tasks per prompt, batches fanned out concurrently
+        bundles = async_to_sync(orchestrator.asuggest_for_tasks)(items, concurrency=settings.AI_BULK_CONCURRENCY)
         results = {}
-        for t in tasks:
-            payload_task = {
-                "title": t.title,
-                "description": t.description,
-                "category_name": t.category.name if t.category else None,
-                "status": t.status,
-                "due_date": t.due_date.isoformat() if t.due_date else None,
-            }
-            payload_contexts = [
-                {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-                for c in t.contexts.all()[:10]
-            ]
-            bundle = orchestrator.suggest_for_task(task=payload_task, contexts=payload_contexts)
-            results[str(t.id)] = {
+        for task_id, bundle in bundles.items():
+            if isinstance(bundle, Exception):
+                results[task_id] = {"error": f"{bundle.__class__.__name__}: {bundle}"}
+                continue
+            results[task_id] = {
                 "priority_score": bundle.priority_score,
                 "suggested_deadline": bundle.suggested_deadline,
                 "enhanced_description": bundle.enhanced_description,
@@ -98,231 +108,112 @@ class TaskViewSet(
             }
         return Response(results)
 
+    @staticmethod
+    def _suggestion_events(pairs):
+        count = 0
+        try:
+            for task_id, bundle in pairs:
+                count += 1
+                if isinstance(bundle, Exception):
+                    yield "error", {"task_id": task_id, "error": f"{bundle.__class__.__name__}: {bundle}"}
+                    continue
+                yield "suggestion", {
+                    "task_id": task_id,
+                    "priority_score": bundle.priority_score,
+                    "suggested_deadline": bundle.suggested_deadline,
+                    "enhanced_description": bundle.enhanced_description,
+                    "categories": bundle.categories,
+                    "reasoning": bundle.reasoning,
+                }
+            yield "done", {"count": count}
+        finally:
+            # Stop in-flight model calls when the client disconnects
+            pairs.close()
+
     @action(detail=True, methods=["post"], url_path="ai-apply")
     def ai_apply(self, request, pk=None):
-        """Run AI suggestions and persist best-effort updates on the server.
-
-        Applies:
-        - enhanced_description
-        - suggested_deadline
-        - category (match existing by case-insensitive name, otherwise auto-create from first suggestion)
-        - priority_score
-        Stores the raw suggestion in ai_metadata under key 'last_ai_apply'.
+        """Run AI suggestions and persist best-effort updates on the server (see `ai_actions.apply_suggestions`).
+
+        With `?async=1` the work runs in a background job and the response is 202 with the job.
         """
         task = self.get_object()
-
-        orchestrator = AiOrchestrator(get_provider())
-        payload_task = {
-            "title": task.title,
-            "description": task.description,
-            "category_name": task.category.name if task.category else None,
-            "status": task.status,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-        }
-        payload_contexts = [
-            {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-            for c in task.contexts.all()[:10]
-        ]
-        bundle = orchestrator.suggest_for_task(task=payload_task, contexts=payload_contexts)
-
-        # Apply description
-        if bundle.enhanced_description:
-            task.description = bundle.enhanced_description
-
-        # Apply deadline
-        if bundle.suggested_deadline:
-            try:
-                s = bundle.suggested_deadline.replace("Z", "+00:00")
-                dt = timezone.datetime.fromisoformat(s)
-                if timezone.is_naive(dt):
-                    dt = timezone.make_aware(dt, timezone=timezone.utc)
-                task.due_date = dt
-            except Exception:
-                # ignore parse errors; keep existing due_date
-                pass
-
-        # Apply category via best effort matching
-        chosen_category = None
-        suggestions = bundle.categories or []
-        # Exact (case-insensitive) match first
-        for name in suggestions:
-            existing = Category.objects.filter(name__iexact=str(name).strip()).first()
-            if existing:
-                chosen_category = existing
-                break
-        # If still none and we have at least one suggestion, create the first
-        if not chosen_category and suggestions:
-            first_name = str(suggestions[0]).strip()
-            if first_name:
-                chosen_category, _ = Category.objects.get_or_create(name=first_name)
-        if chosen_category:
-            task.category = chosen_category
-
-        # Apply priority score
-        try:
-            pr = float(bundle.priority_score)
-            task.priority_score = max(0.0, min(1.0, pr))
-        except Exception:
-            pass
-
-        # Record metadata
-        meta = dict(task.ai_metadata or {})
-        meta["last_ai_apply"] = {
-            "priority_score": bundle.priority_score,
-            "suggested_deadline": bundle.suggested_deadline,
-            "categories": suggestions,
-            "reasoning": bundle.reasoning,
-        }
-        task.ai_metadata = meta
-
-        task.save()
-
-        # Touch category usage if applicable
-        if chosen_category:
-            try:
-                CategoryService.touch_usage(chosen_category)
-            except Exception:
-                pass
-
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        if async_requested(request):
+            return enqueue_response(request, AiJobKind.AI_APPLY, task=task)
+        return Response(ai_actions.apply_suggestions(task))
 
     @action(detail=True, methods=["post"], url_path="schedule-suggestions")
     def schedule_suggestions(self, request, pk=None):
         task = self.get_object()
-        orchestrator = AiOrchestrator(get_provider())
-        payload_task = {
-            "title": task.title,
-            "description": task.description,
-            "category_name": task.category.name if task.category else None,
-            "status": task.status,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-        }
-        payload_contexts = [
-            {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-            for c in task.contexts.all()[:10]
-        ]
-        suggestion = orchestrator.suggest_schedule(task=payload_task, contexts=payload_contexts)
-        return Response(
-            {
-                "blocks": [
-                    {"start": b.start, "end": b.end, "label": b.label}
-                    for b in suggestion.blocks
-                ],
-                "recommended_deadline": suggestion.recommended_deadline,
-                "reasoning": suggestion.reasoning,
-            }
-        )
+        if async_requested(request):
+            return enqueue_response(request, AiJobKind.SCHEDULE_SUGGESTIONS, task=task)
+        return Response(ai_actions.suggest_schedule(task))
 
-    @action(detail=False, methods=["post"], url_path="nl-create")
+    @action(detail=False, methods=["post"], url_path="nl-create", renderer_classes=STREAMING_RENDERERS)
     def nl_create(self, request):
-        """Create multiple tasks from free-text input via AI."""
+        """Create multiple tasks from free-text input via AI.
+
+        With `?stream=sse|ndjson` each task is created and emitted as soon as the model finishes it;
+        with `?async=1` they are created by a background job.
+        """
         text = (request.data.get("text") or "").strip()
         if not text:
             return Response({"detail": "Provide 'text'"}, status=400)
-        orchestrator = AiOrchestrator(get_provider())
-        tasks = orchestrator.generate_tasks_from_text(text=text)
+        if async_requested(request):
+            return enqueue_response(request, AiJobKind.NL_CREATE, params={"text": text})
+
+        mode = stream_mode(request)
+        if mode:
+            orchestrator = AiOrchestrator(get_provider())
+            return event_stream_response(self._nl_create_events(orchestrator.stream_tasks_from_text(text=text)), mode)
+        return Response(ai_actions.create_from_text(None, {"text": text}))
+
+    def _nl_create_events(self, generated):
         created = []
-        for t in tasks:
-            cat = None
-            # try exact match for first category
-            cats = t.get("categories") or []
-            for name in cats:
-                existing = Category.objects.filter(name__iexact=str(name).strip()).first()
-                if existing:
-                    cat = existing
-                    break
-            if not cat and cats:
-                cat, _ = Category.objects.get_or_create(name=str(cats[0]).strip()[:100])
-            # parse due_date if provided
-            due_val = None
-            due_iso = t.get("due_date")
-            if due_iso:
-                try:
-                    s = str(due_iso).replace("Z", "+00:00")
-                    dt = timezone.datetime.fromisoformat(s)
-                    if timezone.is_naive(dt):
-                        dt = timezone.make_aware(dt, timezone=timezone.utc)
-                    due_val = dt
-                except Exception:
-                    due_val = None
-            dto = TaskCreateDTO(title=t.get("title") or "Untitled", description=t.get("description") or "", category=cat, due_date=due_val)
-            task = TaskService.create_task(dto)
-            if cat:
-                try:
-                    CategoryService.touch_usage(cat)
-                except Exception:
-                    pass
-            created.append(str(task.id))
-        return Response({"created": created, "count": len(created)})
+        try:
+            for t in generated:
+                task = ai_actions.create_task_from_ai(t)
+                created.append(str(task.id))
+                yield "task", {
+                    "id": str(task.id),
+                    "title": task.title,
+                    "category": task.category.name if task.category else None,
+                    "due_date": task.due_date.isoformat() if task.due_date else None,
+                }
+        except Exception as e:
+            yield "error", {"detail": f"{e.__class__.__name__}: {e}"}
+        finally:
+            generated.close()
+        yield "done", {"created": created, "count": len(created)}
 
     @action(detail=True, methods=["post"], url_path="link-contexts-ai")
     def link_contexts_ai(self, request, pk=None):
         """Link top-k contexts to task using AI selection (no embeddings dependency)."""
         task = self.get_object()
-        k = int(request.data.get("k") or 5)
-        payload_task = {
-            "title": task.title,
-            "description": task.description,
-            "category_name": task.category.name if task.category else None,
-            "status": task.status,
-            "due_date": task.due_date.isoformat() if task.due_date else None,
-        }
-        all_contexts = [
-            {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-            for c in task.contexts.all()[:10]
-        ]
-        # If task has no contexts yet, consider recent global contexts
-        if not all_contexts:
-            from contexts.models import ContextEntry
-
-            recent = list(ContextEntry.objects.order_by("-created_at")[:50])
-            all_contexts = [
-                {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-                for c in recent
-            ]
-
-        orchestrator = AiOrchestrator(get_provider())
-        ids = orchestrator.select_context_ids(task=payload_task, contexts=all_contexts, k=k)
-        from contexts.models import ContextEntry
-
-        selected = list(ContextEntry.objects.filter(id__in=ids))
-        if selected:
-            task.contexts.add(*selected)
-        return Response({"linked": [str(c.id) for c in selected]})
+        params = {"k": int(request.data.get("k") or 5)}
+        if async_requested(request):
+            return enqueue_response(request, AiJobKind.LINK_CONTEXTS, task=task, params=params)
+        return Response(ai_actions.link_contexts(task, params))
 
     @action(detail=False, methods=["post"], url_path="auto-plan-day")
     def auto_plan_day(self, request):
-        """Suggest a daily plan across active tasks (todo/in_progress)."""
+        """Plan the working day across active tasks (todo/in_progress) without overlapping blocks.
+
+        Optional body: start/end ("HH:MM"), timezone, days (horizon in working days)
+        and labels="ai" for one model call that writes labels and reasoning.
+        """
         tasks = list(
-            Task.objects.filter(status__in=["todo", "in_progress"]).select_related("category").prefetch_related("contexts")
+            self.get_queryset()
+            .filter(status__in=["todo", "in_progress"])
+            .select_related(None)
+            .prefetch_related(None)
+            .only("id", "title", "description", "priority_score", "due_date", "ai_metadata")
+            .order_by("-priority_score")[: settings.AI_PLAN_MAX_TASKS]
         )
-        orchestrator = AiOrchestrator(get_provider())
-        now_iso = tz.now().isoformat()
-        plan = []
-        for t in tasks[:10]:
-            payload_task = {
-                "title": t.title,
-                "description": t.description,
-                "category_name": t.category.name if t.category else None,
-                "status": t.status,
-                "due_date": t.due_date.isoformat() if t.due_date else None,
-            }
-            payload_contexts = [
-                {"id": str(c.id), "source_type": c.source_type, "content": c.content}
-                for c in t.contexts.all()[:5]
-            ]
-            s = orchestrator.suggest_schedule(task=payload_task, contexts=payload_contexts)
-            plan.append(
-                {
-                    "task_id": str(t.id),
-                    "title": t.title,
-                    "blocks": [{"start": b.start, "end": b.end, "label": b.label} for b in s.blocks],
-                    "recommended_deadline": s.recommended_deadline,
-                    "reasoning": s.reasoning,
-                }
-            )
-        return Response({"now": now_iso, "plan": plan})
+        params = request.data if hasattr(request.data, "get") else {}
+        try:
+            return Response(ai_actions.plan_active_tasks(tasks, params))
+        except (ValueError, KeyError) as e:
+            return Response({"detail": f"Invalid planning parameters: {e}"}, status=400)
 
     @action(detail=False, methods=["post"], url_path="seed-sample-data")
     def seed_sample_data(self, request):
@@ -370,130 +261,83 @@ class TaskViewSet(
                 category=Category.objects.order_by('?').first(),
                 status=statuses[i % len(statuses)],
                 due_date=tz.now() + tz.timedelta(days=i),
+                urgency_next_at=tz.now(),
                 priority_score=min(0.95, 0.2 + (i * 0.05)),
             )
         return Response({"ok": True})
 
-    @action(detail=False, methods=["get"], url_path="export")
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="export",
+        # Only formats export_response can produce; anything else is rejected (404/406) by negotiation
+        renderer_classes=[JSONRenderer, CsvRenderer, NdjsonRenderer],
+    )
     def export(self, request):
-        fmt = (request.query_params.get("format") or "json").lower()
-        qs = self.filter_queryset(self.get_queryset())
-        qs = qs.order_by("-created_at")
-
-        if fmt == "csv":
-            buffer = io.StringIO()
-            writer = csv.writer(buffer)
-            writer.writerow(["id", "title", "description", "category", "status", "priority_score", "due_date"])
-            for t in qs:
-                writer.writerow([
-                    str(t.id),
-                    t.title,
-                    t.description,
-                    t.category.name if t.category else "",
-                    t.status,
-                    f"{t.priority_score:.2f}",
-                    t.due_date.isoformat() if t.due_date else "",
-                ])
-            resp = HttpResponse(buffer.getvalue(), content_type="text/csv")
-            resp["Content-Disposition"] = 'attachment; filename="tasks_export.csv"'
-            return resp
-
-        # default json
-        data = []
-        for t in qs:
-            data.append({
-                "id": str(t.id),
-                "title": t.title,
-                "description": t.description,
-                "category": t.category.name if t.category else None,
-                "status": t.status,
-                "priority_score": t.priority_score,
-                "due_date": t.due_date.isoformat() if t.due_date else None,
-            })
-        resp = HttpResponse(json.dumps(data), content_type="application/json")
-        resp["Content-Disposition"] = 'attachment; filename="tasks_export.json"'
-        return resp
+        """Stream tasks as `?format=json|csv|ndjson`; `?compress=gzip` gzips the download."""
+        fmt = request.accepted_renderer.format
+        qs = self.filter_queryset(self.get_queryset()).select_related(None).prefetch_related(None)
+        # Newest first unless ordered explicitly or ranked by a search
+        if not request.query_params.get("ordering") and RELEVANCE not in qs.query.annotations:
+            qs = qs.order_by("-created_at")
+        rows = qs.values_list(
+            "id", "title", "description", "category__name", "status", "priority_score", "due_date"
+        ).iterator(chunk_size=2000)
+
+        def formatted():
+            for task_id, title, description, category, status, priority_score, due_date in rows:
+                if fmt == "csv":
+                    yield [
+                        str(task_id),
+                        title,
+                        description,
+                        category or "",
+                        status,
+                        f"{priority_score:.2f}",
+                        due_date.isoformat() if due_date else "",
+                    ]
+                else:
+                    yield [
+                        str(task_id),
+                        title,
+                        description,
+                        category,
+                        status,
+                        priority_score,
+                        due_date.isoformat() if due_date else None,
+                    ]
+
+        compress = (request.query_params.get("compress") or "").lower() == "gzip"
+        return export_response(fmt, EXPORT_FIELDS, formatted(), f"tasks_export.{fmt}", compress=compress)
 
     @action(detail=False, methods=["post"], url_path="import")
     def import_(self, request):
-        """Import tasks from uploaded file (CSV/JSON) or JSON body.
+        """Import tasks from an uploaded file (CSV/JSON/NDJSON) or a JSON body.
 
         CSV columns: title, description, category, status, due_date (ISO8601)
-        JSON: array of objects with same keys.
+        JSON: array of objects with same keys (or {"items": [...]}); NDJSON: one object per line.
+        Rows that fail validation are listed in `errors` and do not stop the import.
+        Uploads over TASK_IMPORT_ASYNC_BYTES (or with ?async=1) run as a background job.
         """
-        created_ids: list[str] = []
-
-        def upsert_category(name: str | None) -> Category | None:
-            if not name:
-                return None
-            name = str(name).strip()
-            if not name:
-                return None
-            obj, _ = Category.objects.get_or_create(name=name)
-            return obj
-
+        user = request.user
+        owner_id = user.id if user and user.is_authenticated else None
         uploaded = request.FILES.get("file")
-        items = None
         if uploaded:
-            content = uploaded.read()
-            name = (uploaded.name or "").lower()
-            if name.endswith(".csv"):
-                text = content.decode("utf-8", errors="ignore")
-                reader = csv.DictReader(io.StringIO(text))
-                items = list(reader)
-            else:
-                items = json.loads(content.decode("utf-8", errors="ignore"))
+            if async_requested(request) or uploaded.size > settings.TASK_IMPORT_ASYNC_BYTES:
+                path = TaskImportService.save_upload(uploaded)
+                return enqueue_response(request, AiJobKind.TASK_IMPORT, params={"path": path, "owner_id": owner_id})
+            items = iter_upload(uploaded, uploaded.name)
         else:
-            # Try JSON body
-            try:
-                items = request.data
-                if isinstance(items, dict) and "items" in items:
-                    items = items["items"]
-            except Exception:
-                items = None
-
-        if not isinstance(items, list) or not items:
+            items = request.data
+            if isinstance(items, dict) and "items" in items:
+                items = items["items"]
+            if not isinstance(items, list) or not items:
+                return Response({"detail": "Provide a CSV/JSON file or JSON array in body."}, status=400)
+
+        result = TaskImportService.run(items, owner_id=owner_id)
+        if not result.created and not result.error_count:
             return Response({"detail": "Provide a CSV/JSON file or JSON array in body."}, status=400)
-
-        for obj in items:
-            try:
-                title = (obj.get("title") or obj.get("Title") or "").strip()
-                if not title:
-                    continue
-                description = obj.get("description") or obj.get("Description") or ""
-                category_name = obj.get("category") or obj.get("Category")
-                status_val = obj.get("status") or obj.get("Status") or Task._meta.get_field("status").default
-                due_iso = obj.get("due_date") or obj.get("DueDate") or None
-                due_val = None
-                if due_iso:
-                    try:
-                        s = str(due_iso).replace("Z", "+00:00")
-                        dt = timezone.datetime.fromisoformat(s)
-                        if timezone.is_naive(dt):
-                            dt = timezone.make_aware(dt, timezone=timezone.utc)
-                        due_val = dt
-                    except Exception:
-                        due_val = None
-                category_obj = upsert_category(category_name)
-                dto = TaskCreateDTO(
-                    title=title,
-                    description=description,
-                    category=category_obj,
-                    status=status_val,
-                    due_date=due_val,
-                    contexts_ids=None,
-                )
-                task = TaskService.create_task(dto)
-                if category_obj:
-                    try:
-                        CategoryService.touch_usage(category_obj)
-                    except Exception:
-                        pass
-                created_ids.append(str(task.id))
-            except Exception:
-                continue
-
-        return Response({"created": created_ids, "count": len(created_ids)})
+        return Response(result.as_dict())
 
     def perform_create(self, serializer):
         validated = serializer.validated_data
@@ -527,7 +371,10 @@ class TaskViewSet(
         qs = super().get_queryset()
         user = getattr(self.request, "user", None)
         if user and user.is_authenticated:
-            return qs.filter(models.Q(owner=user) | models.Q(owner__isnull=True))
+            qs = qs.filter(models.Q(owner=user) | models.Q(owner__isnull=True))
+            if EFFECTIVE_PRIORITY in self.request.query_params.get("ordering", ""):
+                qs = with_effective_priority(qs)
+            return qs
         return qs.none()
 
 